@@ -0,0 +1,186 @@
+"""
+Runtime answer cache in front of live generation.
+
+Two tiers:
+  - an in-process LRU bounded by entry count and total answer size, and
+  - an optional SQLite file (WAL mode) that every uvicorn worker on the host can share.
+Both tiers expire entries after a TTL. Keys hash the question (catalogue id or normalized free
+text), the language and the prompt fingerprint (model, system prompt, generation config), so
+changing any of those makes the old entries unreachable instead of serving stale answers.
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from shared_state import SQLiteConnections
+
+logger = logging.getLogger(__name__)
+
+def answer_cache_key(normalized_question: str, language: str, fingerprint: str) -> str:
+    return hashlib.sha256(f"{fingerprint}\x1f{language}\x1f{normalized_question}".encode("utf-8")).hexdigest()
+
+class MemoryAnswerCache:
+    """LRU of answer texts, bounded by number of entries and total UTF-8 size."""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 86400.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[str, float, int]]" = OrderedDict() # Key -> (answer, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, expires_at, size = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def put(self, key: str, answer: str, size: int | None = None):
+        """Stores `answer`; other values may be kept too if their `size` in bytes is given."""
+        size = len(answer.encode("utf-8")) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (answer, self._clock() + self.ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+class SQLiteAnswerCache:
+    """
+    Answer cache in a SQLite file shared by the workers on one host. WAL mode lets readers proceed
+    while another worker writes. When the row limit is exceeded the oldest entries are dropped.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000, ttl_seconds: float = 86400.0, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._connect = SQLiteConnections(path).get
+        self.evictions = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY, answer TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_created_at ON answers (created_at)")
+
+    def get(self, key: str) -> str | None:
+        row = self._connect().execute(
+            "SELECT answer FROM answers WHERE key = ? AND expires_at > ?", (key, self._clock())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, answer: str):
+        now = self._clock()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO answers (key, answer, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, answer, now, now + self.ttl_seconds),
+        )
+        # Trim occasionally rather than on every write
+        if hash(key) % 64 == 0:
+            self.trim()
+
+    def trim(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM answers WHERE expires_at <= ?", (self._clock(),))
+        excess = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY created_at LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def stats(self) -> dict:
+        entries = self._connect().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {"path": self.path, "entries": entries, "max_entries": self.max_entries, "evictions": self.evictions}
+
+class AnswerCache:
+    """Memory tier in front of the optional shared SQLite tier, with hit/miss counters."""
+
+    def __init__(self, memory: MemoryAnswerCache, shared: SQLiteAnswerCache | None = None):
+        self.memory = memory
+        self.shared = shared
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.puts = 0
+
+    async def get(self, key: str) -> str | None:
+        answer = self.memory.get(key)
+        if answer is not None:
+            self.memory_hits += 1
+            return answer
+        if self.shared is not None:
+            try:
+                answer = await asyncio.to_thread(self.shared.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared answer cache read failed: {e}")
+                answer = None
+            if answer is not None:
+                self.shared_hits += 1
+                self.memory.put(key, answer)
+                return answer
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, answer: str):
+        self.puts += 1
+        self.memory.put(key, answer)
+        if self.shared is not None:
+            try:
+                await asyncio.to_thread(self.shared.put, key, answer)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared answer cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        stats = {
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "puts": self.puts,
+            "hit_ratio": round((self.memory_hits + self.shared_hits) / lookups, 4) if lookups else None,
+            "memory": self.memory.stats(),
+            "shared": None,
+        }
+        if self.shared is not None:
+            try:
+                stats["shared"] = self.shared.stats()
+            except sqlite3.Error as e:
+                stats["shared"] = {"error": str(e)}
+        return stats
@@ -0,0 +1,124 @@
+"""
+Server-side rendering of answers from the model's markdown to HTML.
+
+The rules are those of formatMessage in static/script.js: fenced code blocks, #/##/### headings,
+**bold**, *italic*, paragraphs with line breaks, and - / * / • and numbered lists. The text is
+HTML-escaped before any markup is added, and every tag comes from a fixed template, so the
+result is safe to assign to innerHTML.
+
+RenderedAnswerCache keeps the HTML by a digest of the answer text. Each distinct answer (stored,
+cached or generated) is rendered once per worker, not on every view.
+"""
+import hashlib
+import html
+import json
+import re
+
+from answer_cache import MemoryAnswerCache
+
+_CODE_BLOCK = re.compile(r"```(json|javascript|python|html|css|sql|typescript|jsx|tsx)?\s*([\s\S]*?)```")
+_HEADINGS = [(re.compile(rf"^{'#' * level} (.*)$", re.M), f"<h{level}>\\1</h{level}>") for level in (3, 2, 1)]
+_BOLD = re.compile(r"\*\*([\s\S]+?)\*\*")
+_ITALIC = re.compile(r"\*([\s\S]+?)\*")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_BULLET_LIST = re.compile(r"(?:^|\n)(\s*[-*•]\s+[^\n]+(?:\n\s*[-*•]\s+[^\n]+)*)", re.M)
+_NUMBERED_LIST = re.compile(r"(?:^|\n)(\s*\d+\.\s+[^\n]+(?:\n\s*\d+\.\s+[^\n]+)*)", re.M)
+_BULLET = re.compile(r"^\s*[-*•]\s+")
+_NUMBER = re.compile(r"^\s*\d+\.\s+")
+_JSON_TOKEN = re.compile(r'("(\\u[a-zA-Z0-9]{4}|\\[^u]|[^\\"])*"(\s*:)?|\b(true|false|null)\b|-?\d+(?:\.\d*)?(?:[eE][+\-]?\d+)?)')
+
+def _escape(text: str) -> str:
+    # Same as the frontend's escapeHTML (textContent -> innerHTML): quotes are left alone in text
+    return html.escape(text, quote=False)
+
+def _list(match: re.Match, marker: re.Pattern, tag: str) -> str:
+    items = "".join(f"<li>{marker.sub('', line)}</li>" for line in match.group(0).strip().split("\n"))
+    return f"<{tag}>{items}</{tag}>"
+
+def _paragraph(paragraph: str) -> str:
+    trimmed = paragraph.strip()
+    if not trimmed:
+        return ""
+    if re.match(r"<h[1-6]>", trimmed) or trimmed.startswith(("-", "<ul>", "<ol>")) or re.match(r"\d+\.", trimmed):
+        return trimmed
+    return f"<p>{trimmed.replace(chr(10), '<br>')}</p>"
+
+def _highlight_json(code: str) -> str:
+    """Pretty-printed JSON with key/string/number/boolean/null spans; the (escaped) code as is if it does not parse."""
+    try:
+        code = _escape(json.dumps(json.loads(html.unescape(code)), indent=2, ensure_ascii=False))
+    except ValueError:
+        pass
+
+    def token(match: re.Match) -> str:
+        text, colon = match.group(0), ""
+        if text.startswith('"'):
+            css_class = "key" if match.group(3) else "string"
+            if match.group(3):
+                text, colon = text[:-len(match.group(3))], match.group(3)
+        elif text in ("true", "false"):
+            css_class = "boolean"
+        elif text == "null":
+            css_class = "null"
+        else:
+            css_class = "number"
+        return f'<span class="{css_class}">{text}</span>{colon}'
+    return _JSON_TOKEN.sub(token, code)
+
+def _code_block(language: str, code: str) -> str:
+    label = f'<div class="code-block-label" aria-label="Programming language">{language}</div>' if language else ""
+    body = _highlight_json(code) if language == "json" else f"<code>{code}</code>"
+    return (
+        f'<div class="code-block {language}" role="group" aria-label="Code example">{label}'
+        f'<button class="copy-code-btn" title="Copy code to clipboard" aria-label="Copy code to clipboard" '
+        f'data-code="{code.replace(chr(34), "&quot;")}"><span aria-hidden="true">📋</span> Copy</button>'
+        f'<pre tabindex="0" role="text" aria-label="Code content">{body}</pre></div>'
+    )
+
+def render_answer_html(text: str) -> str:
+    """HTML for an answer's markdown, as formatMessage in static/script.js renders it."""
+    text = _escape(text)
+
+    # Code blocks are set aside first so no other rule touches their contents
+    code_blocks = []
+    def set_aside(match: re.Match) -> str:
+        code_blocks.append(_code_block(match.group(1) or "", match.group(2).strip()))
+        return f"__CODEBLOCK_{len(code_blocks) - 1}__"
+    text = _CODE_BLOCK.sub(set_aside, text)
+
+    for pattern, replacement in _HEADINGS:
+        text = pattern.sub(replacement, text)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    text = _ITALIC.sub(r"<em>\1</em>", text)
+    text = "\n".join(_paragraph(paragraph) for paragraph in _PARAGRAPH_BREAK.split(text))
+    text = _BULLET_LIST.sub(lambda match: _list(match, _BULLET, "ul"), text)
+    text = _NUMBERED_LIST.sub(lambda match: _list(match, _NUMBER, "ol"), text)
+    text = re.sub(r"</ul>\s*<ul>", "", text)
+    text = re.sub(r"</ol>\s*<ol>", "", text)
+
+    for index, block in enumerate(code_blocks):
+        text = text.replace(f"__CODEBLOCK_{index}__", block, 1)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+class RenderedAnswerCache:
+    """Rendered HTML by digest of the answer text, in a size-bounded LRU."""
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 32 * 1024 * 1024):
+        # Answers do not change meaning over time, so the entries only leave by eviction
+        self._cache = MemoryAnswerCache(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=float("inf"))
+        self.hits = 0
+        self.renders = 0
+
+    def html(self, text: str) -> str:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        rendered = self._cache.get(key)
+        if rendered is not None:
+            self.hits += 1
+            return rendered
+        rendered = render_answer_html(text)
+        self.renders += 1
+        self._cache.put(key, rendered)
+        return rendered
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "renders": self.renders, **self._cache.stats()}
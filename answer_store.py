@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import time
+
+from catalogue import normalize_question
+
+logger = logging.getLogger(__name__)
+
+# Where build_answers.py writes the precomputed answers and where main.py reads them from
+ANSWER_STORE_PATH = os.getenv("ANSWER_STORE_PATH", "data/answer_store.json")
+
+# Bump when the on-disk layout changes; files with another format are ignored
+STORE_FORMAT = 2
+
+class AnswerStore:
+    """
+    Precomputed answers for the fixed question menu, keyed by (language, normalized question) and
+    indexed by (language, catalogue question id).
+    Every entry records the prompt hash it was generated with (chat_logic.answer_prompt_hash).
+    Entries whose hash no longer matches are dropped when the server loads the store, so answers
+    generated with an older prompt or model are never served.
+    """
+
+    def __init__(self, answers: dict | None = None, built_at: float | None = None):
+        self.built_at = built_at
+        # Key: (language, normalized question), Value: answer entry dict
+        self._answers = answers or {}
+        # Key: (language, question id), Value: the same entry dict
+        self._by_id = {(entry["language"], entry["question_id"]): entry
+                       for entry in self._answers.values() if entry.get("question_id") is not None}
+
+    def __len__(self):
+        return len(self._answers)
+
+    def lookup(self, question: str, language: str) -> str | None:
+        """Returns the stored answer for the question, or None on a miss."""
+        entry = self._answers.get((language, normalize_question(question)))
+        return entry["answer"] if entry else None
+
+    def lookup_id(self, question_id: int, language: str) -> str | None:
+        """Returns the stored answer for the catalogue question, or None on a miss."""
+        entry = self._by_id.get((language, question_id))
+        return entry["answer"] if entry else None
+
+    def add(self, question_id: int | None, question: str, language: str, answer: str, prompt_hash: str,
+            generated_at: float | None = None):
+        entry = self._answers[(language, normalize_question(question))] = {
+            "question_id": question_id,
+            "language": language,
+            "question": question,
+            "answer": answer,
+            "prompt_hash": prompt_hash,
+            "generated_at": generated_at or time.time(),
+        }
+        if question_id is not None:
+            self._by_id[(language, question_id)] = entry
+
+    def entry(self, question: str, language: str) -> dict | None:
+        return self._answers.get((language, normalize_question(question)))
+
+    def contains(self, question: str, language: str) -> bool:
+        return (language, normalize_question(question)) in self._answers
+
+    def snapshot(self) -> "AnswerStore":
+        """A copy that can be saved from another thread while this store keeps receiving answers."""
+        return AnswerStore(dict(self._answers), self.built_at)
+
+    @classmethod
+    def load(cls, path: str, prompt_hash_fn=None) -> "AnswerStore":
+        """
+        Loads the store from disk. A missing, unreadable or old-format file yields an empty store
+        (every lookup misses and /chat falls back to live generation). With prompt_hash_fn
+        (question, language) -> hash, entries whose recorded hash differs are left out.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.info(f"No answer store at {path}. All questions will be generated live.")
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read answer store {path}: {e}")
+            return cls()
+
+        if data.get("format") != STORE_FORMAT:
+            logger.warning(f"Answer store {path} has format {data.get('format')}, expected {STORE_FORMAT}. Run build_answers.py to regenerate it.")
+            return cls()
+
+        store = cls(built_at=data.get("built_at"))
+        stale = 0
+        for entry in data.get("answers", []):
+            if prompt_hash_fn is not None and entry.get("prompt_hash") != prompt_hash_fn(entry["question"], entry["language"]):
+                stale += 1
+                continue
+            store.add(entry.get("question_id"), entry["question"], entry["language"], entry["answer"],
+                      entry.get("prompt_hash"), entry.get("generated_at"))
+        if stale:
+            logger.warning(f"Skipped {stale} outdated answers in {path}. Run build_answers.py to regenerate them.")
+        logger.info(f"Loaded {len(store)} precomputed answers from {path}")
+        return store
+
+    def save(self, path: str):
+        """Writes the store atomically so a running server never reads a half-written file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "format": STORE_FORMAT,
+            "built_at": time.time(),
+            "answers": sorted(self._answers.values(), key=lambda e: (e["language"], e["question_id"] or 0, e["question"])),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
@@ -0,0 +1,95 @@
+"""
+Latency of /chat (and /health) under N concurrent clients against the local fake Gemini backend.
+
+--mode async    current endpoint (native async generation, bounded concurrency)
+--mode blocking the previous behaviour: the synchronous SDK call runs on the event loop
+
+Usage: python benchmarks/bench_chat_concurrency.py --clients 50 --requests 4 --mode async
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+# Every simulated user shares one client IP, so the per-client free-text limit is off
+os.environ.setdefault("FREE_TEXT_PER_MINUTE", "0")
+# Point at a store that does not exist so every question goes through generation
+os.environ["ANSWER_STORE_PATH"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "no-answer-store.json")
+
+import httpx
+
+from benchmarks.fake_gemini import FakeBackendConfig, install
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(name, latencies):
+    return (
+        f"{name:<7} n={len(latencies):<5} p50={percentile(latencies, 50) * 1000:8.1f} ms  "
+        f"p99={percentile(latencies, 99) * 1000:8.1f} ms  max={max(latencies) * 1000:8.1f} ms  "
+        f"mean={statistics.mean(latencies) * 1000:8.1f} ms"
+    )
+
+async def run(clients: int, requests_per_client: int, mode: str):
+    import chat_logic
+    import main
+
+    if mode == "blocking":
+        async def blocking_generate(session_id, question, language="en", **options):
+            # Same signature as generate_answer_for_question_async; the previous path generated from the
+            # question text alone, so question_id, priority and follow_up are accepted and not used
+            return chat_logic.generate_answer_for_question(session_id, question, language)
+        main.generate_answer_for_question_async = blocking_generate
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        chat_latencies, health_latencies = [], []
+
+        async def chat_client(index, started):
+            # Latency is measured from when the client wants to send (start of the run, then the end of
+            # its previous request), so time spent waiting for a blocked event loop is included.
+            for n in range(requests_per_client):
+                response = await client.post("/chat", json={"message": f"Benchmark question {index}-{n}", "language": "en"})
+                response.raise_for_status()
+                finished = time.perf_counter()
+                chat_latencies.append(finished - started)
+                started = finished
+
+        async def health_probe(stop):
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(health_probe(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(chat_client(i, started) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    print(f"mode={mode} clients={clients} requests/client={requests_per_client} wall={elapsed:.2f}s "
+          f"throughput={len(chat_latencies) / elapsed:.1f} req/s")
+    print(summarize("/chat", chat_latencies))
+    print(summarize("/health", health_latencies))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4, help="Requests per client")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Mean fake upstream latency")
+    parser.add_argument("--mode", choices=["async", "blocking"], default="async")
+    args = parser.parse_args()
+
+    install(FakeBackendConfig(latency_ms=args.latency_ms))
+    import logging
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.clients, args.requests, args.mode))
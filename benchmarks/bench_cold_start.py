@@ -0,0 +1,97 @@
+"""
+Cold-start cost: import time of main:app and time to first response from a fresh uvicorn process.
+
+Each run starts a new Python process, so nothing is shared between runs (bytecode caches aside).
+  import    python -c "import main" (wall time of the import, measured inside the process)
+  first /   spawn uvicorn, poll until GET /health and GET / answer, measured from spawn
+
+Runs with GOOGLE_API_KEY unset too (--no-key) to check that static files and /health still come up.
+
+Usage: python benchmarks/bench_cold_start.py [--runs 5] [--no-key]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+def child_env(with_key: bool) -> dict:
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    if with_key:
+        env["GOOGLE_API_KEY"] = "benchmark-fake-key"
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+def measure_import(with_key: bool) -> float | None:
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=REPO_DIR, env=child_env(with_key),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return False
+
+def measure_first_response(with_key: bool, timeout_s: float = 30.0) -> tuple[float | None, float | None]:
+    """Returns (ms until /health answers, ms until / answers) from process spawn."""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_DIR, env=child_env(with_key), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout_s
+        health = (time.perf_counter() - started) * 1000 if wait_for(f"http://127.0.0.1:{port}/health", deadline) else None
+        root = (time.perf_counter() - started) * 1000 if wait_for(f"http://127.0.0.1:{port}/", deadline) else None
+        return health, root
+    finally:
+        process.terminate()
+        process.wait()
+
+def describe(values) -> str:
+    values = [v for v in values if v is not None]
+    if not values:
+        return "failed"
+    return f"median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms  max {max(values):7.1f} ms"
+
+def main(runs: int, with_key: bool):
+    imports = [measure_import(with_key) for _ in range(runs)]
+    responses = [measure_first_response(with_key) for _ in range(runs)]
+    label = "with key" if with_key else "without GOOGLE_API_KEY"
+    print(f"cold start ({label}, {runs} runs)")
+    print(f"  import main      {describe(imports)}")
+    print(f"  first /health    {describe([h for h, _ in responses])}")
+    print(f"  first /          {describe([r for _, r in responses])}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-key", action="store_true", help="Run without GOOGLE_API_KEY")
+    args = parser.parse_args()
+    main(args.runs, not args.no_key)
@@ -0,0 +1,94 @@
+"""
+Memory per session and input tokens per turn of follow-up mode over long conversations, against the
+local fake Gemini backend.
+
+--sessions sessions each ask --turns questions in follow-up mode (catalogue questions and short
+follow-ups such as "what about at night?"), all sessions taking one turn at a time. Every turn is a
+live generation with the conversation as context. Two configurations are compared:
+  window     the default FOLLOW_UP_TOKEN_BUDGET / FOLLOW_UP_SUMMARY_TOKENS: older turns are compacted
+  unbounded  a budget nothing exceeds, i.e. the whole history is resent every turn
+For selected turns it reports the mean input tokens of that turn (as counted by the fake from what is
+actually sent, system instruction included) and the mean memory of a session's conversation.
+
+Usage: python benchmarks/bench_follow_up.py [--sessions 20] [--turns 50] [--answer-tokens 400]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+os.environ["CONTEXT_CACHE_ENABLED"] = "false" # Measure what is sent, not what the provider discounts
+os.environ.setdefault("GEMINI_TPM_LIMIT", "0") # Token counts are the point here, not quota pacing
+os.environ.setdefault("GEMINI_RPM_LIMIT", "0")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+
+import logging
+logging.disable(logging.WARNING)
+
+from benchmarks.fake_gemini import FakeBackendConfig, install
+
+FOLLOW_UPS = ["What about at night?", "And if she is a preemie?", "How long should that take?",
+              "Is that still true after six months?", "What if it hurts?", "Can you explain the second point?",
+              "What are the warning signs?", "And for twins?"]
+REPORT_TURNS = (1, 2, 5, 10, 20, 30, 40, 50)
+
+def conversation_bytes(conversation) -> int:
+    """Approximate memory of a ConversationWindow: the object, its deques, turns and strings."""
+    size = sys.getsizeof(conversation) + sys.getsizeof(conversation.turns) + sys.getsizeof(conversation.summary)
+    for turn in conversation.turns:
+        size += sys.getsizeof(turn) + sys.getsizeof(turn.question) + sys.getsizeof(turn.answer)
+    return size + sum(sys.getsizeof(line) for line in conversation.summary)
+
+async def run(label: str, token_budget: int, summary_budget: int, questions: list[str], args) -> dict[int, tuple]:
+    import chat_logic
+
+    chat_logic.FOLLOW_UP_TOKEN_BUDGET = token_budget
+    chat_logic.FOLLOW_UP_SUMMARY_TOKENS = summary_budget
+    rng = random.Random(7)
+    session_ids = [f"bench-follow-up-{label}-{n}" for n in range(args.sessions)]
+    results = {}
+    for turn in range(1, args.turns + 1):
+        asked = [rng.choice(questions) if turn == 1 or rng.random() < 0.4 else rng.choice(FOLLOW_UPS) + f" ({turn})"
+                 for _ in session_ids]
+        # Answers differ per turn, so no two turns hit the runtime cache
+        before = chat_logic.token_usage.stats()["input_tokens"]
+        await asyncio.gather(*(
+            chat_logic.generate_follow_up_text_async(session_id, f"{question} [{session_id} turn {turn}]", "en")
+            for session_id, question in zip(session_ids, asked)
+        ))
+        input_tokens = (chat_logic.token_usage.stats()["input_tokens"] - before) / len(session_ids)
+        if turn in REPORT_TURNS or turn == args.turns:
+            conversations = [chat_logic.get_conversation(session_id) for session_id in session_ids]
+            memory = sum(conversation_bytes(conversation) for conversation in conversations) / len(conversations)
+            window = sum(conversation.turn_tokens + conversation.summary_tokens for conversation in conversations) / len(conversations)
+            results[turn] = (input_tokens, window, memory)
+    return results
+
+async def main(args):
+    import chat_logic
+    from catalogue import get_catalogue, iter_catalogue_questions
+
+    install(FakeBackendConfig(latency_ms=0, jitter_ms=0, answer_tokens=args.answer_tokens, unique_answers=True))
+    questions = [text for _, _, text in iter_catalogue_questions(get_catalogue().data, ["en"])]
+    print(f"{args.sessions} sessions x {args.turns} turns, fake answers of ~{args.answer_tokens} tokens, "
+          f"knowledge mode {chat_logic.KNOWLEDGE_MODE}; window budget {chat_logic.FOLLOW_UP_TOKEN_BUDGET} + "
+          f"summary {chat_logic.FOLLOW_UP_SUMMARY_TOKENS} tokens")
+    window = await run("window", chat_logic.FOLLOW_UP_TOKEN_BUDGET, chat_logic.FOLLOW_UP_SUMMARY_TOKENS, questions, args)
+    unbounded = await run("unbounded", 10 ** 9, 10 ** 9, questions, args)
+    print(f"{'turn':>5}  {'window: input tok':>18} {'context tok':>12} {'session KB':>11}  |"
+          f"  {'unbounded: input tok':>21} {'context tok':>12} {'session KB':>11}")
+    for turn in sorted(window):
+        bounded_row, unbounded_row = window[turn], unbounded[turn]
+        print(f"{turn:>5}  {bounded_row[0]:>18,.0f} {bounded_row[1]:>12,.0f} {bounded_row[2] / 1024:>11.1f}  |"
+              f"  {unbounded_row[0]:>21,.0f} {unbounded_row[1]:>12,.0f} {unbounded_row[2] / 1024:>11.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=50, help="Questions per conversation")
+    parser.add_argument("--answer-tokens", type=int, default=400, help="Length of the fake answers")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""
+Seeking in per-answer media: latency and bytes of range requests against the media endpoint.
+
+Simulates a player seeking through the demo video: a first request for the start of the file, then
+random 256 KB ranges. Compares the StaticFiles mount (64 KB chunks) with /media (1 MB chunks,
+manifest stat and strong ETag). Also checks that a stale If-Range falls back to the full file.
+
+Usage: python benchmarks/bench_media.py [--requests 200] [--range-kb 256]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.chdir(REPO_DIR)
+
+import logging
+logging.disable(logging.INFO)
+
+import httpx
+
+async def seek(client: httpx.AsyncClient, url: str, size: int, requests: int, range_bytes: int, headers: dict) -> tuple[float, float, int]:
+    """(p50 ms, p95 ms, body bytes) of `requests` random range requests."""
+    rng = random.Random(7)
+    timings, received = [], 0
+    for _ in range(requests):
+        start = rng.randrange(0, max(1, size - range_bytes))
+        started = time.perf_counter()
+        response = await client.get(url, headers={**headers, "Range": f"bytes={start}-{start + range_bytes - 1}"})
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 206, response.status_code
+        received += len(response.content)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95)], received
+
+async def main(args):
+    import main as app_module
+    from media import get_media_library
+
+    library = get_media_library()
+    video = (library.media_info() or {}).get("video")
+    if video is None:
+        sys.exit("No default video in the media manifest; run python media.py first.")
+    asset = library.asset(video["url"].rsplit("/", 1)[-1])
+    range_bytes = args.range_kb * 1024
+    print(f"{asset.name}: {asset.size:,} bytes, {args.requests} seeks of {args.range_kb} KB")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://media") as client:
+        for label, url, headers in (("StaticFiles mount", f"/static/media/{asset.name}", {}),
+                                    ("/media", video["url"], {}),
+                                    ("/media + If-Range", video["url"], {"If-Range": asset.etag})):
+            first = await client.get(url, headers={**headers, "Range": "bytes=0-"})
+            p50, p95, received = await seek(client, url, asset.size, args.requests, range_bytes, headers)
+            print(f"  {label:<20} first {first.status_code}  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  {received:>12,} B  "
+                  f"cache-control: {first.headers.get('cache-control')}")
+        stale = await client.get(video["url"], headers={"Range": "bytes=0-1023", "If-Range": '"stale"'})
+        print(f"  stale If-Range: {stale.status_code}, {len(stale.content):,} B (full file)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Random seeks per measurement")
+    parser.add_argument("--range-kb", type=int, default=256, help="Size of each range request")
+    asyncio.run(main(parser.parse_args()))
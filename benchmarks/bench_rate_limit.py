@@ -0,0 +1,84 @@
+"""
+Burst of cache misses against a fake upstream that enforces a per-minute request quota, with and
+without the client-side rate limiter.
+
+Without the limiter the burst overruns the quota and comes back as 429s (retried, then failed).
+With the limiter set to the quota, the excess waits in the queue instead, interactive
+requests ahead of background ones. Reports outcomes, 429s seen upstream and queue wait per priority.
+
+Usage: python benchmarks/bench_rate_limit.py [--quota-rpm 60] [--burst 90] [--background-share 0.5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+os.environ["ANSWER_STORE_PATH"] = os.path.join(BENCH_DIR, "no-answer-store.json")
+os.environ.setdefault("GEMINI_RETRY_BASE_DELAY_SECONDS", "0.2")
+
+from benchmarks.fake_gemini import FakeBackendConfig, FakeStats, FakeGenerativeModel, install
+
+async def run_burst(args, limiter) -> dict:
+    import chat_logic
+    from rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+    from resilience import CircuitBreaker
+
+    chat_logic.upstream_limiter = limiter
+    chat_logic.upstream.breaker = CircuitBreaker(failure_threshold=10 ** 6) # Measure the limiter, not the breaker
+    FakeGenerativeModel.stats = FakeStats()
+    outcomes, waits = {}, {PRIORITY_INTERACTIVE: [], PRIORITY_BACKGROUND: []}
+
+    async def one(priority):
+        started = time.perf_counter()
+        try:
+            await chat_logic.generate_answer_text_async("bench", f"Rate limit question {uuid.uuid4()}", "en", priority)
+            outcome = "ok"
+        except Exception as e:
+            outcome = type(e).__name__
+        key = f"{'interactive' if priority == PRIORITY_INTERACTIVE else 'background'}:{outcome}"
+        outcomes[key] = outcomes.get(key, 0) + 1
+        waits[priority].append(time.perf_counter() - started)
+
+    priorities = [PRIORITY_BACKGROUND if random.random() < args.background_share else PRIORITY_INTERACTIVE for _ in range(args.burst)]
+    started = time.perf_counter()
+    await asyncio.gather(*(one(priority) for priority in priorities))
+    return {
+        "wall_seconds": round(time.perf_counter() - started, 1),
+        "outcomes": outcomes,
+        "upstream_429s": FakeGenerativeModel.stats.quota_rejections,
+        "latency_p50_s": {p: round(sorted(v)[len(v) // 2], 2) for p, v in waits.items() if v},
+        "latency_max_s": {p: round(max(v), 2) for p, v in waits.items() if v},
+        "limiter": limiter.stats(),
+    }
+
+async def main(args):
+    import logging
+    logging.disable(logging.WARNING)
+    from rate_limiter import RateLimiter
+
+    for label, rpm in (("no limiter", 0), ("limiter", args.quota_rpm)):
+        install(FakeBackendConfig(latency_ms=200, jitter_ms=50, quota_rpm=args.quota_rpm))
+        result = await run_burst(args, RateLimiter(requests_per_minute=rpm, tokens_per_minute=0, max_wait_seconds=args.max_wait))
+        print(f"{label:<10} {result['wall_seconds']:5.1f}s  outcomes {result['outcomes']}  upstream 429s {result['upstream_429s']}")
+        print(f"           latency p50 {result['latency_p50_s']}  max {result['latency_max_s']}  (0 = interactive, 2 = background)")
+        limiter = result["limiter"]
+        print(f"           queue: max depth {limiter['max_queue_depth']}, queued {limiter['queued']}, "
+              f"wait p50/p95/max {limiter['wait_p50_ms']}/{limiter['wait_p95_ms']}/{limiter['wait_max_ms']} ms")
+        await asyncio.sleep(0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quota-rpm", type=int, default=60, help="Upstream quota enforced by the fake")
+    parser.add_argument("--burst", type=int, default=90, help="Concurrent cache misses")
+    parser.add_argument("--background-share", type=float, default=0.5)
+    parser.add_argument("--max-wait", type=float, default=20.0, help="Limiter queue timeout, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(main(args))
@@ -0,0 +1,82 @@
+"""
+Fault-injection run of the retry/timeout/circuit-breaker layer against the local fake Gemini backend.
+
+Drives POST /chat in-process through four phases and reports status codes, latency and the circuit
+state after each:
+  flaky     a fraction of calls fail with 429; retries should hide most of them
+  outage    every call fails with 503; the circuit opens and later requests fail fast with 503
+  recovery  the upstream is healthy again; after the cool-down a probe closes the circuit
+  stall     the upstream hangs; attempts are cut off at the attempt timeout, within the overall budget
+
+Timeouts and the cool-down are shortened (see the env settings below) so the run takes seconds.
+
+Usage: python benchmarks/bench_resilience.py [--requests 20] [--flaky-rate 0.3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+# Every simulated user shares one client IP, so the per-client free-text limit is off
+os.environ.setdefault("FREE_TEXT_PER_MINUTE", "0")
+os.environ["ANSWER_STORE_PATH"] = os.path.join(BENCH_DIR, "no-answer-store.json")
+os.environ.setdefault("GEMINI_TIMEOUT_SECONDS", "0.5")
+os.environ.setdefault("GEMINI_TOTAL_TIMEOUT_SECONDS", "1.5")
+os.environ.setdefault("GEMINI_RETRY_BASE_DELAY_SECONDS", "0.05")
+os.environ.setdefault("CIRCUIT_FAILURE_THRESHOLD", "5")
+os.environ.setdefault("CIRCUIT_RESET_SECONDS", "1")
+
+import httpx
+
+from benchmarks.fake_gemini import FakeBackendConfig, FakeGenerativeModel, install
+
+async def run_phase(client: httpx.AsyncClient, name: str, requests: int) -> dict:
+    import chat_logic
+
+    statuses, latencies = {}, []
+    for _ in range(requests):
+        started = time.perf_counter()
+        # Unique questions so neither the answer cache nor single-flight hides the upstream
+        response = await client.post("/chat", json={"message": f"Resilience question {uuid.uuid4()}"})
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    latencies.sort()
+    stats = chat_logic.upstream.stats()
+    print(f"{name:<9} statuses {statuses}  latency p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  "
+          f"max {latencies[-1] * 1000:7.1f} ms  circuit {stats['circuit']['state']:<9} "
+          f"retries {stats['retries']} timeouts {stats['timeouts']} rejected {stats['circuit']['rejected']}")
+    return statuses
+
+async def main(args):
+    import logging
+    logging.disable(logging.WARNING)
+    import main as app_module
+
+    config = install(FakeBackendConfig(latency_ms=20, jitter_ms=5))
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://resilience", timeout=None) as client:
+        config.error_kind, config.error_rate = "rate_limit", args.flaky_rate
+        await run_phase(client, "flaky", args.requests)
+
+        config.error_kind, config.error_rate = "unavailable", 1.0
+        await run_phase(client, "outage", args.requests)
+
+        config.error_rate = 0.0
+        await asyncio.sleep(float(os.environ["CIRCUIT_RESET_SECONDS"]))
+        await run_phase(client, "recovery", args.requests)
+
+        config.latency_ms, config.jitter_ms = 5000.0, 0.0
+        await run_phase(client, "stall", max(1, args.requests // 4))
+
+    print(f"fake backend: {FakeGenerativeModel.stats.to_dict()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per phase")
+    parser.add_argument("--flaky-rate", type=float, default=0.3, help="Fraction of 429s in the flaky phase")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+"""
+Bytes on the wire and encode time of /chat response bodies, per language.
+
+For each language, answers are taken from the answer store when it has them. Otherwise they are
+synthetic markdown of about --answer-chars characters, with headings, bold and lists. Words are
+drawn with Zipf frequencies from the transcript's vocabulary (English), or from made-up words in
+the language's script (the catalogue has too few translated words to draw from). Made-up words
+compress somewhat worse than real text, so their compressed sizes are on the high side. Each
+answer is turned into a /chat body for --sessions different session ids, timed per response:
+  pydantic     ChatResponse.model_dump_json(), the previous path (identity only)
+  per-request  the same, plus gzip (level 6) or brotli (quality 5) of every body, i.e. compressing
+               on the fly, as a compression middleware would
+  first        response_encoding: encoding the answer fields and compressing them (once per answer)
+  hit          response_encoding: a later response with the same answer, appending its session id
+Wire sizes are the body sizes for each coding. HTML rendering is left out; both paths get the
+same response_html.
+
+Usage: python benchmarks/bench_response_encoding.py [--answers 20] [--sessions 200] [--answer-chars 6000]
+"""
+import argparse
+import gzip
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from itertools import accumulate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.chdir(REPO_DIR)
+
+import logging
+logging.disable(logging.INFO)
+
+# (first consonant, last consonant, first vowel sign, last vowel sign) of each language's script
+SCRIPTS = {
+    "hi": (0x0915, 0x0939, 0x093E, 0x094C), "mr": (0x0915, 0x0939, 0x093E, 0x094C), # Devanagari
+    "bn": (0x0995, 0x09B9, 0x09BE, 0x09CC),
+    "kn": (0x0C95, 0x0CB9, 0x0CBE, 0x0CCC),
+    "gu": (0x0A95, 0x0AB9, 0x0ABE, 0x0ACC),
+}
+VOCABULARY_SIZE = 3000
+
+def vocabulary(language: str, rng: random.Random) -> list[str]:
+    """Words of a language, most frequent first."""
+    if language not in SCRIPTS:
+        from knowledge_base import get_knowledge_base
+        counts = Counter(re.findall(r"[A-Za-z']+", get_knowledge_base().transcript_text().lower()))
+        return [word for word, _ in counts.most_common(VOCABULARY_SIZE)]
+    first_consonant, last_consonant, first_sign, last_sign = SCRIPTS[language]
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        syllables = [chr(rng.randint(first_consonant, last_consonant))
+                     + (chr(rng.randint(first_sign, last_sign)) if rng.random() < 0.6 else "")
+                     for _ in range(rng.randint(1, 4))]
+        words.add("".join(syllables))
+    return sorted(words, key=len)
+
+def synthetic_answer(rng: random.Random, words: list[str], chars: int) -> str:
+    """A markdown answer of about `chars` characters from `words`, drawn with Zipf frequencies."""
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+    def phrase(low: int, high: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(low, high)))
+    lines, length = [], 0
+    while length < chars:
+        kind = rng.random()
+        if kind < 0.1:
+            line = f"\n### {phrase(2, 5)}"
+        elif kind < 0.5:
+            line = f"- **{phrase(1, 3)}:** {phrase(6, 16)}."
+        else:
+            line = f"{phrase(6, 16)}. {phrase(4, 10)}."
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+def answers_for(language: str, count: int, chars: int, rng: random.Random) -> tuple[str, list[tuple[int, str]]]:
+    """(source, [(question id, answer)]) for a language."""
+    from answer_store import ANSWER_STORE_PATH, AnswerStore
+    from catalogue import get_catalogue, iter_catalogue_questions
+
+    question_ids = [question_id for question_id, _, _ in iter_catalogue_questions(get_catalogue().data, ["en"])]
+    store = AnswerStore.load(ANSWER_STORE_PATH)
+    stored = [(question_id, store.lookup_id(question_id, language)) for question_id in question_ids]
+    stored = [(question_id, answer) for question_id, answer in stored if answer]
+    if stored:
+        return "store", stored[:count]
+    words = vocabulary(language, rng)
+    return "synthetic", [(question_id, synthetic_answer(rng, words, chars)) for question_id in question_ids[:count]]
+
+def time_per_call(function, calls: list) -> float:
+    """Mean microseconds of function(*args) over calls."""
+    started = time.perf_counter()
+    for args in calls:
+        function(*args)
+    return (time.perf_counter() - started) * 1e6 / len(calls)
+
+def main(args):
+    import brotli
+    from answer_html import render_answer_html
+    from main import ChatResponse, build_media_info
+    from response_encoding import EncodedAnswer, orjson
+
+    rng = random.Random(5)
+    session_ids = [str(uuid.uuid4()) for _ in range(args.sessions)]
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json'}; {args.sessions} sessions per answer; "
+          f"times in us per response (first: once per answer)")
+    print(f"{'lang':<5}{'source':<10}{'chars':>7} | {'identity B':>10} {'gzip B':>8} {'br B':>8} | "
+          f"{'pydantic':>8} {'+gzip':>7} {'+br':>7} | {'first br':>8} {'hit id':>7} {'hit gz':>7} {'hit br':>7}")
+    for language in args.languages.split(","):
+        source, answers = answers_for(language, args.answers, args.answer_chars, rng)
+        rows = []
+        for question_id, answer in answers:
+            fields = {"response": answer, "media": build_media_info(question_id), "response_html": render_answer_html(answer)}
+
+            def pydantic_body(session_id):
+                return ChatResponse(session_id=session_id, **fields).model_dump_json().encode("utf-8")
+            calls = [(session_id,) for session_id in session_ids]
+            baseline_us = time_per_call(pydantic_body, calls)
+            gzip_us = time_per_call(lambda session_id: gzip.compress(pydantic_body(session_id), 6, mtime=0), calls)
+            brotli_us = time_per_call(lambda session_id: brotli.compress(pydantic_body(session_id), quality=5), calls)
+
+            first_us = time_per_call(lambda: EncodedAnswer(fields).body(session_ids[0], "br"), [()] * 5)
+            encoded = EncodedAnswer(fields)
+            sizes = [len(encoded.body(session_ids[0], encoding)) for encoding in ("identity", "gzip", "br")]
+            hits = [time_per_call(encoded.body, [(session_id, encoding) for session_id in session_ids])
+                    for encoding in ("identity", "gzip", "br")]
+            rows.append([len(answer), *sizes, baseline_us, gzip_us, brotli_us, first_us, *hits])
+        mean = [statistics.mean(column) for column in zip(*rows)]
+        print(f"{language:<5}{source:<10}{mean[0]:>7,.0f} | {mean[1]:>10,.0f} {mean[2]:>8,.0f} {mean[3]:>8,.0f} | "
+              f"{mean[4]:>8.1f} {mean[5]:>7.1f} {mean[6]:>7.1f} | {mean[7]:>8.0f} {mean[8]:>7.1f} {mean[9]:>7.1f} {mean[10]:>7.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=20, help="Answers per language")
+    parser.add_argument("--sessions", type=int, default=200, help="Responses (session ids) timed per answer")
+    parser.add_argument("--answer-chars", type=int, default=6000, help="Length of synthetic answers")
+    parser.add_argument("--languages", default="en,hi,bn,mr,kn,gu", help="Comma-separated language codes")
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""
+Retrieval latency and prompt size per catalogue question.
+
+Reports index build/load time, search latency (p50/p99 over all menu questions) and, for each
+question, the size of what is sent upstream in retrieval mode compared with the full transcript.
+Token counts are estimated at ~4 characters per token.
+
+Usage: python benchmarks/bench_retrieval.py [--top-k 5] [--per-question]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+
+import logging
+logging.disable(logging.INFO)
+
+import chat_logic
+from catalogue import iter_catalogue_questions, load_catalogue
+from retrieval import BM25Index, load_or_build_index
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+def main(top_k: int, per_question: bool):
+    knowledge = chat_logic.get_knowledge_base()
+    started = time.perf_counter()
+    index = BM25Index.build(knowledge.transcript_text())
+    build_ms = (time.perf_counter() - started) * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.json")
+        index.save(path)
+        started = time.perf_counter()
+        load_or_build_index(knowledge.transcript_bytes, path)
+        load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"passages={len(index.passages)} terms={len(index.postings)} build={build_ms:.1f} ms load={load_ms:.1f} ms")
+
+    chat_logic.KNOWLEDGE_MODE = "retrieval"
+    chat_logic.RETRIEVAL_TOP_K = top_k
+    knowledge.derived("retrieval_index", lambda: index)
+
+    questions = list(iter_catalogue_questions(load_catalogue(), chat_logic.language_map))
+    full_tokens = estimate_tokens(knowledge.system_prompt)
+    search_times, prompt_tokens = [], []
+    for question_id, language, question in questions:
+        query = chat_logic._retrieval_query(question)
+        started = time.perf_counter()
+        for _ in range(20):
+            index.search(query, top_k)
+        search_times.append((time.perf_counter() - started) / 20)
+
+        tokens = estimate_tokens(chat_logic.system_instruction()) + estimate_tokens(chat_logic.build_question_prompt(question, language))
+        prompt_tokens.append(tokens)
+        if per_question:
+            print(f"  q{question_id} [{language}] ~{tokens:>5} tokens  {question[:70]}")
+
+    search_times.sort()
+    print(f"search over {len(questions)} questions: p50={search_times[len(search_times) // 2] * 1e6:.0f} us "
+          f"p99={search_times[int(len(search_times) * 0.99) - 1] * 1e6:.0f} us")
+    print(f"input tokens per question (system + prompt, estimated): full transcript ~{full_tokens}, "
+          f"retrieval top-{top_k} mean ~{statistics.mean(prompt_tokens):.0f} (min {min(prompt_tokens)}, max {max(prompt_tokens)})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=chat_logic.RETRIEVAL_TOP_K)
+    parser.add_argument("--per-question", action="store_true", help="Print the prompt size of every question")
+    args = parser.parse_args()
+    main(args.top_k, args.per_question)
@@ -0,0 +1,168 @@
+"""
+Insert and lookup cost of the near-duplicate question index (semantic_cache.NearDuplicateIndex).
+
+Fills an index with --entries synthetic free-text questions: catalogue questions with words
+swapped for words from the course transcript, plus a random context clause, so they are all
+different but share a realistic vocabulary. Then times lookups of:
+  restyled   inserted questions with changed case and punctuation (should hit the original)
+  1 typo     the same with one dropped or swapped letter
+  2 typos    with two
+  new        freshly generated questions that were never inserted
+and reports p50/p99/max latency, the hit rate and how many hits found the right original.
+
+Then it asks adversarial questions: inserted ones changed in meaning but not much in spelling
+(a negation added, a number changed, a word swapped for its opposite), plus known cases. Any hit
+there is a false positive, i.e. advice for another question. It reports how many scored above
+the threshold (matches without the guard) and how many were served (false positives).
+
+Usage: python benchmarks/bench_semantic_cache.py [--entries 100000] [--queries 2000] [--threshold 0.85]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import logging
+logging.disable(logging.INFO)
+
+OPPOSITES = [("hot", "cold"), ("day", "night"), ("more", "less"), ("before", "after"), ("early", "late"),
+             ("increase", "decrease"), ("left", "right"), ("with", "without"), ("too", "not"), ("can", "cannot")]
+# (inserted, asked) pairs seen to match before the guard existed
+KNOWN_FALSE_POSITIVES = [
+    ("Should I breastfeed my baby if I have a fever?", "Should I not breastfeed my baby if I have a fever?"),
+    ("How often should I feed my 2 week old?", "How often should I feed my 12 week old?"),
+    ("Can I breastfeed outside when it is very hot outside?", "Can I breastfeed outside when it is very cold outside?"),
+    ("Is it normal if my baby sleeps 5 hours without feeding?", "Is it normal if my baby sleeps 15 hours without feeding?"),
+]
+
+CLAUSES = ["for my {n} week old", "with twins", "at night", "after a c-section", "when back at work",
+           "if I am {n} weeks postpartum", "on day {n}", "while pumping", "in hot weather", "after {n} months"]
+
+def vocabulary() -> tuple[list[str], list[str]]:
+    """(catalogue questions in English, words of the course transcript)."""
+    from catalogue import get_catalogue, iter_catalogue_questions
+    from knowledge_base import get_knowledge_base
+
+    questions = [text for _, _, text in iter_catalogue_questions(get_catalogue().data, ["en"])]
+    words = sorted(set(re.findall(r"[a-z]{4,}", get_knowledge_base().system_prompt.lower())))
+    return questions, words
+
+def synthetic_question(rng: random.Random, questions: list[str], words: list[str]) -> str:
+    tokens = rng.choice(questions).rstrip("?").split()
+    for _ in range(rng.randint(1, 3)):
+        tokens[rng.randrange(len(tokens))] = rng.choice(words)
+    clause = rng.choice(CLAUSES).format(n=rng.randint(1, 52))
+    return f"{' '.join(tokens)} {clause}?"
+
+def respell(rng: random.Random, question: str, typos: int) -> str:
+    chars = list(question.lower().rstrip("?"))
+    for _ in range(typos):
+        i = rng.randrange(1, len(chars) - 1)
+        if rng.random() < 0.5:
+            del chars[i] # Dropped letter
+        else:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i] # Swapped letters
+    text = "".join(chars)
+    return text.capitalize() + rng.choice(["", "??", " ?", "!"])
+
+def adversarial(rng: random.Random, question: str) -> dict[str, str]:
+    """Variants of an inserted question that ask something else, by kind (only the kinds that apply)."""
+    tokens = question.rstrip("?").split()
+    variants = {}
+    position = rng.randrange(1, len(tokens))
+    variants["negation"] = " ".join(tokens[:position] + ["not"] + tokens[position:]) + "?"
+    numbers = [i for i, token in enumerate(tokens) if token.isdigit()]
+    if numbers:
+        i = rng.choice(numbers)
+        variants["number"] = " ".join(tokens[:i] + ["1" + tokens[i]] + tokens[i + 1:]) + "?"
+    for i, token in enumerate(tokens):
+        opposite = next((b if token == a else a for a, b in OPPOSITES if token in (a, b)), None)
+        if opposite is not None:
+            variants["opposite"] = " ".join(tokens[:i] + [opposite] + tokens[i + 1:]) + "?"
+            break
+    return variants
+
+def percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+def main(args):
+    from semantic_cache import NearDuplicateIndex
+
+    rng = random.Random(11)
+    questions, words = vocabulary()
+    inserted, seen = [], set()
+    while len(inserted) < args.entries:
+        question = synthetic_question(rng, questions, words)
+        if question not in seen:
+            seen.add(question)
+            inserted.append(question)
+
+    index = NearDuplicateIndex(max_entries=args.entries, threshold=args.threshold)
+    started = time.perf_counter()
+    for question in inserted:
+        index.insert(question, f"answer to: {question}")
+    insert_seconds = time.perf_counter() - started
+    stats = index.stats()
+    print(f"inserted {len(index):,} questions in {insert_seconds:.1f}s ({insert_seconds / len(inserted) * 1e6:.0f} us each); "
+          f"{stats['terms']:,} terms, {stats['postings']:,} postings")
+
+    originals = rng.sample(inserted, args.queries)
+    fresh = []
+    while len(fresh) < args.queries:
+        question = synthetic_question(rng, questions, words)
+        if question not in seen:
+            fresh.append(question)
+    for label, queries, expected in (("restyled", [respell(rng, q, 0) for q in originals], originals),
+                                     ("1 typo", [respell(rng, q, 1) for q in originals], originals),
+                                     ("2 typos", [respell(rng, q, 2) for q in originals], originals),
+                                     ("new", fresh, None)):
+        timings, hits, correct = [], 0, 0
+        for n, query in enumerate(queries):
+            started = time.perf_counter()
+            answer, score, matched = index.lookup(query)
+            timings.append((time.perf_counter() - started) * 1000)
+            if answer is not None:
+                hits += 1
+                if expected is not None and answer == f"answer to: {expected[n]}":
+                    correct += 1
+        timings.sort()
+        print(f"  {label:<10} p50 {percentile(timings, 50):.3f} ms  p99 {percentile(timings, 99):.3f} ms  "
+              f"max {timings[-1]:.3f} ms  hits {hits / len(queries):6.1%}"
+              + (f"  (right original {correct / max(1, hits):6.1%})" if expected is not None else ""))
+
+    # Adversarial questions: none of them should be served the inserted question's answer
+    for original, _ in KNOWN_FALSE_POSITIVES:
+        index.insert(original, f"answer to: {original}")
+    by_kind = {"known": KNOWN_FALSE_POSITIVES}
+    for original in originals:
+        for kind, question in adversarial(rng, original).items():
+            by_kind.setdefault(kind, []).append((original, question))
+    rejections_before = index.stats()["rejections"]
+    for kind, pairs in by_kind.items():
+        above, served = 0, 0
+        for original, question in pairs:
+            answer, score, _ = index.lookup(question)
+            above += score >= args.threshold
+            served += answer is not None and answer != f"answer to: {question}"
+        print(f"  adversarial {kind:<9} {len(pairs):>5} pairs  above threshold {above / len(pairs):6.1%}  "
+              f"false positives {served} ({served / len(pairs):.2%})")
+    print(f"  guard rejections: {index.stats()['rejections'] - rejections_before}")
+
+    # Past max_entries, inserts replace the oldest entries; lookups stay as fast
+    started = time.perf_counter()
+    for _ in range(args.queries):
+        index.insert(synthetic_question(rng, questions, words), "replacement")
+    print(f"  {args.queries} more inserts at capacity: {(time.perf_counter() - started) / args.queries * 1e6:.0f} us each, "
+          f"{len(index):,} entries, {index.stats()['postings']:,} postings")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000, help="Questions in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups per query kind")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Similarity needed for a hit")
+    main(parser.parse_args())
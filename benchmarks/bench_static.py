@@ -0,0 +1,79 @@
+"""
+Bytes on the wire and in-process latency of the frontend's static files.
+
+Compares the previous serving path (index.html read from disk per request, script.js and
+style.css through StaticFiles, uncompressed) with the in-memory asset store: brotli and gzip
+variants, and 304 revalidation by ETag.
+
+Usage: python benchmarks/bench_static.py [--requests 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.chdir(REPO_DIR)
+
+import logging
+logging.disable(logging.INFO)
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+def baseline_app() -> Starlette:
+    """The serving path before the asset store: a file read per / request and StaticFiles."""
+    async def read_root(request):
+        with open("static/index.html", "r") as f:
+            return HTMLResponse(content=f.read())
+    return Starlette(routes=[Route("/", read_root), Mount("/static", StaticFiles(directory="static"))])
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int, headers: dict) -> tuple[int, int, float]:
+    """(status, wire bytes, mean ms) of GET path with the given request headers."""
+    response = await client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path, headers=headers)
+    mean_ms = (time.perf_counter() - started) * 1000 / requests
+    # httpx decompresses the body; Content-Length is what went over the wire
+    return response.status_code, int(response.headers.get("content-length", 0)), mean_ms
+
+async def main(requests: int):
+    import main as app_module
+    from static_assets import get_static_assets
+
+    store = get_static_assets()
+    paths = ["/", "/static/script.js", "/static/style.css"]
+    hashed = {path: store.url(path) for path in paths}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=baseline_app()), base_url="http://static") as client:
+        print("baseline (disk read / StaticFiles, identity):")
+        for path in paths:
+            status, size, mean_ms = await measure(client, path, requests, {"Accept-Encoding": "identity"})
+            print(f"  {path:<40} {status}  {size:>7,} B  {mean_ms:6.3f} ms")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://static") as client:
+        for label, headers in (("identity", {"Accept-Encoding": "identity"}), ("gzip", {"Accept-Encoding": "gzip"}),
+                               ("br", {"Accept-Encoding": "br, gzip"})):
+            print(f"asset store ({label}):")
+            for path in paths:
+                url = hashed[path]
+                status, size, mean_ms = await measure(client, url, requests, headers)
+                print(f"  {url:<40} {status}  {size:>7,} B  {mean_ms:6.3f} ms")
+        print("asset store (revalidation with If-None-Match):")
+        for path in paths:
+            url = hashed[path]
+            etag = (await client.get(url, headers={"Accept-Encoding": "br, gzip"})).headers["etag"]
+            status, size, mean_ms = await measure(client, url, requests, {"Accept-Encoding": "br, gzip", "If-None-Match": etag})
+            print(f"  {url:<40} {status}  {size:>7,} B  {mean_ms:6.3f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per measurement")
+    asyncio.run(main(parser.parse_args().requests))
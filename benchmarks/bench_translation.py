@@ -0,0 +1,93 @@
+"""
+Upstream tokens of the "direct" and "translate" language pipelines against the local fake Gemini backend.
+
+Every catalogue question is answered in English first, then in each of the other languages of
+language_map, by id, with an empty answer cache. Reports upstream calls and input/output tokens
+(as counted by the fake from what is actually sent) for the English phase and for the non-English
+phase, per knowledge mode. In direct mode every language is a full generation with the knowledge
+base. In translate mode the non-English phase only translates the cached English answers.
+
+Usage: python benchmarks/bench_translation.py [--answer-tokens 600] [--knowledge-modes retrieval,full]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+os.environ["CONTEXT_CACHE_ENABLED"] = "false" # Measure what is sent, not what the provider discounts
+os.environ.setdefault("GEMINI_TPM_LIMIT", "0") # Token counts are the point here, not quota pacing
+
+import logging
+logging.disable(logging.WARNING)
+
+from benchmarks.fake_gemini import FakeBackendConfig, FakeGenerativeModel, install
+
+def configure(knowledge_mode: str, pipeline: str):
+    """Switches chat_logic to the given modes with cold models and an empty answer cache."""
+    import chat_logic
+    from answer_cache import AnswerCache, MemoryAnswerCache
+
+    chat_logic.KNOWLEDGE_MODE = knowledge_mode
+    chat_logic.LANGUAGE_PIPELINE = pipeline
+    chat_logic._translation_model = None
+    chat_logic.reload_knowledge(force=True) # A fresh version: models and fingerprints are rebuilt for the new modes
+    chat_logic.answer_cache = AnswerCache(MemoryAnswerCache(max_entries=100000), None)
+
+async def run_phase(question_ids: list[int], languages: list[str]) -> dict:
+    import chat_logic
+    from catalogue import get_catalogue
+
+    before, calls_before = chat_logic.token_usage.stats(), FakeGenerativeModel.stats.calls
+    for language in languages:
+        await asyncio.gather(*(
+            chat_logic.generate_answer_text_async(
+                "bench-translation", get_catalogue().text(question_id, language), language, question_id=question_id
+            )
+            for question_id in question_ids
+        ))
+    after = chat_logic.token_usage.stats()
+    answers = len(question_ids) * len(languages)
+    return {
+        "answers": answers,
+        "calls": FakeGenerativeModel.stats.calls - calls_before,
+        "input_tokens": after["input_tokens"] - before["input_tokens"],
+        "output_tokens": after["output_tokens"] - before["output_tokens"],
+    }
+
+def report(label: str, phase: dict) -> str:
+    per_answer = phase["input_tokens"] / phase["answers"] if phase["answers"] else 0
+    return (f"{label:<12} answers {phase['answers']:>4}  calls {phase['calls']:>4}  input {phase['input_tokens']:>9,}  "
+            f"({per_answer:>7,.0f}/answer)  output {phase['output_tokens']:>8,}")
+
+async def main(args):
+    import chat_logic
+    from catalogue import get_catalogue, iter_catalogue_questions
+
+    install(FakeBackendConfig(latency_ms=1, jitter_ms=0, answer_tokens=args.answer_tokens, unique_answers=True))
+    catalogue = get_catalogue()
+    question_ids = sorted({question_id for question_id, _, _ in iter_catalogue_questions(catalogue.data, ["en"])})
+    other_languages = [language for language in chat_logic.language_map if language != "en"]
+    print(f"{len(question_ids)} questions x {len(chat_logic.language_map)} languages, "
+          f"fake answers of ~{args.answer_tokens} tokens")
+
+    for knowledge_mode in args.knowledge_modes.split(","):
+        results = {}
+        for pipeline in ("direct", "translate"):
+            configure(knowledge_mode, pipeline)
+            english = await run_phase(question_ids, ["en"])
+            others = await run_phase(question_ids, other_languages)
+            results[pipeline] = others
+            print(f"[{knowledge_mode}/{pipeline}]")
+            print("  " + report("english", english))
+            print("  " + report("non-english", others))
+        ratio = results["direct"]["input_tokens"] / max(1, results["translate"]["input_tokens"])
+        print(f"[{knowledge_mode}] non-English input tokens: translate uses 1/{ratio:.1f} of direct")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answer-tokens", type=int, default=600, help="Length of the fake English answers")
+    parser.add_argument("--knowledge-modes", default="retrieval,full", help="Comma-separated knowledge modes to compare")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,160 @@
+"""
+Throughput of 1..N uvicorn worker processes sharing state, against the local fake Gemini backend.
+
+For each worker count a real server is started (uvicorn benchmarks.fake_server:app --workers N, with
+a fresh shared-state file) and driven over HTTP in two phases:
+  cold  every catalogue question is asked by --duplicates clients at once, spread over the workers.
+        Reports upstream calls: with shared state it stays at one per question, without it each
+        worker that receives the question generates it.
+  warm  closed-loop clients ask random catalogue questions (answer cache hits) for --duration
+        seconds. Reports requests/s and latency: this is the CPU-bound path that more workers scale.
+The load comes from --client-processes processes so the client is not the bottleneck. Throughput
+can only scale up to the number of cores available to both the server and the clients.
+
+Usage: python benchmarks/bench_workers.py [--workers 1,2,4] [--duration 10] [--clients 64] [--no-shared-state]
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import httpx
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(workers: int, port: int, state_dir: str, shared_state: bool, latency_ms: float) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "FAKE_GEMINI_LATENCY_MS": str(latency_ms),
+        "FAKE_GEMINI_CALL_LOG": os.path.join(state_dir, "calls.log"),
+        "ANSWER_STORE_PATH": os.path.join(state_dir, "no-answer-store.json"), # Every question goes through the cache
+        "FREE_TEXT_PER_MINUTE": "0",
+        "CONTEXT_CACHE_ENABLED": "false",
+        "GEMINI_RPM_LIMIT": "0",
+        "GEMINI_TPM_LIMIT": "0",
+    }
+    # The worker count is passed with --workers rather than WEB_CONCURRENCY, which would turn sharing on by itself
+    env.pop("WEB_CONCURRENCY", None)
+    env.pop("ANSWER_CACHE_SQLITE_PATH", None)
+    env.pop("SHARED_STATE_PATH", None)
+    if shared_state:
+        env["SHARED_STATE_PATH"] = os.path.join(state_dir, "shared.sqlite3")
+    command = [sys.executable, "-m", "uvicorn", "benchmarks.fake_server:app", "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    log = open(os.path.join(state_dir, "server.log"), "w")
+    return subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+def upstream_calls(state_dir: str) -> tuple[int, int]:
+    """(upstream calls, distinct worker processes that made them) from the fake's call log."""
+    try:
+        with open(os.path.join(state_dir, "calls.log")) as f:
+            pids = f.read().split()
+    except FileNotFoundError:
+        return 0, 0
+    return len(pids), len(set(pids))
+
+async def cold_phase(base_url: str, question_ids: list[int], duplicates: int, concurrency: int) -> float:
+    """Asks every question `duplicates` times concurrently; returns the wall time."""
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def ask(question_id):
+            async with slots:
+                response = await client.post("/chat", json={"question_id": question_id, "language": "en"})
+                response.raise_for_status()
+        started = time.perf_counter()
+        requests = [question_id for question_id in question_ids for _ in range(duplicates)]
+        await asyncio.gather(*(ask(question_id) for question_id in requests))
+        return time.perf_counter() - started
+
+def warm_client_process(base_url: str, question_ids: list[int], clients: int, duration: float, seed: int) -> list[float]:
+    """Runs `clients` closed-loop clients for `duration` seconds in this process; returns their latencies."""
+    async def run():
+        rng = random.Random(seed)
+        latencies = []
+        limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+            deadline = time.perf_counter() + duration
+
+            async def loop():
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.post("/chat", json={"question_id": rng.choice(question_ids), "language": "en"})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(loop() for _ in range(clients)))
+        return latencies
+    return asyncio.run(run())
+
+def warm_phase(base_url: str, question_ids: list[int], clients: int, processes: int, duration: float) -> list[float]:
+    per_process = max(1, clients // processes)
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(warm_client_process, base_url, question_ids, per_process, duration, seed)
+                   for seed in range(processes)]
+        return [latency for future in futures for latency in future.result()]
+
+def pick(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1000
+
+def main(args):
+    from catalogue import get_catalogue, iter_catalogue_questions
+
+    os.chdir(REPO_DIR)
+    question_ids = sorted({question_id for question_id, _, _ in iter_catalogue_questions(get_catalogue().data, ["en"])})
+    print(f"{len(question_ids)} catalogue questions, {os.cpu_count()} CPUs, shared state: {not args.no_shared_state}")
+    baseline = None
+    for workers in [int(n) for n in args.workers.split(",")]:
+        with tempfile.TemporaryDirectory() as state_dir:
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            server = start_server(workers, port, state_dir, not args.no_shared_state, args.latency_ms)
+            try:
+                wait_ready(base_url)
+                cold_seconds = asyncio.run(cold_phase(base_url, question_ids, args.duplicates, args.clients))
+                calls, calling_workers = upstream_calls(state_dir)
+                latencies = sorted(warm_phase(base_url, question_ids, args.clients, args.client_processes, args.duration))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        throughput = len(latencies) / args.duration
+        baseline = baseline or throughput
+        print(f"workers {workers:>2}  cold: {calls:>4} upstream calls for {len(question_ids)} questions "
+              f"(from {calling_workers} workers) in {cold_seconds:5.2f}s  |  warm: {throughput:8.1f} req/s "
+              f"(x{throughput / baseline:4.2f})  p50 {pick(latencies, 50):6.1f} ms  p99 {pick(latencies, 99):6.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of the warm phase")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Processes generating the warm load")
+    parser.add_argument("--duplicates", type=int, default=4, help="Concurrent askers per question in the cold phase")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake upstream latency")
+    parser.add_argument("--no-shared-state", action="store_true", help="Run the workers without shared state, for comparison")
+    main(parser.parse_args())
@@ -0,0 +1,253 @@
+"""
+Local stand-in for genai.GenerativeModel so the service can be measured without spending API quota.
+
+install() patches google.generativeai.GenerativeModel; chat_logic picks the fake up the next time
+it creates a model. FakeContextCacheBackend stands in for the cached-content API.
+
+The fake is configurable: latency distribution (time to first token), output token rate, answer
+length, the fraction of calls that fail with an upstream error or come back blocked, and a
+per-minute request quota enforced like the real API (429 once exceeded).
+"""
+import asyncio
+import hashlib
+import math
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from context_cache import CacheHandle, ContextCacheBackend
+
+# Exceptions raised for injected failures, by FakeBackendConfig.error_kind
+ERROR_KINDS = {
+    "unavailable": lambda: google_exceptions.ServiceUnavailable("fake upstream unavailable"),
+    "rate_limit": lambda: google_exceptions.ResourceExhausted("fake quota exceeded (429)"),
+    "timeout": lambda: google_exceptions.DeadlineExceeded("fake upstream deadline exceeded"),
+    "internal": lambda: google_exceptions.InternalServerError("fake internal error"),
+    "invalid": lambda: google_exceptions.InvalidArgument("fake invalid argument"),
+}
+
+@dataclass
+class FakeBackendConfig:
+    latency_ms: float = 800.0 # Time to first token: mean (uniform/fixed) or median (lognormal)
+    jitter_ms: float = 200.0 # Uniform +/- jitter around the mean
+    latency_distribution: str = "uniform" # "uniform", "fixed" or "lognormal"
+    latency_sigma: float = 0.5 # Shape of the lognormal distribution
+    tokens_per_second: float = 0.0 # Output rate after the first token; 0 = instant (chunk_interval_ms between chunks)
+    answer_tokens: int = 0 # Length of generated answers; 0 = answer_text as is
+    answer_text: str = "## Fake answer\n\n- This answer comes from the local fake Gemini backend.\n"
+    stream_chunks: int = 4 # Number of chunks a streamed answer is split into
+    chunk_interval_ms: float = 50.0 # Delay between streamed chunks when tokens_per_second is 0
+    error_rate: float = 0.0 # Fraction of calls that raise an upstream error
+    error_kind: str = "unavailable" # Key of ERROR_KINDS
+    blocked_rate: float = 0.0 # Fraction of calls that come back blocked (no parts, block_reason SAFETY)
+    quota_rpm: int = 0 # Calls allowed per sliding minute before ResourceExhausted; 0 = no quota
+    unique_answers: bool = False # End every answer with a digest of its prompt, so different prompts differ
+    call_log: str = "" # File that gets a line (the process id) per call, to count calls across worker processes
+
+    def text(self, contents=None) -> str:
+        if not self.answer_tokens:
+            text = self.answer_text
+        else:
+            filler = "Keep the baby close, watch for feeding cues and rest when you can. "
+            text = (filler * (self.answer_tokens * 4 // len(filler) + 1))[: self.answer_tokens * 4]
+        if self.unique_answers:
+            text += f"\n\n(answer {hashlib.sha256(str(contents).encode('utf-8')).hexdigest()[:8]})"
+        return text
+
+class FakeStats:
+    """Counts of what the fake backend did, for reports."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.blocked = 0
+        self.quota_rejections = 0
+        self.call_times = deque() # Monotonic times of calls within the last minute, for quota_rpm
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors, "blocked": self.blocked, "quota_rejections": self.quota_rejections}
+
+class _Part:
+    def __init__(self, text: str):
+        self.text = text
+
+class _Enum:
+    """Mimics a proto enum value: truthy, with a .name."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+class _PromptFeedback:
+    def __init__(self, block_reason: str):
+        self.block_reason = _Enum(block_reason)
+
+    def __str__(self):
+        return f"block_reason: {self.block_reason.name}"
+
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int, cached_content_token_count: int = 0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+def estimate_tokens(text) -> int:
+    return len(str(text or "")) // 4
+
+class FakeResponse:
+    def __init__(self, text: str, usage_metadata: FakeUsageMetadata | None = None, blocked: bool = False):
+        self.parts = [] if blocked else [_Part(text)]
+        self.text = text
+        self.prompt_feedback = _PromptFeedback("SAFETY") if blocked else None
+        self.candidates = []
+        self.usage_metadata = usage_metadata
+
+class FakeGenerativeModel:
+    """Accepts the same constructor arguments as genai.GenerativeModel and answers after a simulated delay."""
+
+    config = FakeBackendConfig()
+    stats = FakeStats()
+
+    def __init__(self, model_name: str = "fake", cached_tokens: int = 0, **kwargs):
+        self.model_name = model_name
+        self.kwargs = kwargs
+        # Tokens of the system instruction held in (fake) cached content
+        self.cached_tokens = cached_tokens
+
+    def _usage(self, contents, text: str) -> FakeUsageMetadata:
+        prompt_tokens = estimate_tokens(contents) + (self.cached_tokens or estimate_tokens(self.kwargs.get("system_instruction")))
+        return FakeUsageMetadata(prompt_tokens, estimate_tokens(text), self.cached_tokens)
+
+    def _latency_s(self) -> float:
+        cfg = self.config
+        if cfg.latency_distribution == "fixed":
+            latency_ms = cfg.latency_ms
+        elif cfg.latency_distribution == "lognormal":
+            latency_ms = random.lognormvariate(math.log(max(cfg.latency_ms, 1e-3)), cfg.latency_sigma)
+        else:
+            latency_ms = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        return max(0.0, latency_ms) / 1000.0
+
+    def _generation_s(self, text: str) -> float:
+        """Time to produce the rest of the answer after the first token."""
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return estimate_tokens(text) / self.config.tokens_per_second
+
+    def _outcome(self) -> str:
+        """Draws "error", "quota", "blocked" or "ok" for one call and counts it."""
+        self.stats.calls += 1
+        if self.config.call_log:
+            with open(self.config.call_log, "a") as f:
+                f.write(f"{os.getpid()}\n")
+        if self.config.quota_rpm:
+            now = time.monotonic()
+            while self.stats.call_times and now - self.stats.call_times[0] >= 60:
+                self.stats.call_times.popleft()
+            if len(self.stats.call_times) >= self.config.quota_rpm:
+                self.stats.quota_rejections += 1
+                return "quota"
+            self.stats.call_times.append(now)
+        draw = random.random()
+        if draw < self.config.error_rate:
+            self.stats.errors += 1
+            return "error"
+        if draw < self.config.error_rate + self.config.blocked_rate:
+            self.stats.blocked += 1
+            return "blocked"
+        return "ok"
+
+    def _error(self, outcome: str) -> Exception:
+        return ERROR_KINDS["rate_limit" if outcome == "quota" else self.config.error_kind]()
+
+    def _response(self, contents, outcome: str) -> FakeResponse:
+        if outcome in ("error", "quota"):
+            raise self._error(outcome)
+        text = self.config.text(contents)
+        return FakeResponse(text, self._usage(contents, text), blocked=outcome == "blocked")
+
+    def generate_content(self, contents, **kwargs):
+        outcome = self._outcome()
+        text = self.config.text(contents)
+        time.sleep(self._latency_s() + (self._generation_s(text) if outcome == "ok" else 0.0))
+        return self._response(contents, outcome)
+
+    async def generate_content_async(self, contents, stream: bool = False, **kwargs):
+        outcome = self._outcome()
+        text = self.config.text(contents)
+        if stream:
+            if outcome in ("error", "quota"):
+                await asyncio.sleep(self._latency_s())
+                raise self._error(outcome)
+            return FakeStream(self.config, self._latency_s(), self._generation_s(text), text,
+                              self._usage(contents, text), blocked=outcome == "blocked")
+        await asyncio.sleep(self._latency_s() + (self._generation_s(text) if outcome == "ok" else 0.0))
+        return self._response(contents, outcome)
+
+class FakeStream:
+    """Async iterator over response chunks, like AsyncGenerateContentResponse with stream=True."""
+
+    def __init__(self, config: FakeBackendConfig, first_chunk_delay_s: float, generation_s: float, text: str,
+                 usage_metadata: FakeUsageMetadata | None = None, blocked: bool = False):
+        self.config = config
+        self.first_chunk_delay_s = first_chunk_delay_s
+        self.generation_s = generation_s
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.blocked = blocked
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.first_chunk_delay_s)
+        if self.blocked:
+            yield FakeResponse("", None, blocked=True)
+            return
+        text = self.text
+        size = max(1, -(-len(text) // self.config.stream_chunks))
+        starts = range(0, len(text), size)
+        if self.generation_s > 0:
+            interval_s = self.generation_s / max(1, len(starts) - 1)
+        else:
+            interval_s = self.config.chunk_interval_ms / 1000.0
+        for index, start in enumerate(starts):
+            if index:
+                await asyncio.sleep(interval_s)
+            # Like the real API, only the final chunk carries the usage totals
+            yield FakeResponse(text[start:start + size], self.usage_metadata if index == len(starts) - 1 else None)
+
+class FakeContextCacheBackend(ContextCacheBackend):
+    """Local stand-in for the Gemini cached-content API, for use with chat_logic.configure_context_cache."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.created = 0
+        self.refreshed = 0
+        self.deleted = 0
+
+    def create(self, model_name, system_instruction, ttl_seconds):
+        if self.fail:
+            raise RuntimeError("fake context cache unavailable")
+        self.created += 1
+        return CacheHandle(f"cachedContents/fake-{self.created}", time.time() + ttl_seconds, estimate_tokens(system_instruction))
+
+    def refresh(self, handle, ttl_seconds):
+        if self.fail:
+            raise RuntimeError("fake context cache unavailable")
+        self.refreshed += 1
+        return CacheHandle(handle.name, time.time() + ttl_seconds, handle.resource)
+
+    def model_for(self, handle, generation_config, safety_settings):
+        return genai.GenerativeModel(model_name="fake-cached", cached_tokens=handle.resource)
+
+    def delete(self, handle):
+        self.deleted += 1
+
+def install(config: FakeBackendConfig | None = None) -> FakeBackendConfig:
+    """Replaces genai.GenerativeModel with the fake and returns the active config."""
+    FakeGenerativeModel.config = config or FakeBackendConfig()
+    FakeGenerativeModel.stats = FakeStats()
+    genai.GenerativeModel = FakeGenerativeModel
+    return FakeGenerativeModel.config
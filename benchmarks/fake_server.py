@@ -0,0 +1,25 @@
+"""
+main:app with the fake Gemini backend installed, for benchmarks that run real server processes:
+
+    uvicorn benchmarks.fake_server:app --workers 4
+
+The fake is configured from FAKE_GEMINI_LATENCY_MS, FAKE_GEMINI_ANSWER_TOKENS and
+FAKE_GEMINI_CALL_LOG (a file that gets one line per upstream call, from every worker).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+
+from benchmarks.fake_gemini import FakeBackendConfig, install
+
+install(FakeBackendConfig(
+    latency_ms=float(os.getenv("FAKE_GEMINI_LATENCY_MS", "200")),
+    jitter_ms=0,
+    answer_tokens=int(os.getenv("FAKE_GEMINI_ANSWER_TOKENS", "400")),
+    unique_answers=True,
+    call_log=os.getenv("FAKE_GEMINI_CALL_LOG", ""),
+))
+
+from main import app # noqa: E402
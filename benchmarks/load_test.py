@@ -0,0 +1,241 @@
+"""
+Load test of main:app against the local fake Gemini backend (no API quota is used).
+
+Drives /chat (or /chat/stream) with concurrent closed-loop clients in-process and reports:
+  - throughput and p50/p95/p99 latency (plus time to first chunk when streaming),
+  - event-loop lag while under load,
+  - memory growth per 10k new sessions.
+Results are written as JSON (with the git commit) so runs can be compared across commits.
+
+Usage:
+  python benchmarks/load_test.py --clients 50 --requests 20 --unique-ratio 0.3 \
+      --latency-ms 800 --tokens-per-second 80 --error-rate 0.02 --blocked-rate 0.01 --stream
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+# Every simulated user shares one client IP, so the per-client free-text limit is off
+os.environ.setdefault("FREE_TEXT_PER_MINUTE", "0")
+
+import httpx
+
+from benchmarks.fake_gemini import ERROR_KINDS, FakeBackendConfig, FakeGenerativeModel, install
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(50) * 1000, 2),
+        "p95_ms": round(pick(95) * 1000, 2),
+        "p99_ms": round(pick(99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+def rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # Peak, not current, outside Linux
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up; a blocked event loop shows up as lag."""
+
+    def __init__(self, interval_s: float = 0.01):
+        self.interval_s = interval_s
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval_s))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+def menu_questions() -> list[int]:
+    from catalogue import iter_catalogue_questions, load_catalogue
+    return [question_id for question_id, _, _ in iter_catalogue_questions(load_catalogue(), ["en"])]
+
+async def run_load(client: httpx.AsyncClient, args) -> dict:
+    questions = menu_questions()
+    latencies, first_chunk, statuses = [], [], {}
+
+    def pick_question() -> dict:
+        if random.random() < args.unique_ratio:
+            return {"message": f"Load test question {uuid.uuid4()}"}
+        return {"question_id": random.choice(questions)}
+
+    async def one_request(session_id):
+        payload = {**pick_question(), "language": "en", "session_id": session_id}
+        started = time.perf_counter()
+        if args.stream:
+            async with client.stream("POST", "/chat/stream", json=payload) as response:
+                outcome = str(response.status_code)
+                seen_delta = False
+                async for line in response.aiter_lines():
+                    if line.startswith("event: delta") and not seen_delta:
+                        seen_delta = True
+                        first_chunk.append(time.perf_counter() - started)
+                    elif line.startswith("event: blocked") or line.startswith("event: error"):
+                        outcome = line.split(": ", 1)[1]
+        else:
+            response = await client.post("/chat", json=payload)
+            outcome = str(response.status_code)
+        latencies.append(time.perf_counter() - started)
+        statuses[outcome] = statuses.get(outcome, 0) + 1
+
+    async def chat_client():
+        session_id = str(uuid.uuid4()) # Each client keeps one session, like a browser tab
+        for _ in range(args.requests):
+            await one_request(session_id)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(chat_client() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    return {
+        "requests": len(latencies),
+        "wall_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency": percentiles(latencies),
+        "time_to_first_chunk": percentiles(first_chunk) if args.stream else None,
+        "outcomes": statuses,
+        "event_loop_lag": percentiles(monitor.lags),
+    }
+
+async def run_sessions(client: httpx.AsyncClient, sessions: int) -> dict:
+    """Sends one request per new session (cached answer) and measures how much memory they retain."""
+    import chat_logic
+
+    question = "Load test session question"
+    await client.post("/chat", json={"message": question}) # Warm the answer cache
+    gc.collect()
+    before = rss_bytes()
+    sessions_before = len(chat_logic.active_models)
+    for start in range(0, sessions, 100):
+        await asyncio.gather(*(client.post("/chat", json={"message": question}) for _ in range(min(100, sessions - start))))
+    gc.collect()
+    growth = rss_bytes() - before
+    return {
+        "sessions_created": sessions,
+        "registry_size_before": sessions_before,
+        "registry_size_after": len(chat_logic.active_models),
+        "rss_growth_bytes": growth,
+        "rss_growth_per_10k_sessions_bytes": round(growth * 10000 / sessions) if sessions else None,
+    }
+
+async def main(args):
+    import logging
+    logging.disable(logging.INFO)
+    import main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        load = await run_load(client, args)
+        sessions = await run_sessions(client, args.sessions) if args.sessions else None
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": vars(args),
+        "load": load,
+        "sessions": sessions,
+        "fake_backend": FakeGenerativeModel.stats.to_dict(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--unique-ratio", type=float, default=0.3, help="Fraction of requests with a never-seen question")
+    parser.add_argument("--stream", action="store_true", help="Use /chat/stream instead of /chat")
+    parser.add_argument("--sessions", type=int, default=10000, help="New sessions for the memory phase (0 to skip)")
+    parser.add_argument("--use-answer-store", action="store_true", help="Serve menu questions from the precomputed store")
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--latency-distribution", choices=["uniform", "fixed", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--answer-tokens", type=int, default=350)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-kind", choices=sorted(ERROR_KINDS), default="unavailable")
+    parser.add_argument("--blocked-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results"), help="Directory (or .json file) for the results")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not args.use_answer_store:
+        os.environ["ANSWER_STORE_PATH"] = os.path.join(BENCH_DIR, "no-answer-store.json")
+    install(FakeBackendConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        latency_distribution=args.latency_distribution,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+        error_kind=args.error_kind,
+        blocked_rate=args.blocked_rate,
+    ))
+
+    results = asyncio.run(main(args))
+
+    output = args.output
+    if not output.endswith(".json"):
+        os.makedirs(output, exist_ok=True)
+        output = os.path.join(output, f"load_test-{time.strftime('%Y%m%d-%H%M%S')}-{(results['commit'] or 'nogit')[:8]}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    load = results["load"]
+    print(f"{load['requests']} requests in {load['wall_seconds']}s -> {load['throughput_rps']} req/s; outcomes {load['outcomes']}")
+    print(f"latency p50/p95/p99: {load['latency']['p50_ms']}/{load['latency']['p95_ms']}/{load['latency']['p99_ms']} ms")
+    if load["time_to_first_chunk"]:
+        ttfc = load["time_to_first_chunk"]
+        print(f"time to first chunk p50/p95/p99: {ttfc.get('p50_ms')}/{ttfc.get('p95_ms')}/{ttfc.get('p99_ms')} ms")
+    print(f"event loop lag p99/max: {load['event_loop_lag']['p99_ms']}/{load['event_loop_lag']['max_ms']} ms")
+    if results["sessions"]:
+        print(f"memory growth per 10k sessions: {results['sessions']['rss_growth_per_10k_sessions_bytes'] / 1024:.0f} KiB "
+              f"(registry {results['sessions']['registry_size_before']} -> {results['sessions']['registry_size_after']})")
+    print(f"results written to {output}")
@@ -0,0 +1,162 @@
+"""
+Warmup and incremental build of the precomputed answer store.
+
+For every question in the menu catalogue, in every language of language_map the catalogue has a
+translation for, generates an answer unless the store already holds one with the current prompt
+hash (model, generation config, system instruction and the full question prompt; see
+chat_logic.answer_prompt_hash). In retrieval mode, editing part of the knowledge base therefore
+only regenerates the answers whose retrieved passages changed.
+
+Answers are generated concurrently at background priority, through the same rate limiter, retries
+and circuit breaker as the server. The store is saved every SAVE_EVERY_ANSWERS answers or
+SAVE_EVERY_SECONDS seconds, in a worker thread so generation goes on meanwhile, and once more when
+the run ends or is interrupted, so a new run resumes where it stopped. The run ends with a throughput
+and token report.
+
+With LANGUAGE_PIPELINE=translate (the default), each question's English answer is generated once and
+shared by the translations into the other languages.
+
+Usage: python build_answers.py [--concurrency 4] [--languages en,hi] [--rebuild] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from answer_store import ANSWER_STORE_PATH, AnswerStore
+from catalogue import iter_catalogue_questions, load_catalogue
+from chat_logic import (AnswerBlockedError, answer_prompt_hash, generate_answer_text_async, language_map, logger,
+                        token_usage)
+from rate_limiter import PRIORITY_BACKGROUND
+
+BUILD_SESSION_ID = "answer-store-build"
+# Saving rewrites the whole file, so it is done in batches rather than after every answer
+SAVE_EVERY_ANSWERS = int(os.getenv("ANSWER_STORE_SAVE_EVERY_ANSWERS", "20"))
+SAVE_EVERY_SECONDS = float(os.getenv("ANSWER_STORE_SAVE_EVERY_SECONDS", "30"))
+
+class StoreSaver:
+    """Saves a store under construction in batches, off the event loop."""
+
+    def __init__(self, store: AnswerStore, path: str, every_answers: int = SAVE_EVERY_ANSWERS,
+                 every_seconds: float = SAVE_EVERY_SECONDS, clock=time.monotonic):
+        self.store = store
+        self.path = path
+        self.every_answers = every_answers
+        self.every_seconds = every_seconds
+        self.clock = clock
+        self.pending = 0 # Answers added since the last save
+        self.last_saved = clock()
+        self.saves = 0
+        self._write_lock = threading.Lock() # One writer of the file (and its .tmp) at a time
+
+    def _write(self, snapshot: AnswerStore):
+        with self._write_lock:
+            snapshot.save(self.path)
+            self.saves += 1
+
+    async def added(self):
+        """Notes a new answer, and saves if the batch is full or the last save is old enough."""
+        self.pending += 1
+        if self.pending >= self.every_answers or self.clock() - self.last_saved >= self.every_seconds:
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        # A snapshot, so the thread does not iterate the store while answers keep arriving
+        snapshot, pending = self.store.snapshot(), self.pending
+        self.pending, self.last_saved = 0, self.clock()
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError as e:
+            logger.error(f"Could not save answer store {self.path}: {e}")
+            self.pending += pending
+
+    def flush_now(self):
+        """Saves what is pending on the calling thread: the final save, also when the run was interrupted."""
+        if self.pending:
+            self._write(self.store.snapshot())
+            self.pending = 0
+
+def plan_build(store: AnswerStore, languages) -> tuple[list, dict]:
+    """Returns the (question_id, language, question, prompt_hash) entries to generate and counts by state."""
+    todo, counts = [], {"current": 0, "missing": 0, "stale": 0}
+    for question_id, language, question in iter_catalogue_questions(load_catalogue(), languages):
+        prompt_hash = answer_prompt_hash(question, language)
+        entry = store.entry(question, language)
+        if entry is not None and entry.get("prompt_hash") == prompt_hash:
+            counts["current"] += 1
+            continue
+        counts["missing" if entry is None else "stale"] += 1
+        todo.append((question_id, language, question, prompt_hash))
+    return todo, counts
+
+async def build_answer_store(path: str = ANSWER_STORE_PATH, concurrency: int = 4, languages=None,
+                             rebuild: bool = False, dry_run: bool = False) -> dict:
+    """Generates every missing or stale answer and returns a report of what was done."""
+    store = AnswerStore() if rebuild else AnswerStore.load(path)
+    todo, counts = plan_build(store, languages or list(language_map))
+    logger.info(f"Answer store {path}: {counts['current']} current, {counts['missing']} missing, {counts['stale']} stale")
+    report = {"planned": counts, "generated": 0, "failed": 0}
+    if dry_run or not todo:
+        return report
+
+    usage_before = token_usage.stats()
+    started = time.perf_counter()
+    slots = asyncio.Semaphore(concurrency)
+    saver = StoreSaver(store, path, SAVE_EVERY_ANSWERS, SAVE_EVERY_SECONDS)
+
+    async def build_one(question_id, language, question, prompt_hash):
+        async with slots:
+            try:
+                answer = await generate_answer_text_async(BUILD_SESSION_ID, question, language, PRIORITY_BACKGROUND,
+                                                         question_id=question_id)
+            except AnswerBlockedError as e:
+                logger.warning(f"Skipping blocked question {question_id} ({language}): {e}")
+                report["failed"] += 1
+                return
+            except Exception as e:
+                logger.error(f"Failed to generate question {question_id} ({language}): {e}")
+                report["failed"] += 1
+                return
+            store.add(question_id, question, language, answer, prompt_hash)
+            report["generated"] += 1
+            logger.info(f"[{report['generated'] + report['failed']}/{len(todo)}] Generated question {question_id} ({language})")
+        # Outside the slot: a save in progress does not hold up the next generation
+        await saver.added()
+
+    try:
+        await asyncio.gather(*(build_one(*item) for item in todo))
+    finally:
+        # Also on Ctrl+C (asyncio.run cancels the build), so the next run keeps what this one paid for
+        saver.flush_now()
+
+    elapsed = time.perf_counter() - started
+    usage_after = token_usage.stats()
+    spent = {key: usage_after[key] - usage_before[key] for key in ("input_tokens", "cached_input_tokens", "output_tokens")}
+    report.update(
+        elapsed_seconds=round(elapsed, 1),
+        answers_per_minute=round(report["generated"] * 60 / elapsed, 1) if elapsed else None,
+        tokens=spent,
+        tokens_per_answer=round((spent["input_tokens"] + spent["output_tokens"]) / report["generated"]) if report["generated"] else None,
+    )
+    logger.info(
+        f"Answer store {path}: {len(store)} answers, {report['generated']} generated, {report['failed']} failed "
+        f"in {report['elapsed_seconds']}s ({report['answers_per_minute']} answers/min); tokens: input {spent['input_tokens']} "
+        f"(cached {spent['cached_input_tokens']}), output {spent['output_tokens']}, {report['tokens_per_answer']} per answer"
+    )
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=4, help="Answers generated at the same time.")
+    parser.add_argument("--languages", help="Comma-separated language codes (default: every language in language_map).")
+    parser.add_argument("--rebuild", action="store_true", help="Discard existing answers and regenerate everything.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many answers are current, missing or stale.")
+    parser.add_argument("--path", default=ANSWER_STORE_PATH)
+    args = parser.parse_args()
+    languages = args.languages.split(",") if args.languages else None
+    report = asyncio.run(build_answer_store(args.path, args.concurrency, languages, args.rebuild, args.dry_run))
+    sys.exit(1 if report["failed"] else 0)
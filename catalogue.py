@@ -0,0 +1,127 @@
+"""
+Server-owned question catalogue: the categories and questions the menu offers (data/catalogue.json).
+
+The catalogue is loaded once into an index, so requests can refer to a question by its integer id.
+Lookups and cache keys then never depend on text sent by the client. Each language's menu is
+serialized once, with an ETag, for GET /catalogue.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_PATH = os.getenv("CATALOGUE_PATH", "data/catalogue.json")
+DEFAULT_LANGUAGE = "en"
+
+_whitespace_re = re.compile(r"\s+")
+
+def normalize_question(text: str) -> str:
+    """Canonical form of a question used for lookups (case and whitespace insensitive)."""
+    return _whitespace_re.sub(" ", text).strip().casefold()
+
+def load_catalogue(path: str = CATALOGUE_PATH) -> dict:
+    """Loads the raw question catalogue."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def iter_catalogue_questions(catalogue: dict, languages):
+    """Yields (question_id, language, question_text) for every question the menu offers in each language."""
+    for category in catalogue["categories"]:
+        for question in category["questions"]:
+            for language in languages:
+                text = question["text"].get(language)
+                if text:
+                    yield question["id"], language, text
+
+class Catalogue:
+    """
+    Indexed catalogue: question id -> texts, normalized text (any language) -> question id, and the
+    pre-serialized menu of every language that has at least one category name.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.version = data.get("version")
+        self._texts: dict[int, dict] = {} # Question id -> {language: text}
+        self._ids_by_text: dict[str, int] = {} # Normalized text -> question id
+        languages = set()
+        for category in data.get("categories", []):
+            languages.update(category["name"])
+            for question in category["questions"]:
+                self._texts[question["id"]] = question["text"]
+                for text in question["text"].values():
+                    self._ids_by_text[normalize_question(text)] = question["id"]
+        # Language -> (JSON body, ETag)
+        self._menus = {language: self._serialize(self.menu(language)) for language in sorted(languages)}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self._texts
+
+    @property
+    def languages(self) -> list[str]:
+        return list(self._menus)
+
+    def text(self, question_id: int, language: str = DEFAULT_LANGUAGE) -> str | None:
+        """The question in `language`, else in English; None for an unknown id."""
+        texts = self._texts.get(question_id)
+        if texts is None:
+            return None
+        return texts.get(language) or texts.get(DEFAULT_LANGUAGE) or next(iter(texts.values()), None)
+
+    def resolve(self, question_text: str) -> int | None:
+        """Id of the catalogue question with this text (in any language), or None for free text."""
+        return self._ids_by_text.get(normalize_question(question_text))
+
+    def menu(self, language: str) -> dict:
+        """Categories named in `language` with their questions in that language, as {id, text} pairs."""
+        categories = []
+        for category in self.data.get("categories", []):
+            name = category["name"].get(language)
+            if not name:
+                continue
+            questions = [
+                {"id": question["id"], "text": question["text"][language]}
+                for question in category["questions"] if question["text"].get(language)
+            ]
+            categories.append({"id": category["id"], "icon": category.get("icon"), "name": name, "questions": questions})
+        return {"version": self.version, "language": language, "categories": categories}
+
+    def menu_json(self, language: str) -> tuple[bytes, str] | None:
+        """(UTF-8 JSON body, ETag) of the language's menu, or None if the catalogue has no menu in that language."""
+        return self._menus.get(language)
+
+    @staticmethod
+    def _serialize(menu: dict) -> tuple[bytes, str]:
+        body = json.dumps(menu, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return body, f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+    @classmethod
+    def load(cls, path: str = CATALOGUE_PATH) -> "Catalogue":
+        """Loads and indexes the catalogue. A missing or unreadable file yields an empty catalogue."""
+        try:
+            return cls(load_catalogue(path))
+        except FileNotFoundError:
+            logger.error(f"No question catalogue at {path}. Only free-text questions will be accepted.")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not read question catalogue {path}: {e}")
+        return cls({"categories": []})
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+def get_catalogue() -> Catalogue:
+    """The process-wide catalogue, loaded on first use."""
+    global _catalogue
+    if _catalogue is None:
+        with _catalogue_lock:
+            if _catalogue is None:
+                _catalogue = Catalogue.load(CATALOGUE_PATH)
+                logger.info(f"Loaded {len(_catalogue)} catalogue questions in {len(_catalogue.languages)} languages")
+    return _catalogue
@@ -0,0 +1,211 @@
+"""
+Provider-side context caching of the static system prompt.
+
+In full knowledge mode every request carries the same ~120 KB system instruction. Gemini can hold
+that prefix as cached content, so requests only reference it and the cached tokens are billed at
+the reduced rate instead of being re-uploaded and re-tokenized each time.
+
+ContextCacheManager owns one cache handle per process, refreshes it before it expires and hands
+out a model bound to it. The provider API sits behind ContextCacheBackend so the manager can be
+exercised against a local stand-in (see benchmarks/fake_gemini.py).
+"""
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheHandle:
+    name: str
+    expire_time: float # Epoch seconds
+    resource: object = None # Backend-specific object (e.g. genai.caching.CachedContent)
+
+class ContextCacheBackend(ABC):
+    """Interface to a provider's context-cache API."""
+
+    @abstractmethod
+    def create(self, model_name: str, system_instruction: str, ttl_seconds: float) -> CacheHandle:
+        """Caches `system_instruction` for `model_name` and returns its handle."""
+
+    @abstractmethod
+    def refresh(self, handle: CacheHandle, ttl_seconds: float) -> CacheHandle:
+        """Extends the handle's lifetime and returns the updated handle."""
+
+    @abstractmethod
+    def model_for(self, handle: CacheHandle, generation_config, safety_settings):
+        """Returns a model object whose generate_content calls reference the cached content."""
+
+    @abstractmethod
+    def delete(self, handle: CacheHandle):
+        """Deletes the cached content."""
+
+class GeminiContextCacheBackend(ContextCacheBackend):
+    """Backend for the Gemini API (google.generativeai.caching)."""
+
+    def __init__(self, load_genai):
+        # Callable returning the configured google.generativeai module (imported lazily by chat_logic)
+        self._load_genai = load_genai
+
+    def create(self, model_name, system_instruction, ttl_seconds):
+        cached = self._load_genai().caching.CachedContent.create(
+            model=model_name,
+            display_name="viraa-care-system-prompt",
+            system_instruction=system_instruction,
+            ttl=int(ttl_seconds),
+        )
+        return CacheHandle(cached.name, cached.expire_time.timestamp(), cached)
+
+    def refresh(self, handle, ttl_seconds):
+        handle.resource.update(ttl=int(ttl_seconds))
+        return CacheHandle(handle.name, handle.resource.expire_time.timestamp(), handle.resource)
+
+    def model_for(self, handle, generation_config, safety_settings):
+        return self._load_genai().GenerativeModel.from_cached_content(
+            handle.resource, generation_config=generation_config, safety_settings=safety_settings
+        )
+
+    def delete(self, handle):
+        handle.resource.delete()
+
+class TokenUsage:
+    """Cumulative input/output token counts from response usage metadata."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage_metadata) -> dict | None:
+        """Adds one response's usage and returns the per-request numbers (None if the response had none)."""
+        if usage_metadata is None:
+            return None
+        prompt = getattr(usage_metadata, "prompt_token_count", 0) or 0
+        cached = getattr(usage_metadata, "cached_content_token_count", 0) or 0
+        output = getattr(usage_metadata, "candidates_token_count", 0) or 0
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt
+            self.cached_tokens += cached
+            self.output_tokens += output
+        # prompt_token_count includes the cached part
+        return {"input_tokens": prompt, "cached_input_tokens": cached, "uncached_input_tokens": prompt - cached, "output_tokens": output}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "input_tokens": self.prompt_tokens,
+                "cached_input_tokens": self.cached_tokens,
+                "uncached_input_tokens": self.prompt_tokens - self.cached_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+class ContextCacheManager:
+    """
+    Keeps one cached-content handle for the system instruction alive and returns models bound to it.
+    Any backend failure is logged and reported as None so callers fall back to an uncached model.
+    """
+
+    def __init__(self, backend: ContextCacheBackend, model_name: str, system_instruction: str,
+                 generation_config, safety_settings, ttl_seconds: float = 3600.0,
+                 refresh_margin_seconds: float = 300.0, retry_after_seconds: float = 60.0, clock=time.time):
+        self.backend = backend
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._handle: CacheHandle | None = None
+        self._model = None
+        self._next_attempt = 0.0
+        self.creations = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def needs_refresh(self) -> bool:
+        """True when the handle is missing or about to expire and a backend call is due."""
+        now = self._clock()
+        if self._handle is not None and self._handle.expire_time - now > self.refresh_margin_seconds:
+            return False
+        return now >= self._next_attempt
+
+    def current_model(self):
+        """The model bound to the current handle, without any backend call (None if there is no valid handle)."""
+        handle = self._handle
+        if handle is None or handle.expire_time <= self._clock():
+            return None
+        return self._model
+
+    def get_model(self):
+        """Returns a model bound to a fresh handle, creating or refreshing the cache if needed. May block."""
+        with self._lock:
+            if self.needs_refresh():
+                self._ensure_fresh_locked()
+            return self.current_model()
+
+    def _ensure_fresh_locked(self):
+        now = self._clock()
+        try:
+            if self._handle is not None and self._handle.expire_time > now:
+                self._handle = self.backend.refresh(self._handle, self.ttl_seconds)
+                self.refreshes += 1
+                logger.info(f"Refreshed context cache {self._handle.name}")
+            else:
+                self._handle = self.backend.create(self.model_name, self.system_instruction, self.ttl_seconds)
+                self._model = self.backend.model_for(self._handle, self.generation_config, self.safety_settings)
+                self.creations += 1
+                logger.info(f"Created context cache {self._handle.name} for {self.model_name}")
+        except Exception as e:
+            self.failures += 1
+            self._next_attempt = now + self.retry_after_seconds
+            logger.error(f"Context cache create/refresh failed (retrying in {self.retry_after_seconds:.0f}s): {e}")
+
+    def switch_instruction(self, system_instruction: str):
+        """
+        Caches `system_instruction` from now on (a new knowledge base version); the next get_model
+        creates the new cache. The old one is not deleted, as calls still bound to it may be running;
+        it expires at the end of its TTL.
+        """
+        with self._lock:
+            if system_instruction == self.system_instruction:
+                return
+            self.system_instruction = system_instruction
+            self._handle, self._model = None, None
+            self._next_attempt = 0.0
+
+    async def run_refresher(self, interval_seconds: float = 60.0):
+        """Background task that keeps the handle fresh so requests never pay for a refresh."""
+        while True:
+            if self.needs_refresh():
+                await asyncio.to_thread(self.get_model)
+            await asyncio.sleep(interval_seconds)
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                try:
+                    self.backend.delete(self._handle)
+                except Exception as e:
+                    logger.warning(f"Could not delete context cache {self._handle.name}: {e}")
+                self._handle, self._model = None, None
+
+    def stats(self) -> dict:
+        handle = self._handle
+        return {
+            "active": self.current_model() is not None,
+            "name": handle.name if handle else None,
+            "expires_in_seconds": round(handle.expire_time - self._clock(), 1) if handle else None,
+            "creations": self.creations,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
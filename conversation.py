@@ -0,0 +1,116 @@
+"""
+Bounded conversation history for follow-up mode.
+
+Answers are normally stateless: each question is answered on its own, which is what lets them be
+stored and cached. In follow-up mode a session keeps a ConversationWindow, and later questions are
+answered with it as context. Its size is capped:
+  - the most recent turns are kept verbatim while they fit in `token_budget`;
+  - older turns are compacted into a one-line summary each (the question and the first sentence of
+    its answer), done locally so compaction costs no upstream call;
+  - the summary keeps its newest lines within `summary_budget`.
+So the memory of a session, and the context sent upstream with each question, stop growing
+once the window is full, however long the conversation gets.
+"""
+import re
+import threading
+from collections import deque
+
+CHARS_PER_TOKEN = 4 # Same rough estimate as chat_logic.estimate_request_tokens
+SUMMARY_QUESTION_CHARS = 200
+SUMMARY_ANSWER_CHARS = 200
+
+_MARKDOWN_PREFIX = re.compile(r"^\s*(#+\s*|[-*•]\s+|\d+\.\s+)") # A list marker needs a space: **bold** is not one
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _clip(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+def answer_gist(answer: str) -> str:
+    """First sentence of the first line of text in a markdown answer (headings and list markers skipped)."""
+    for line in answer.splitlines():
+        line = _MARKDOWN_PREFIX.sub("", line).replace("**", "").strip()
+        if line:
+            return _clip(_SENTENCE_END.split(line, maxsplit=1)[0], SUMMARY_ANSWER_CHARS)
+    return ""
+
+class Turn:
+    __slots__ = ("question", "answer", "tokens")
+
+    def __init__(self, question: str, answer: str):
+        self.question = question
+        self.answer = answer
+        self.tokens = estimate_tokens(question) + estimate_tokens(answer)
+
+class ConversationWindow:
+    """A session's recent turns plus a summary of the older ones, within fixed token budgets."""
+
+    __slots__ = ("token_budget", "summary_budget", "turns", "turn_tokens", "summary", "summary_tokens",
+                 "compacted_turns", "_lock")
+
+    def __init__(self, token_budget: int = 2000, summary_budget: int = 400):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns: deque[Turn] = deque()
+        self.turn_tokens = 0
+        self.summary: deque[str] = deque() # One line per compacted turn, oldest first
+        self.summary_tokens = 0
+        self.compacted_turns = 0
+        self._lock = threading.Lock()
+
+    def is_empty(self) -> bool:
+        return not self.turns and not self.summary
+
+    def add_turn(self, question: str, answer: str):
+        """Appends a completed turn, compacting the oldest turns into the summary while over budget."""
+        with self._lock:
+            turn = Turn(question, answer)
+            self.turns.append(turn)
+            self.turn_tokens += turn.tokens
+            while self.turn_tokens > self.token_budget and len(self.turns) > 1:
+                self._compact(self.turns.popleft())
+            if self.turn_tokens > self.token_budget:
+                # A single turn larger than the whole window: keep the start of its answer
+                question_tokens = estimate_tokens(turn.question)
+                turn.answer = _clip(turn.answer, max(0, self.token_budget - question_tokens) * CHARS_PER_TOKEN)
+                turn.tokens = question_tokens + estimate_tokens(turn.answer)
+                self.turn_tokens = turn.tokens
+
+    def _compact(self, turn: Turn):
+        self.turn_tokens -= turn.tokens
+        line = f'- Asked "{_clip(turn.question, SUMMARY_QUESTION_CHARS)}": {answer_gist(turn.answer)}'
+        self.summary.append(line)
+        self.summary_tokens += estimate_tokens(line)
+        self.compacted_turns += 1
+        while self.summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self.summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def contents(self, prompt: str) -> list[dict]:
+        """
+        Gemini `contents` for the next question, oldest first: the summary of older turns, the
+        window's turns as alternating user/model messages, then `prompt`. The summary goes in front
+        of the first user message, so the roles still alternate.
+        """
+        with self._lock:
+            contents = []
+            for turn in self.turns:
+                contents.append({"role": "user", "parts": [turn.question]})
+                contents.append({"role": "model", "parts": [turn.answer]})
+            summary = "\n".join(self.summary)
+        contents.append({"role": "user", "parts": [prompt]})
+        if summary:
+            first = contents[0]["parts"][0]
+            contents[0] = {"role": "user", "parts": [f"Summary of the earlier conversation:\n{summary}\n\n{first}"]}
+        return contents
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": len(self.turns),
+                "turn_tokens": self.turn_tokens,
+                "summary_lines": len(self.summary),
+                "summary_tokens": self.summary_tokens,
+                "compacted_turns": self.compacted_turns,
+            }
@@ -0,0 +1,190 @@
+"""
+The knowledge base: the answer guidelines and the course transcript, read from data files.
+
+data/knowledge/guidelines.md holds the guidelines part of the system prompt. transcript.md holds
+the transcript, which follows the "**Knowledge Base:**" marker. The full system prompt is
+guidelines + marker + transcript. Each file is copied once to a snapshot named by its content
+hash, and the snapshot is memory-mapped: the workers on a host map the same snapshot, and nothing
+rewrites or truncates it under a running version. Hashing and checking the persisted retrieval
+index read the mapped bytes. Each worker still holds its own str of whatever text it uses: the
+guidelines, the system prompt in full knowledge mode, the retrieval passages, and the full-text
+fallback.
+
+A KnowledgeBase is one immutable version. Its version id is a hash of the system prompt, so keys
+derived from it (answer cache keys, stored-answer hashes) follow every content edit. reload
+publishes a new version atomically. Requests pinned to the previous version (pin) finish on it.
+Values built from a version (retrieval index, models, fingerprints) are kept on it via derived().
+
+Prefer replacing the files to editing them in place (write the new file elsewhere, then rename
+it into place, as git and most deploy tools do). A reload taken in the middle of an in-place write
+sees a partial file.
+"""
+import contextvars
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", "data/knowledge")
+GUIDELINES_FILE = "guidelines.md"
+TRANSCRIPT_FILE = "transcript.md"
+KNOWLEDGE_BASE_MARKER = "**Knowledge Base:**"
+# Where the mapped snapshots of the data files are written. Old ones can be deleted at any time;
+# mappings of a deleted snapshot stay valid.
+KNOWLEDGE_SNAPSHOT_DIR = os.getenv("KNOWLEDGE_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "viraa-knowledge"))
+
+def _map_file(path: str):
+    """
+    Read-only mapping of a snapshot of the file. The snapshot is named by the content hash and
+    written once (to a temporary name, then renamed), so an edit to `path`, in place or not, never
+    reaches a mapping. Returns bytes for an empty file, which cannot be mapped, or when no snapshot
+    can be written.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data:
+        return b""
+    snapshot = os.path.join(KNOWLEDGE_SNAPSHOT_DIR, hashlib.sha256(data).hexdigest()[:32] + os.path.splitext(path)[1])
+    try:
+        if not os.path.exists(snapshot):
+            os.makedirs(KNOWLEDGE_SNAPSHOT_DIR, exist_ok=True)
+            temporary = f"{snapshot}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, snapshot) # Workers writing the same snapshot at once write the same bytes
+        with open(snapshot, "rb") as f:
+            if os.fstat(f.fileno()).st_size != len(data):
+                raise OSError(f"unexpected size {os.fstat(f.fileno()).st_size}")
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError as e:
+        logger.warning(f"Could not map a snapshot of {path} in {KNOWLEDGE_SNAPSHOT_DIR} ({e}); keeping it in memory")
+        return data
+
+def file_signature(directory: str) -> tuple:
+    """(mtime, size, inode) of both files; changes when either is edited or replaced."""
+    signature = []
+    for name in (GUIDELINES_FILE, TRANSCRIPT_FILE):
+        try:
+            stat_result = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            signature.append(None)
+            continue
+        signature.append((stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino))
+    return tuple(signature)
+
+class KnowledgeBase:
+    """One version of the guidelines and transcript."""
+
+    def __init__(self, guidelines_data, transcript_data, directory: str = "", signature: tuple | None = None):
+        self.directory = directory
+        self.signature = signature
+        self._guidelines_data = guidelines_data
+        self._transcript_data = transcript_data
+        # The guidelines are small and part of every call, so each worker keeps them as a str
+        self.guidelines = str(guidelines_data, "utf-8")
+        hasher = hashlib.sha256()
+        self.update_hash(hasher)
+        self.version = hasher.hexdigest()[:16]
+        self.loaded_at = time.time()
+        self._derived = {}
+        self._lock = threading.RLock() # Reentrant: one derived value may be built from another
+
+    @classmethod
+    def load(cls, directory: str = KNOWLEDGE_DIR) -> "KnowledgeBase":
+        signature = file_signature(directory)
+        return cls(
+            _map_file(os.path.join(directory, GUIDELINES_FILE)),
+            _map_file(os.path.join(directory, TRANSCRIPT_FILE)),
+            directory, signature,
+        )
+
+    def update_hash(self, hasher):
+        """Feeds the system prompt's UTF-8 bytes to `hasher`, straight from the mappings."""
+        hasher.update(self._guidelines_data)
+        hasher.update(KNOWLEDGE_BASE_MARKER.encode("utf-8"))
+        hasher.update(self._transcript_data)
+
+    @property
+    def transcript_bytes(self) -> memoryview:
+        return memoryview(self._transcript_data)
+
+    def transcript_text(self) -> str:
+        """The transcript decoded into a new str on every call; callers that keep it cache it with derived()."""
+        return str(self._transcript_data, "utf-8")
+
+    @property
+    def system_prompt(self) -> str:
+        """Guidelines, marker and transcript: the system instruction of full knowledge mode."""
+        return self.derived("system_prompt", lambda: self.guidelines + KNOWLEDGE_BASE_MARKER + self.transcript_text())
+
+    def derived(self, name: str, build):
+        """A value computed from this version, built once on first use."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build()
+            return self._derived[name]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "directory": self.directory,
+            "loaded_at": self.loaded_at,
+            "guidelines_bytes": len(self._guidelines_data),
+            "transcript_bytes": len(self._transcript_data),
+        }
+
+_latest = None
+_latest_lock = threading.Lock()
+# The version a request started on; set per request by main.py
+_pinned: contextvars.ContextVar = contextvars.ContextVar("knowledge_base", default=None)
+
+def latest_knowledge_base() -> KnowledgeBase:
+    """The most recently published version, loaded on first use (or by the startup warmup)."""
+    global _latest
+    if _latest is None:
+        with _latest_lock:
+            if _latest is None:
+                _latest = KnowledgeBase.load(KNOWLEDGE_DIR)
+                logger.info(f"Loaded knowledge base {_latest.version} from {KNOWLEDGE_DIR}")
+    return _latest
+
+def get_knowledge_base() -> KnowledgeBase:
+    """The version the current request is pinned to, else the latest one."""
+    return _pinned.get() or latest_knowledge_base()
+
+def pin(knowledge: KnowledgeBase | None = None) -> contextvars.Token:
+    """Pins the current context (a request) to `knowledge`, by default the latest version."""
+    return _pinned.set(knowledge or latest_knowledge_base())
+
+def unpin(token: contextvars.Token):
+    _pinned.reset(token)
+
+def load_if_changed(force: bool = False) -> KnowledgeBase | None:
+    """
+    A new KnowledgeBase if the files differ from the latest version (always with force), else None.
+    Files that were touched but still hold the same content do not make a new version.
+    """
+    latest = latest_knowledge_base()
+    if not force and file_signature(latest.directory) == latest.signature:
+        return None
+    knowledge = KnowledgeBase.load(latest.directory)
+    if not force and knowledge.version == latest.version:
+        latest.signature = knowledge.signature
+        return None
+    return knowledge
+
+def publish(knowledge: KnowledgeBase):
+    """Makes `knowledge` the latest version. Requests already pinned to the previous one keep it."""
+    global _latest
+    with _latest_lock:
+        previous, _latest = _latest, knowledge
+    logger.info(f"Published knowledge base {knowledge.version} (was {previous.version if previous else None})")
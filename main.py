@@ -1,8 +1,12 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import hmac
 import logging
+import time
 import uuid # To generate unique session IDs
 import os
 
@@ -10,61 +14,190 @@ import os
 # Note the rename of send_message to generate_answer_for_question in chat_logic
 # but we can keep calling it send_message here for consistency if we alias it back in chat_logic.py
 # For clarity, let's use the new name from chat_logic.py
-from chat_logic import generate_answer_for_question, start_new_chat, active_models, logger # active_models instead of active_chats
+from chat_logic import generate_answer_for_question_async, stream_answer_events, start_new_chat, active_models, logger, answer_prompt_hash # active_models instead of active_chats
+from chat_logic import KNOWLEDGE_MODE, get_retrieval_index, token_usage, AnswerBlockedError, generate_answer_text_async
+import chat_logic
+from answer_html import RenderedAnswerCache
+from answer_store import ANSWER_STORE_PATH, AnswerStore
+from catalogue import get_catalogue
+import knowledge_base
+from rate_limiter import PRIORITY_PREFETCH, KeyedRateLimiter
+from resilience import UpstreamUnavailableError, is_upstream_error
+from response_encoding import EncodedAnswer, EncodedAnswerCache, dumps, negotiate
+from static_assets import get_static_assets
+from media import get_media_library
+from metrics import answer_store_lookups, free_text_requests, registry as metrics_registry, request_seconds, stage_seconds
 
 # Define the request body structure
 class ChatRequest(BaseModel):
     session_id: str | None = None
-    message: str # This will now be the text of the selected question
+    question_id: int | None = None # A question from GET /catalogue
+    message: str | None = None # Free-text question, used when no question_id is given
     language: str | None = "en" # Add language, default to English
+    follow_up: bool = False # Answer in the context of this session's earlier questions (see conversation.py)
 
-# Define the response body structure
+# Define the response body structure (documentation only: /chat bodies are built by response_encoding)
 class ChatResponse(BaseModel):
     session_id: str
     response: str # This will be the detailed answer
     media: dict | None = None # Video and audio information
+    response_html: str | None = None # The answer rendered to sanitized HTML (absent when ANSWER_HTML_ENABLED is false)
+
+class BatchChatRequest(BaseModel):
+    session_id: str | None = None
+    question_ids: list[int] | None = None # Catalogue question ids, e.g. every question of a category
+    questions: list[str] | None = None # Catalogue question texts, for clients that predate question_ids
+    language: str | None = "en"
+
+# Limits for /chat/batch: questions per request and how many of them are answered at once
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# Questions that are not in the catalogue each cost a live generation, so they are capped in length
+# and rate limited per client IP (behind a proxy, run uvicorn with --proxy-headers so this is the real client)
+FREE_TEXT_MAX_CHARS = int(os.getenv("FREE_TEXT_MAX_CHARS", "500"))
+free_text_limiter = KeyedRateLimiter(
+    per_minute=float(os.getenv("FREE_TEXT_PER_MINUTE", "6")),
+    burst=float(os.getenv("FREE_TEXT_BURST", "3")),
+    bucket_factory=chat_logic.shared_bucket_factory("free_text"), # Host-wide in multi-worker mode
+)
+
+# How long browsers may use a /catalogue response before revalidating it with If-None-Match
+CATALOGUE_MAX_AGE_SECONDS = int(os.getenv("CATALOGUE_MAX_AGE_SECONDS", "300"))
+
+# Precomputed answers for the question menu (see build_answers.py); misses fall back to live generation.
+# Loaded on first use or by the startup warmup, whichever comes first. Entries are checked against
+# the knowledge base version, so each version has its own (reloaded before the version is published).
+def get_answer_store() -> AnswerStore:
+    return knowledge_base.get_knowledge_base().derived(
+        "answer_store", lambda: AnswerStore.load(ANSWER_STORE_PATH, answer_prompt_hash)
+    )
+
+# Knowledge base hot reload (see knowledge_base.py): the files are polled every KNOWLEDGE_WATCH_SECONDS
+# (0 turns polling off), and POST /admin/reload-knowledge reloads on demand when ADMIN_TOKEN is set.
+KNOWLEDGE_WATCH_SECONDS = float(os.getenv("KNOWLEDGE_WATCH_SECONDS", "30"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def reload_knowledge(force: bool = False) -> knowledge_base.KnowledgeBase | None:
+    """Publishes the knowledge base files if they changed, with the answer store loaded for the new version."""
+    return chat_logic.reload_knowledge(force, prepare=get_answer_store)
+
+async def watch_knowledge_base(interval_seconds: float):
+    """
+    Reloads the knowledge base when its files change. A change is picked up once the files have stayed
+    the same for a whole interval, so both files of a deploy are read as one version. Each worker
+    watches for itself.
+    """
+    seen = failed = None
+    while True:
+        await asyncio.sleep(interval_seconds)
+        signature = knowledge_base.file_signature(knowledge_base.KNOWLEDGE_DIR)
+        if signature != seen:
+            seen = signature
+            continue
+        if signature in (knowledge_base.latest_knowledge_base().signature, failed):
+            continue
+        try:
+            await asyncio.to_thread(reload_knowledge)
+        except Exception as e:
+            failed = signature # Not retried until the files change again
+            logger.error(f"Could not reload the knowledge base, keeping version {knowledge_base.latest_knowledge_base().version}: {e}")
+
+def warm_up():
+    """Loads data files ahead of the first question (runs in a thread after startup)."""
+    get_static_assets()
+    get_media_library()
+    get_catalogue()
+    knowledge_base.latest_knowledge_base()
+    get_answer_store()
+    if KNOWLEDGE_MODE == "retrieval":
+        get_retrieval_index()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts background warmup and context-cache maintenance without delaying startup: the app
+    answers /health and static files immediately, and anything not ready yet is loaded on first use.
+    """
+    background = [asyncio.create_task(asyncio.to_thread(warm_up))]
+    if chat_logic.context_cache is not None:
+        background.append(asyncio.create_task(chat_logic.context_cache.run_refresher()))
+    if KNOWLEDGE_WATCH_SECONDS > 0:
+        background.append(asyncio.create_task(watch_knowledge_base(KNOWLEDGE_WATCH_SECONDS)))
+    yield
+    for task in background:
+        task.cancel()
+    if chat_logic.context_cache is not None:
+        # The cache is per process; drop it rather than paying for storage until the TTL runs out
+        await asyncio.to_thread(chat_logic.context_cache.close)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Viraa Care Categorical Assistant MVP",
     description="A menu-driven assistant using FastAPI and Gemini",
-    version="0.2.0"
+    version="0.2.0",
+    lifespan=lifespan
 )
 
+class KnowledgeBasePinMiddleware:
+    """
+    Pins each HTTP request, streamed responses and the tasks and threads it starts included, to the
+    knowledge base version that is current when it arrives, so a reload never changes its prompt,
+    cache keys or stored answers halfway.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = knowledge_base.pin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            knowledge_base.unpin(token)
+
+app.add_middleware(KnowledgeBasePinMiddleware)
+
+@app.api_route("/static/{name}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_asset(name: str, request: Request):
+    """
+    Top-level static files from memory, precompressed and with ETags. Declared before the /static
+    mount so it takes precedence; files in subdirectories (media) are served by the mount.
+    """
+    response = get_static_assets().response(name, request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
+
+@app.api_route("/media/{asset_id}", methods=["GET", "HEAD"], include_in_schema=False)
+async def media_asset(asset_id: str, request: Request):
+    """Per-answer video and audio by content-addressed name, with byte ranges for seeking."""
+    asset = get_media_library().asset(asset_id)
+    response = await asset.response(request) if asset is not None else None
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
+
 # Mount static files
 try:
     app.mount("/static", StaticFiles(directory="static"), name="static")
 except RuntimeError as e:
     logger.warning(f"Could not mount static directory: {e}. Ensure 'static' directory exists.")
 
-@app.get("/", response_class=HTMLResponse, include_in_schema=False)
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse, include_in_schema=False)
 async def read_root(request: Request):
-    """Serves the HTML interface."""
-    if any(route.name == "static" for route in request.app.router.routes):
-        try:
-            with open("static/index.html", "r") as f:
-                html_content = f.read()
-            return HTMLResponse(content=html_content)
-        except FileNotFoundError:
-             logger.error("static/index.html not found.")
-             raise HTTPException(status_code=404, detail="Frontend not found.")
-    else:
-        logger.error("Static files directory not mounted correctly.")
-        raise HTTPException(status_code=500, detail="Server configuration error: Static files not served.")
-
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(chat_request: ChatRequest):
-    """
-    Receives a selected question, interacts with the Gemini model via chat_logic,
-    and returns the detailed answer.
-    """
-    session_id = chat_request.session_id
-    selected_question = chat_request.message
-    language = chat_request.language or "en" # Ensure language is set, default to English
-
-    if not selected_question:
-        raise HTTPException(status_code=400, detail="Selected question (message) cannot be empty.")
+    """Serves the HTML interface (linking to the content-hashed script and stylesheet)."""
+    response = get_static_assets().response("index.html", request)
+    if response is None:
+        logger.error("static/index.html not found.")
+        raise HTTPException(status_code=404, detail="Frontend not found.")
+    return response
 
+def ensure_session(session_id: str | None) -> str:
+    """Returns a usable session ID, registering a new session if none (or an inactive one) was given."""
     if not session_id:
         session_id = str(uuid.uuid4())
         try:
@@ -73,46 +206,417 @@ async def chat_endpoint(chat_request: ChatRequest):
         except Exception as e:
             logger.error(f"Failed to initialize for new session {session_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Could not initialize session resources: {str(e)}")
-    elif session_id not in active_models: # Check active_models now
-        logger.warning(f"Session ID {session_id} provided but no active model. Initializing.")
+    elif session_id not in active_models: # Unknown, expired or evicted session
+        logger.info(f"Session ID {session_id} provided but not active. Initializing.")
         try:
             start_new_chat(session_id)
         except Exception as e:
             logger.error(f"Failed to initialize for existing session ID {session_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Could not initialize session resources: {str(e)}")
+    else:
+        active_models.touch(session_id) # Keeps the session from idling out
+    return session_id
+
+def retry_after_header(retry_after: float | None) -> dict | None:
+    return {"Retry-After": str(max(1, round(retry_after)))} if retry_after else None
+
+async def resolve_question(chat_request: ChatRequest, language: str, request: Request) -> tuple[int | None, str]:
+    """
+    Returns (question_id, question text) for a chat request. Catalogue questions, given by id or by
+    their exact text, get their id and the catalogue text in `language`. Anything else is free text:
+    question_id is None, and the text is length-checked and rate limited per client.
+    """
+    catalogue = get_catalogue()
+    question_id = chat_request.question_id
+    if question_id is None and chat_request.message:
+        question_id = catalogue.resolve(chat_request.message)
+    if question_id is not None:
+        question_text = catalogue.text(question_id, language)
+        if question_text is None:
+            raise HTTPException(status_code=400, detail=f"Unknown question_id {question_id}.")
+        return question_id, question_text
+
+    question_text = (chat_request.message or "").strip()
+    if not question_text:
+        raise HTTPException(status_code=400, detail="Either question_id or message is required.")
+    if len(question_text) > FREE_TEXT_MAX_CHARS:
+        free_text_requests.inc(result="too_long")
+        raise HTTPException(status_code=400, detail=f"Questions are limited to {FREE_TEXT_MAX_CHARS} characters.")
+    retry_after = await free_text_limiter.try_acquire(request.client.host if request.client else "unknown")
+    if retry_after:
+        free_text_requests.inc(result="rate_limited")
+        raise HTTPException(status_code=429, detail="Too many questions. Please wait a moment before asking another one.",
+                            headers=retry_after_header(retry_after))
+    free_text_requests.inc(result="accepted")
+    return None, question_text
+
+def lookup_answer_for(chat_request: ChatRequest, session_id: str, question_id: int | None, selected_question: str,
+                      language: str) -> str | None:
+    """
+    The precomputed answer for a chat request, if it may be used. In follow-up mode a question asked
+    after others depends on them and is always generated. The first one may come from the store,
+    and is then recorded as the conversation's first turn.
+    """
+    if chat_request.follow_up and chat_logic.in_conversation(session_id):
+        return None
+    answer = lookup_stored_answer(question_id, language)
+    if answer is not None and chat_request.follow_up:
+        chat_logic.get_conversation(session_id).add_turn(selected_question, answer)
+    return answer
+
+def lookup_stored_answer(question_id: int | None, language: str) -> str | None:
+    """The precomputed answer of a catalogue question; free text (no id) is never in the store."""
+    if question_id is None:
+        return None
+    with stage_seconds.time(stage="store_lookup"):
+        answer = get_answer_store().lookup_id(question_id, language)
+    answer_store_lookups.inc(result="hit" if answer is not None else "miss")
+    return answer
+
+# Answers are rendered to HTML on the server, once per distinct answer, so phones skip the markdown pass
+ANSWER_HTML_ENABLED = os.getenv("ANSWER_HTML_ENABLED", "true").lower() == "true"
+rendered_answers = RenderedAnswerCache(
+    max_entries=int(os.getenv("ANSWER_HTML_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("ANSWER_HTML_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+def render_answer(answer: str) -> str | None:
+    """The answer as HTML, rendered once per distinct text; None when server-side rendering is off."""
+    if not ANSWER_HTML_ENABLED:
+        return None
+    with stage_seconds.time(stage="html_render"):
+        return rendered_answers.html(answer)
+
+def build_media_info(question_id: int | None = None) -> dict | None:
+    """Media shown under an answer: the question's own from the media manifest, else the default."""
+    return get_media_library().media_info(question_id)
 
+# /chat bodies are serialized and compressed once per distinct answer; each response only adds its session id
+encoded_answers = EncodedAnswerCache(
+    max_entries=int(os.getenv("ENCODED_ANSWER_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("ENCODED_ANSWER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+def encode_answer(answer: str, question_id: int | None) -> EncodedAnswer:
+    """The answer fields of a /chat response, encoded on the first response with this answer and reused after."""
+    key = EncodedAnswerCache.key(answer, question_id)
+    encoded = encoded_answers.get(key)
+    if encoded is None:
+        fields = {"response": answer, "media": build_media_info(question_id), "response_html": render_answer(answer)}
+        with stage_seconds.time(stage="serialization"):
+            encoded = encoded_answers.put(key, fields)
+    return encoded
+
+@app.get("/catalogue")
+async def catalogue_endpoint(request: Request, lang: str = "en"):
+    """
+    The question menu in one language: {"version", "language", "categories": [{"id", "icon", "name",
+    "questions": [{"id", "text"}]}]}. Served from bytes prepared at load time, with an ETag, so
+    revalidating clients get an empty 304.
+    """
+    menu = get_catalogue().menu_json(lang)
+    if menu is None:
+        raise HTTPException(status_code=404, detail=f"No catalogue for language '{lang}'.")
+    body, etag = menu
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CATALOGUE_MAX_AGE_SECONDS}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip() in (etag, f"W/{etag}", "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(chat_request: ChatRequest, request: Request):
+    """
+    Receives a selected question (question_id) or a free-text message, interacts with the Gemini
+    model via chat_logic, and returns the detailed answer.
+    """
+    language = chat_request.language or "en" # Ensure language is set, default to English
+    question_id, selected_question = await resolve_question(chat_request, language, request)
+
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        # Get the detailed answer from the chat logic
-        bot_answer = generate_answer_for_question(session_id, selected_question, language)
-        
-        # Add media information (for POC - same video/audio for all responses)
-        media_info = {
-            "video": {
-                "url": "/static/media/demo-video.mp4",
-                "type": "video/mp4",
-                "poster": "/static/media/demo-video-poster.jpg"  # Optional poster image
-            },
-            "audio": {
-                "url": "/static/media/demo-audio.mp3",
-                "type": "audio/mpeg"
-            }
-        }
-        
-        return ChatResponse(session_id=session_id, response=bot_answer, media=media_info)
-
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.error(f"Unhandled exception in chat endpoint for session {session_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
+        with stage_seconds.time(stage="session_lookup"):
+            session_id = ensure_session(chat_request.session_id)
+
+        try:
+            # Serve precomputed answers directly; only generate live on a store miss
+            bot_answer = lookup_answer_for(chat_request, session_id, question_id, selected_question, language)
+            if bot_answer is None:
+                bot_answer = await generate_answer_for_question_async(session_id, selected_question, language,
+                                                                      question_id=question_id, follow_up=chat_request.follow_up)
+                outcome = "live"
+            else:
+                logger.info(f"Serving precomputed answer for session {session_id}, language: {language}")
+                outcome = "store"
+
+            encoded = encode_answer(bot_answer, question_id)
+            encoding = negotiate(request.headers.get("accept-encoding", ""), encoded)
+            headers = {"Vary": "Accept-Encoding"}
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            # Serialized here rather than by FastAPI so the time shows up as its own stage
+            with stage_seconds.time(stage="serialization" if encoding == "identity" else "compression"):
+                body = encoded.body(session_id, encoding)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        except HTTPException as e:
+            raise e
+        except UpstreamUnavailableError as e:
+            # Fail fast with a status clients can act on instead of a 200 carrying an apology
+            outcome = "unavailable"
+            logger.warning(f"Upstream unavailable for session {session_id}: {e}")
+            raise HTTPException(status_code=503, detail=e.user_message(), headers=retry_after_header(e.retry_after))
+        except Exception as e:
+            # The error (upstream or internal details) is logged only; clients get a fixed message
+            upstream_error = is_upstream_error(e)
+            outcome = "upstream_error" if upstream_error else "error"
+            logger.error(f"{'Upstream error' if upstream_error else 'Unhandled exception'} in chat endpoint for session {session_id}: {e!r}")
+            raise HTTPException(status_code=502 if upstream_error else 500, detail=chat_logic.GENERATION_ERROR_MESSAGE)
+    finally:
+        request_seconds.observe(time.perf_counter() - started, endpoint="chat", outcome=outcome)
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Formats one server-sent event."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_request: ChatRequest, request: Request):
+    """
+    Same input as /chat, but streams the answer as server-sent events so the first words arrive
+    long before generation finishes. Events, in order:
+      session  {"session_id"}                    always first
+      delta    {"text"}                          zero or more answer chunks
+      blocked  {"reason", "safety_issues", "message"}  content was blocked (terminal)
+      error    {"message", "retry_after"}        generation failed (terminal)
+      done     {"session_id", "media", "response_html"}  answer complete (terminal); response_html is the
+                                                 whole answer rendered, to replace the client's own rendering
+    """
+    language = chat_request.language or "en"
+    question_id, selected_question = await resolve_question(chat_request, language, request)
+
+    started = time.perf_counter()
+    with stage_seconds.time(stage="session_lookup"):
+        session_id = ensure_session(chat_request.session_id)
+
+    async def event_stream():
+        outcome = "error"
+        serialization_seconds = 0.0
+
+        def serialize(event, data):
+            nonlocal serialization_seconds
+            serialize_started = time.perf_counter()
+            frame = format_sse(event, data)
+            serialization_seconds += time.perf_counter() - serialize_started
+            return frame
+
+        answer_parts = []
+        try:
+            yield serialize("session", {"session_id": session_id})
+
+            stored_answer = lookup_answer_for(chat_request, session_id, question_id, selected_question, language)
+            if stored_answer is not None:
+                logger.info(f"Streaming precomputed answer for session {session_id}, language: {language}")
+                outcome = "store"
+                answer_parts.append(stored_answer)
+                yield serialize("delta", {"text": stored_answer})
+            else:
+                async for event, data in stream_answer_events(session_id, selected_question, language, question_id,
+                                                              chat_request.follow_up):
+                    yield serialize(event, data)
+                    if event in ("blocked", "error"):
+                        outcome = event
+                        return
+                    answer_parts.append(data["text"])
+                outcome = "live"
+
+            yield serialize("done", {"session_id": session_id, "media": build_media_info(question_id),
+                                     "response_html": render_answer("".join(answer_parts))})
+        finally:
+            stage_seconds.observe(serialization_seconds, stage="serialization")
+            request_seconds.observe(time.perf_counter() - started, endpoint="chat_stream", outcome=outcome)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/chat/batch")
+async def chat_batch_endpoint(batch_request: BatchChatRequest):
+    """
+    Answers several catalogue questions in one request, e.g. to prefetch the category the user just
+    opened. Free text is not accepted here; it goes through /chat and its per-client limit.
+    Results are streamed as NDJSON, one line per question in completion order:
+      {"index", "question_id", "question", "status": "ok" | "blocked" | "error", "response", "response_html", "source", "media"}
+    where source is "store" (precomputed) or "live" (runtime cache or generated now), and response_html
+    is set for "ok" answers.
+    Stored answers are sent at once; the rest are generated at most BATCH_CONCURRENCY at a time and
+    at prefetch priority, so questions users are actually waiting for go upstream first.
+    """
+    language = batch_request.language or "en"
+    catalogue = get_catalogue()
+    if batch_request.question_ids:
+        question_ids = batch_request.question_ids
+    elif batch_request.questions:
+        question_ids = [catalogue.resolve(question) for question in batch_request.questions]
+        if None in question_ids:
+            raise HTTPException(status_code=400, detail="Batches only take catalogue questions; send free text to /chat.")
+    else:
+        raise HTTPException(status_code=400, detail="question_ids must be a non-empty list.")
+    if len(question_ids) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_QUESTIONS} questions per batch.")
+    unknown = [question_id for question_id in question_ids if question_id not in catalogue]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown question_ids {unknown}.")
+
+    started = time.perf_counter()
+    with stage_seconds.time(stage="session_lookup"):
+        session_id = ensure_session(batch_request.session_id)
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def answer_one(index: int, question_id: int) -> dict:
+        question = catalogue.text(question_id, language)
+        result = {"index": index, "question_id": question_id, "question": question, "status": "ok", "response": None,
+                  "response_html": None, "source": "store", "media": build_media_info(question_id)}
+        stored_answer = lookup_stored_answer(question_id, language)
+        if stored_answer is not None:
+            result.update(response=stored_answer, response_html=render_answer(stored_answer))
+            return result
+        result["source"] = "live"
+        async with slots:
+            try:
+                result["response"] = await generate_answer_text_async(session_id, question, language, PRIORITY_PREFETCH, question_id)
+                result["response_html"] = render_answer(result["response"])
+            except AnswerBlockedError as e:
+                result.update(status="blocked", response=e.user_message())
+            except UpstreamUnavailableError as e:
+                result.update(status="error", response=e.user_message(), retry_after=e.retry_after)
+            except Exception as e:
+                logger.error(f"Error answering batch question {index} for session {session_id}: {e}")
+                result.update(status="error", response=chat_logic.GENERATION_ERROR_MESSAGE)
+        return result
+
+    async def ndjson_lines():
+        tasks = [asyncio.create_task(answer_one(index, question_id)) for index, question_id in enumerate(question_ids)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                with stage_seconds.time(stage="serialization"):
+                    line = dumps(result) + b"\n"
+                yield line
+        finally:
+            # Client went away: stop waiting (generations shared with other requests keep running)
+            for task in tasks:
+                task.cancel()
+            request_seconds.observe(time.perf_counter() - started, endpoint="chat_batch", outcome="batch")
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": session_id},
+    )
 
 @app.get("/health", status_code=200)
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/health/upstream")
+async def upstream_health():
+    """Circuit breaker state of the Gemini upstream; 503 while the circuit is open."""
+    stats = chat_logic.upstream.stats()
+    status_code = 503 if stats["circuit"]["state"] == "open" else 200
+    return JSONResponse(content=stats, status_code=status_code)
+
+# Scrape-time views of counters the components already keep
+metrics_registry.callback("viraa_active_sessions", "Sessions in the session registry (active_models).", lambda: len(active_models))
+metrics_registry.callback(
+    "viraa_tokens_total", "Tokens reported in response usage metadata.",
+    lambda: {(kind,): token_usage.stats()[f"{kind}_tokens"] for kind in ("input", "cached_input", "uncached_input", "output")},
+    ("kind",), type="counter",
+)
+metrics_registry.callback(
+    "viraa_answer_cache_lookups_total", "Runtime answer cache lookups, by result.",
+    lambda: {
+        ("memory_hit",): chat_logic.answer_cache.memory_hits,
+        ("shared_hit",): chat_logic.answer_cache.shared_hits,
+        ("miss",): chat_logic.answer_cache.misses,
+    },
+    ("result",), type="counter",
+)
+metrics_registry.callback(
+    "viraa_answer_cache_hit_ratio", "Fraction of runtime answer cache lookups that hit either tier.",
+    lambda: chat_logic.answer_cache.stats()["hit_ratio"],
+)
+metrics_registry.callback("viraa_inflight_generations", "Upstream generations in flight (after coalescing).",
+                          lambda: chat_logic.inflight_generations.stats()["in_flight"])
+metrics_registry.callback("viraa_rate_limit_queue_depth", "Calls waiting for upstream quota.",
+                          lambda: chat_logic.upstream_limiter.stats()["queue_depth"])
+metrics_registry.callback("viraa_rate_limit_timeouts_total", "Calls that gave up waiting for upstream quota.",
+                          lambda: chat_logic.upstream_limiter.timed_out, type="counter")
+metrics_registry.callback(
+    "viraa_upstream_circuit_state", "1 for the current state of the upstream circuit breaker.",
+    lambda: {(state,): int(state == chat_logic.upstream.breaker.state) for state in ("closed", "open", "half_open")},
+    ("state",),
+)
+metrics_registry.callback("viraa_upstream_attempts_total", "Upstream call attempts, retries included.",
+                          lambda: chat_logic.upstream.attempts, type="counter")
+metrics_registry.callback("viraa_upstream_retries_total", "Upstream attempts that were retries of a transient failure.",
+                          lambda: chat_logic.upstream.retries, type="counter")
+metrics_registry.callback("viraa_upstream_timeouts_total", "Upstream attempts cut off by the attempt deadline.",
+                          lambda: chat_logic.upstream.timeouts, type="counter")
+
+@app.post("/admin/reload-knowledge", include_in_schema=False)
+async def reload_knowledge_endpoint(request: Request, force: bool = False):
+    """
+    Reloads the knowledge base files of this worker now (with several workers, the others pick the
+    change up through their file watch). Needs `Authorization: Bearer <ADMIN_TOKEN>`.
+    """
+    authorization = request.headers.get("authorization", "")
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization.encode("utf-8"), f"Bearer {ADMIN_TOKEN}".encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    previous = knowledge_base.latest_knowledge_base().version
+    try:
+        knowledge = await asyncio.to_thread(reload_knowledge, force)
+    except Exception as e:
+        logger.error(f"Could not reload the knowledge base, keeping version {previous}: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not reload the knowledge base: {e}")
+    return {"reloaded": knowledge is not None, "previous_version": previous,
+            "version": knowledge_base.latest_knowledge_base().version}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats", include_in_schema=False)
+async def stats():
+    """Runtime counters for monitoring."""
+    return {
+        "sessions": active_models.stats(),
+        "knowledge_base": knowledge_base.latest_knowledge_base().stats(),
+        "context_cache": chat_logic.context_cache.stats() if chat_logic.context_cache is not None else None,
+        "token_usage": token_usage.stats(),
+        "inflight": chat_logic.inflight_generations.stats(),
+        "answer_cache": chat_logic.answer_cache.stats(),
+        "rendered_answers": rendered_answers.stats(),
+        "encoded_answers": encoded_answers.stats(),
+        "semantic_cache": chat_logic.semantic_cache.stats() if chat_logic.semantic_cache is not None else None,
+        "upstream": chat_logic.upstream.stats(),
+        "rate_limit": {**chat_logic.upstream_limiter.stats(), **await chat_logic.upstream_limiter.levels()},
+        "free_text": free_text_limiter.stats(),
+        "shared_state": {
+            "worker_pid": os.getpid(),
+            **chat_logic.shared_state.stats(),
+            "leases": chat_logic.generation_leases.stats(),
+        } if chat_logic.shared_state is not None else None,
+    }
+
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting Uvicorn server locally...")
     if not os.getenv("GOOGLE_API_KEY"):
-        logger.warning("GOOGLE_API_KEY not set in environment. Please create a .env file.")
+        logger.warning("GOOGLE_API_KEY not set in environment. Please create a .env file. Only precomputed answers will be served.")
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True, log_level="info")
\ No newline at end of file
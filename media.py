@@ -0,0 +1,222 @@
+"""
+Per-answer media (video and audio shown under an answer), served from a precomputed manifest.
+
+data/media_manifest.json maps catalogue question ids to media files, with a default for questions
+that have none. It also records each file's size, modification time and content hash, computed
+once by `python media.py` rather than at startup. Files are published under content-addressed
+URLs (/media/<name>.<hash>.<ext>), so they can be cached as immutable. The strong ETag keeps
+If-Range working when a player resumes or seeks.
+
+Bodies are sent by Starlette's FileResponse: byte ranges (206, also multi-range), and zero-copy
+"http.response.pathsend" on ASGI servers that support it. Each response stats the file afresh, and a
+file that changed since the manifest was loaded is not served under its old hash. Behind nginx, set MEDIA_ACCEL_REDIRECT
+to an internal location to have nginx sendfile() the file instead of the app.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import sys
+import threading
+import time
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+logger = logging.getLogger(__name__)
+
+MEDIA_MANIFEST_PATH = os.getenv("MEDIA_MANIFEST_PATH", "data/media_manifest.json")
+MEDIA_DIR = os.getenv("MEDIA_DIR", "static/media")
+MEDIA_URL_PREFIX = "/media/"
+# Internal nginx location that maps to MEDIA_DIR (e.g. "/_media/"); empty to send files from the app
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "")
+
+# Content-addressed URLs never change meaning; ranges of them are safe to cache too
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bump when the manifest layout changes
+MANIFEST_FORMAT = 1
+
+class MediaFileResponse(FileResponse):
+    # Fewer, larger reads for multi-MB files when the server cannot take the file path directly
+    chunk_size = 1024 * 1024
+
+class MediaAsset:
+    def __init__(self, name: str, path: str, content_type: str, size: int, mtime: float, sha256: str):
+        self.name = name
+        self.path = path
+        self.content_type = content_type
+        self.size = size
+        self.mtime = mtime
+        self.sha256 = sha256
+        self.etag = f'"{sha256[:32]}"'
+        stem, extension = os.path.splitext(name)
+        self.asset_id = f"{stem}.{sha256[:12]}{extension}"
+        self.url = f"{MEDIA_URL_PREFIX}{self.asset_id}"
+        self._loaded_mtime_ns = None # When the manifest was loaded
+
+    def is_current(self) -> bool:
+        """
+        True if the file is there with the manifest's size. Modification times are not compared here:
+        a fresh checkout or image build resets them while the content is unchanged.
+        """
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            return False
+        self._loaded_mtime_ns = stat_result.st_mtime_ns
+        return stat_result.st_size == self.size
+
+    async def response(self, request: Request) -> Response | None:
+        """The file's response, or None if it is gone or has changed since the manifest was loaded."""
+        headers = {"ETag": self.etag, "Cache-Control": MEDIA_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if any(tag.strip().removeprefix("W/") in (self.etag, "*") for tag in if_none_match.split(",") if tag.strip()):
+            return Response(status_code=304, headers=headers)
+        if MEDIA_ACCEL_REDIRECT:
+            # nginx serves the body (ranges included) from its internal location with sendfile
+            headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_REDIRECT.rstrip('/')}/{self.name}"
+            return Response(status_code=200, media_type=self.content_type, headers=headers)
+        try:
+            stat_result = await asyncio.to_thread(os.stat, self.path)
+        except OSError:
+            stat_result = None
+        if stat_result is None or stat_result.st_size != self.size or stat_result.st_mtime_ns != self._loaded_mtime_ns:
+            logger.warning(f"Media file {self.path} is missing or changed since the manifest was loaded; not serving it. Run media.py.")
+            return None
+        # Content-Length, ranges and Last-Modified come from this stat, not the one taken at load
+        return MediaFileResponse(self.path, media_type=self.content_type, headers=headers, stat_result=stat_result)
+
+class MediaLibrary:
+    """Media assets by content-addressed id, and the media info sent with each question's answer."""
+
+    def __init__(self, assets: dict[str, MediaAsset] | None = None, default: dict | None = None,
+                 questions: dict[int, dict] | None = None, posters: dict[str, str] | None = None):
+        self._by_name = assets or {}
+        self._by_id = {asset.asset_id: asset for asset in self._by_name.values()}
+        self._posters = posters or {}
+        self._default_info = self._info(default or {})
+        # Question id -> media info; built once so responses reuse the same dict
+        self._question_info = {question_id: self._info({**(default or {}), **choice})
+                               for question_id, choice in (questions or {}).items()}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _info(self, choice: dict) -> dict | None:
+        """{"video": {url, type, poster}, "audio": {url, type}} for the chosen file names, skipping missing ones."""
+        info = {}
+        for kind in ("video", "audio"):
+            asset = self._by_name.get(choice.get(kind) or "")
+            if asset is None:
+                continue
+            info[kind] = {"url": asset.url, "type": asset.content_type}
+            if kind == "video":
+                poster = self._by_name.get(self._posters.get(asset.name, ""))
+                info[kind]["poster"] = poster.url if poster else None
+        return info or None
+
+    def media_info(self, question_id: int | None = None) -> dict | None:
+        """Media to show under the answer to a question (the default for free text or unmapped questions)."""
+        return self._question_info.get(question_id, self._default_info)
+
+    def asset(self, asset_id: str) -> MediaAsset | None:
+        return self._by_id.get(asset_id)
+
+    @classmethod
+    def load(cls, path: str = MEDIA_MANIFEST_PATH) -> "MediaLibrary":
+        """Loads the manifest. Files that changed since it was built are left out until it is rebuilt."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"No media manifest at {path}. Answers will have no media; run media.py to build it.")
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read media manifest {path}: {e}")
+            return cls()
+        if manifest.get("format") != MANIFEST_FORMAT:
+            logger.warning(f"Media manifest {path} has format {manifest.get('format')}, expected {MANIFEST_FORMAT}. Run media.py to rebuild it.")
+            return cls()
+
+        assets = {}
+        for name, entry in manifest.get("assets", {}).items():
+            asset = MediaAsset(name, os.path.join(MEDIA_DIR, name), entry["type"], entry["size"], entry["mtime"], entry["sha256"])
+            if not asset.is_current():
+                logger.warning(f"Media file {asset.path} is missing or changed since the manifest was built; skipping it. Run media.py.")
+                continue
+            assets[name] = asset
+        questions = {int(question_id): choice for question_id, choice in manifest.get("questions", {}).items()}
+        posters = {name: entry["poster"] for name, entry in manifest.get("assets", {}).items() if entry.get("poster")}
+        logger.info(f"Loaded {len(assets)} media assets, {len(questions)} question mappings from {path}")
+        return cls(assets, manifest.get("default"), questions, posters)
+
+def _sha256_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def build_manifest(path: str = MEDIA_MANIFEST_PATH, media_dir: str = MEDIA_DIR) -> dict:
+    """
+    Rescans media_dir and rewrites the manifest's asset entries. The hand-edited "default" and
+    "questions" mappings are kept. A video's poster is <video stem>-poster.<image extension> if present.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    previous = manifest.get("assets", {})
+
+    assets = {}
+    for name in sorted(os.listdir(media_dir)):
+        file_path = os.path.join(media_dir, name)
+        content_type = mimetypes.guess_type(name)[0] or ""
+        if not os.path.isfile(file_path) or not content_type.startswith(("video/", "audio/", "image/")):
+            continue
+        stat_result = os.stat(file_path)
+        old = previous.get(name, {})
+        if old.get("size") == stat_result.st_size and int(old.get("mtime", -1)) == int(stat_result.st_mtime):
+            sha256 = old["sha256"] # Unchanged; skip re-hashing large files
+        else:
+            sha256 = _sha256_file(file_path)
+        assets[name] = {"type": content_type, "size": stat_result.st_size, "mtime": int(stat_result.st_mtime), "sha256": sha256}
+    for name, entry in assets.items():
+        if entry["type"].startswith("video/"):
+            stem = os.path.splitext(name)[0]
+            entry["poster"] = next((other for other in assets if os.path.splitext(other)[0] == f"{stem}-poster"), None)
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "built_at": int(time.time()),
+        "default": manifest.get("default", {}),
+        "questions": manifest.get("questions", {}),
+        "assets": assets,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return manifest
+
+_media_library = None
+_media_library_lock = threading.Lock()
+
+def get_media_library() -> MediaLibrary:
+    """The process-wide media library, loaded on first use (or by the startup warmup)."""
+    global _media_library
+    if _media_library is None:
+        with _media_library_lock:
+            if _media_library is None:
+                _media_library = MediaLibrary.load(MEDIA_MANIFEST_PATH)
+    return _media_library
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else MEDIA_MANIFEST_PATH
+    built = build_manifest(manifest_path)
+    logger.info(f"Wrote {manifest_path}: {len(built['assets'])} assets, {len(built['questions'])} question mappings")
@@ -0,0 +1,178 @@
+"""
+Minimal Prometheus-style metrics, rendered in the text exposition format by GET /metrics.
+
+Counters and histograms are updated inline. Callback metrics read counters that other components
+already keep (sessions, answer cache, token usage, ...) at scrape time, so those are not counted
+twice. Values are per worker process.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans in-process stages (sub-millisecond) up to the upstream budget
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+def _format_labels(labelnames, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {} # Key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the with-block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """
+    Gauge or counter whose value is read from `fn` at scrape time. fn returns a number, or a dict
+    mapping label-value tuples to numbers; None values are skipped.
+    """
+
+    def __init__(self, name, help_text, fn, labelnames=(), type="gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self.type = type
+
+    def render(self) -> list[str]:
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items() if value is not None
+        ]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        # Re-registering a name replaces the metric (e.g. when a module is reloaded)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, fn, labelnames=(), type="gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, help_text, fn, labelnames, type))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e: # A failing callback must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Latency of the chat hot path, split by stage (see main.py and chat_logic.py for where each is timed):
+#   session_lookup, store_lookup, semantic_lookup, cache_lookup, prompt_build, rate_limit_wait, upstream,
+#   upstream_first_chunk, translation, translation_first_chunk, worker_wait, response_assembly, html_render,
+#   serialization, compression
+stage_seconds = registry.histogram("viraa_chat_stage_seconds", "Time spent per stage of a chat request.", ("stage",))
+request_seconds = registry.histogram(
+    "viraa_chat_request_seconds", "End-to-end chat request latency, by endpoint and outcome.", ("endpoint", "outcome")
+)
+blocked_responses = registry.counter(
+    "viraa_blocked_responses_total", "Responses withheld by content filtering, by block reason.", ("reason",)
+)
+answer_store_lookups = registry.counter(
+    "viraa_answer_store_lookups_total", "Lookups in the precomputed answer store.", ("result",)
+)
+free_text_requests = registry.counter(
+    "viraa_free_text_requests_total", "Questions that are not in the catalogue, by result.", ("result",)
+)
+semantic_cache_lookups = registry.counter(
+    "viraa_semantic_cache_lookups_total", "Near-duplicate lookups for free-text questions, by result.", ("result",)
+)
+semantic_match_score = registry.histogram(
+    "viraa_semantic_cache_match_score", "Similarity of the closest previously answered question.",
+    buckets=(0.3, 0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0),
+)
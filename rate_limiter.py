@@ -0,0 +1,326 @@
+"""
+Client-side rate limiting of upstream calls against the provider's per-minute quotas.
+
+Two token buckets, one for requests per minute and one for (input + output) tokens per minute.
+Each bucket holds a burst of `burst_fraction` of its limit and refills at the rest, so that no
+60-second window admits more than the limit (a full bucket plus a minute of refill).
+A call reserves one request and its estimated tokens before it goes upstream. When the actual
+usage is known, the token bucket is corrected by the difference.
+
+Callers that cannot be served at once wait in a priority queue (lower number first, FIFO within a
+priority). The queue is strictly ordered, so a large request at the head is not overtaken by
+smaller ones behind it.
+
+KeyedRateLimiter is the inbound counterpart: a bucket per client, used to cap free-text questions.
+
+Buckets live in process memory by default. Both limiters take a `bucket_factory` to put them
+elsewhere instead, e.g. shared_state.SharedTokenBucket, so that all workers on a host draw from
+the same buckets. Buckets that say they block (each shared bucket call is a SQLite transaction,
+which may wait on another worker) are only used from a worker thread, never on the event loop.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+
+from resilience import UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0 # A user is waiting for this answer
+PRIORITY_PREFETCH = 1 # Likely to be asked soon
+PRIORITY_BACKGROUND = 2 # Warmup and other batch work
+
+class RateLimitExceededError(UpstreamUnavailableError):
+    """The call waited longer than the limiter allows for its turn."""
+
+class TokenBucket:
+    """Holds up to `capacity` units and refills `refill_per_minute` units a minute. May go into debt."""
+
+    blocking = False # Cheap enough to call on the event loop
+
+    def __init__(self, capacity: float, refill_per_minute: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+        self._clock = clock
+        self.level = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity) # Larger requests would never fit; let them through at a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount: float):
+        """Returns (positive) or charges (negative) units after the fact."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+async def _call_bucket(blocking: bool, function, *args):
+    """Runs bucket operations on the event loop, or in a worker thread if the buckets block."""
+    if blocking:
+        return await asyncio.to_thread(function, *args)
+    return function(*args)
+
+def _take(bucket: TokenBucket, amount: float) -> float:
+    """Spends `amount` from `bucket` if it has them. Returns 0 if it did, else the seconds until it will."""
+    wait = bucket.wait_time(amount)
+    if wait == 0:
+        bucket.consume(amount)
+    return wait
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key (e.g. client IP): `burst` calls at once, then `per_minute` a minute.
+    Over-limit calls are refused rather than queued. Keeps at most `max_keys` buckets, dropping the
+    least recently used. A per_minute of 0 disables it.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = 10000, clock=time.monotonic, bucket_factory=None):
+        self.per_minute = per_minute
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        self._clock = clock
+        # (name, capacity, refill_per_minute) -> bucket; defaults to an in-process TokenBucket
+        self._bucket_factory = bucket_factory or (lambda name, capacity, refill: TokenBucket(capacity, refill, clock=clock))
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    async def try_acquire(self, key: str) -> float:
+        """Spends one call for `key`. Returns 0 if allowed, else the seconds until one is available."""
+        if self.per_minute <= 0:
+            return 0.0
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = self._bucket_factory(key, self.burst, self.per_minute)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = await _call_bucket(bucket.blocking, _take, bucket, 1)
+        if wait > 0:
+            self.rejected += 1
+            return wait
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "per_minute": self.per_minute or None,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+class RateLimiter:
+    """Priority queue in front of a requests/minute and a tokens/minute bucket. A limit of 0 disables it."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait_seconds: float = 20.0,
+                 burst_fraction: float = 0.25, clock=time.monotonic, bucket_factory=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        bucket_factory = bucket_factory or (lambda name, capacity, refill: TokenBucket(capacity, refill, clock=clock))
+        self.requests = self._bucket("requests", requests_per_minute, burst_fraction, bucket_factory)
+        self.tokens = self._bucket("tokens", tokens_per_minute, burst_fraction, bucket_factory)
+        self._blocking = any(bucket.blocking for bucket in (self.requests, self.tokens) if bucket is not None)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._queue = [] # Heap of (priority, sequence, tokens, future, enqueued_at)
+        self._sequence = itertools.count()
+        self._dispatcher = None # Task granting queued reservations, while there are any
+        self._wakeup = None # Set to make the dispatcher look at the head of the queue again
+        self._updates = set() # Bucket updates running in the background (blocking buckets)
+        self._waits = deque(maxlen=1000) # Recent queue wait times, seconds
+        self.granted = 0
+        self.queued = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self.granted_by_priority = {}
+        self.reserved_tokens = 0
+        self.actual_tokens = 0
+
+    @staticmethod
+    def _bucket(name: str, limit_per_minute: int, burst_fraction: float, bucket_factory) -> TokenBucket | None:
+        if limit_per_minute <= 0:
+            return None
+        burst = max(1.0, limit_per_minute * burst_fraction)
+        return bucket_factory(name, burst, max(1.0, limit_per_minute - burst))
+
+    def _wait_time(self, tokens: int) -> float:
+        return max(
+            self.requests.wait_time(1) if self.requests else 0.0,
+            self.tokens.wait_time(tokens) if self.tokens else 0.0,
+        )
+
+    def _reserve(self, tokens: int) -> float:
+        """Spends one request and `tokens` tokens if both are available. Returns 0 if it did, else the seconds until they will be."""
+        delay = self._wait_time(tokens)
+        if delay == 0:
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens:
+                self.tokens.consume(tokens)
+        return delay
+
+    def _release(self, tokens: int):
+        """Returns a reservation that was granted but never used."""
+        if self.requests:
+            self.requests.adjust(1)
+        if self.tokens:
+            self.tokens.adjust(tokens)
+
+    def _update_buckets(self, function, *args):
+        """Runs a bucket update that nobody waits for; in the background if the buckets block."""
+        if not self._blocking:
+            function(*args)
+            return
+        update = asyncio.get_running_loop().create_task(asyncio.to_thread(function, *args))
+        self._updates.add(update) # Keeps the task referenced until it is done
+        update.add_done_callback(self._update_done)
+
+    def _update_done(self, update: asyncio.Task):
+        self._updates.discard(update)
+        if not update.cancelled() and update.exception() is not None:
+            logger.warning(f"Rate limiter bucket update failed: {update.exception()}")
+
+    def _grant(self, priority: int, tokens: int, enqueued_at: float):
+        self.granted += 1
+        self.granted_by_priority[priority] = self.granted_by_priority.get(priority, 0) + 1
+        self.reserved_tokens += tokens
+        self._waits.append(self._clock() - enqueued_at)
+
+    def _wake_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        else:
+            self._wakeup.set()
+
+    def _remove(self, entry: tuple):
+        if self._queue[0] is entry:
+            heapq.heappop(self._queue)
+        else: # Something went ahead of it while the buckets were checked
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+
+    async def _dispatch(self):
+        """
+        Grants queued reservations in order for as long as the buckets allow, waiting until the head
+        fits (or something new arrives, which may go ahead of it). Returns when the queue is empty.
+        """
+        while self._queue:
+            entry = self._queue[0]
+            priority, _, tokens, future, enqueued_at = entry
+            if future.done(): # Timed out or cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            self._wakeup.clear()
+            try:
+                delay = await _call_bucket(self._blocking, self._reserve, tokens)
+            except Exception as e: # e.g. the shared state file stayed locked past its busy timeout
+                self._remove(entry)
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._remove(entry)
+            if future.done(): # Gave up while the buckets were checked
+                self._update_buckets(self._release, tokens)
+                continue
+            self._grant(priority, tokens, enqueued_at)
+            future.set_result(None)
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Waits until one request and `tokens` tokens may be spent, then reserves them. Raises
+        RateLimitExceededError after max_wait_seconds in the queue. Blocking buckets are always
+        checked by the dispatcher, so a cancelled caller cannot leave a reservation behind.
+        """
+        enqueued_at = self._clock()
+        if not self._queue and not self._blocking and self._reserve(tokens) == 0:
+            self._grant(priority, tokens, enqueued_at)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), tokens, future, enqueued_at))
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._wake_dispatcher()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if future.done(): # Granted in the same instant; keep it
+                return
+            future.cancel()
+            self.timed_out += 1
+            retry_after = await _call_bucket(self._blocking, self._wait_time, tokens)
+            raise RateLimitExceededError(
+                f"Waited {self.max_wait_seconds:.0f}s for upstream quota", retry_after=retry_after or 1.0
+            )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self._update_buckets(self._release, tokens) # Granted but never used
+            future.cancel()
+            raise
+        finally:
+            if self._queue:
+                self._wake_dispatcher()
+
+    def settle(self, reserved_tokens: int, actual_tokens: int):
+        """Corrects the token bucket once a call's real usage is known."""
+        self.actual_tokens += actual_tokens
+        if self.tokens:
+            self._update_buckets(self.tokens.adjust, reserved_tokens - actual_tokens)
+
+    def _levels(self) -> dict:
+        return {
+            "available_requests": round(self.requests.level, 1) if self.requests else None,
+            "available_tokens": round(self.tokens.level) if self.tokens else None,
+        }
+
+    async def levels(self) -> dict:
+        """Units now available in each bucket (read in a worker thread if the buckets block)."""
+        return await _call_bucket(self._blocking, self._levels)
+
+    def stats(self) -> dict:
+        """Counters kept in this process; see levels() for the buckets themselves."""
+        waits = sorted(self._waits)
+
+        def pick(pct):
+            return round(waits[min(len(waits) - 1, int(pct / 100 * len(waits)))] * 1000, 1) if waits else None
+
+        return {
+            "requests_per_minute": self.requests_per_minute or None,
+            "tokens_per_minute": self.tokens_per_minute or None,
+            "queue_depth": sum(1 for *_, future, _ in self._queue if not future.done()),
+            "max_queue_depth": self.max_queue_depth,
+            "granted": self.granted,
+            "granted_by_priority": self.granted_by_priority,
+            "queued": self.queued,
+            "timed_out": self.timed_out,
+            "wait_p50_ms": pick(50),
+            "wait_p95_ms": pick(95),
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else None,
+            "reserved_tokens": self.reserved_tokens,
+            "actual_tokens": self.actual_tokens,
+        }
@@ -0,0 +1,247 @@
+"""
+Deadlines, retries and a circuit breaker around upstream (Gemini) calls.
+
+- Each attempt has its own deadline, and all attempts of one call (backoff included) share an overall
+  budget that is kept below the hosting platform's request limit (30 s on Vercel).
+- Only transient errors are retried (timeouts, 429 and 5xx), with jittered exponential backoff.
+- The circuit breaker opens after a run of consecutive transient failures. While it is open, calls
+  fail at once instead of queueing behind an upstream that is down. After a cool-down a probe call is
+  let through (half-open), and its outcome closes the circuit or opens it again.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; google.api_core exceptions carry theirs in .code
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+def is_retryable(error: BaseException) -> bool:
+    """True for transient upstream errors: timeouts, connection errors, 429 and 5xx."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+def is_upstream_error(error: BaseException) -> bool:
+    """True for errors the upstream answered with (an HTTP status in .code), rather than failures of this service."""
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code >= 400
+
+class UpstreamUnavailableError(Exception):
+    """The upstream is considered down: the circuit is open or transient errors outlasted the retries."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after # Seconds until a new attempt is worthwhile, if known
+
+    def user_message(self) -> str:
+        return "The assistant is temporarily unavailable. Please try again in a moment."
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised without calling the upstream because the circuit is open."""
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay_seconds: float = 0.5, max_delay_seconds: float = 4.0,
+                 attempt_timeout_seconds: float = 20.0, total_timeout_seconds: float = 25.0):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.attempt_timeout_seconds = attempt_timeout_seconds
+        self.total_timeout_seconds = total_timeout_seconds
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the attempt after `attempt` (1-based): full jitter over an exponential cap."""
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state_locked()
+
+    def _current_state_locked(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the open circuit lets a probe through (0 when it is not open)."""
+        with self._lock:
+            if self._current_state_locked() != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout_seconds - (self._clock() - self._opened_at))
+
+    def before_call(self):
+        """Raises CircuitOpenError unless a call may go upstream now. Half-open admits one probe at a time."""
+        with self._lock:
+            state = self._current_state_locked()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self.reset_timeout_seconds - (self._clock() - self._opened_at))
+        raise CircuitOpenError("Upstream circuit is open", retry_after=round(retry_after, 1) or 1.0)
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Upstream circuit closed")
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            state = self._current_state_locked()
+            if state == self.HALF_OPEN or (state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self.times_opened += 1
+                logger.warning(f"Upstream circuit opened after {self.consecutive_failures} consecutive failures")
+
+    def release(self):
+        """Ends a call that produced no verdict (e.g. cancelled), freeing the half-open probe slot."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state_locked()
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout_seconds,
+                "retry_after_seconds": round(max(0.0, self.reset_timeout_seconds - (self._clock() - self._opened_at)), 1) if state == self.OPEN else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+class UpstreamGuard:
+    """Runs upstream calls under a RetryPolicy and a CircuitBreaker, and counts what happened."""
+
+    def __init__(self, policy: RetryPolicy, breaker: CircuitBreaker):
+        self.policy = policy
+        self.breaker = breaker
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _record(self, error: BaseException | None):
+        if error is None or not is_retryable(error):
+            # The upstream answered (even a 400 or a blocked response means it is up)
+            self.breaker.record_success()
+            return
+        if isinstance(error, TimeoutError):
+            self.timeouts += 1
+        self.breaker.record_failure()
+
+    def _retry_delay(self, error: BaseException, attempt: int, deadline: float, now: float) -> float | None:
+        """Seconds to wait before retrying after `error`, or None when the call should give up."""
+        if not is_retryable(error) or attempt >= self.policy.max_attempts:
+            return None
+        delay = self.policy.backoff(attempt)
+        if now + delay >= deadline:
+            return None
+        return delay
+
+    def _give_up(self, error: BaseException, attempt: int) -> BaseException:
+        self.failures += 1
+        if is_retryable(error):
+            retry_after = self.breaker.retry_after() or None
+            return UpstreamUnavailableError(f"Upstream failed after {attempt} attempt(s): {error!r}", retry_after=retry_after)
+        return error
+
+    async def call(self, fn):
+        """
+        Returns `await fn()`, retrying transient failures. Each attempt is cancelled after the attempt
+        timeout (or what is left of the overall budget). Raises CircuitOpenError when the circuit
+        rejects the call, UpstreamUnavailableError when transient errors outlast the retries, and
+        any other error unchanged.
+        """
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.policy.total_timeout_seconds
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            self.attempts += 1
+            timeout = min(self.policy.attempt_timeout_seconds, deadline - loop.time())
+            try:
+                result = await asyncio.wait_for(fn(), timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self._record(e)
+                delay = self._retry_delay(e, attempt, deadline, loop.time())
+                if delay is None:
+                    raise self._give_up(e, attempt) from e
+                self.retries += 1
+                logger.warning(f"Upstream attempt {attempt} failed ({e!r}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            self._record(None)
+            return result
+
+    def call_sync(self, fn):
+        """Blocking counterpart of call(). fn receives the attempt timeout and must enforce it itself."""
+        self.calls += 1
+        deadline = time.monotonic() + self.policy.total_timeout_seconds
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            self.attempts += 1
+            timeout = min(self.policy.attempt_timeout_seconds, deadline - time.monotonic())
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                self._record(e)
+                delay = self._retry_delay(e, attempt, deadline, time.monotonic())
+                if delay is None:
+                    raise self._give_up(e, attempt) from e
+                self.retries += 1
+                logger.warning(f"Upstream attempt {attempt} failed ({e!r}); retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self._record(None)
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.stats(),
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "max_attempts": self.policy.max_attempts,
+            "attempt_timeout_seconds": self.policy.attempt_timeout_seconds,
+            "total_timeout_seconds": self.policy.total_timeout_seconds,
+        }
@@ -0,0 +1,146 @@
+"""
+JSON encoding and compression of /chat responses.
+
+A /chat body is the answer fields (response, media, response_html), the same for everyone who gets
+that answer, followed by the session id, which differs per client. EncodedAnswer serializes the
+answer fields once, and compresses them at most once per coding into a stream left open at the
+end. Each response then only encodes and appends its session id:
+  gzip  the answer's deflate blocks end with a sync flush (byte-aligned, not final). The tail
+        follows as the final, stored block (RFC 1951, section 3.2.4), and the CRC-32 continues
+        from the answer's, so the answer is not read again.
+  br    the answer's brotli stream is flushed (byte-aligned, not last). The tail follows as an
+        uncompressed meta-block, then the empty last meta-block (RFC 7932, section 9.2).
+Either way the result is one ordinary stream that every client decodes. EncodedAnswerCache keeps
+them by answer digest, so answers served again (stored or cached) are neither re-encoded nor
+re-compressed; live answers are encoded once, on their first response.
+"""
+import gzip
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+from answer_cache import MemoryAnswerCache
+from static_assets import accepted_encodings
+
+try:
+    import orjson
+except ImportError: # Optional: without it the standard json module encodes (slower, equivalent output)
+    orjson = None
+
+try:
+    import brotli
+except ImportError: # Optional: without it responses are only gzip-compressed
+    brotli = None
+
+# Smaller bodies go out uncompressed; a few hundred bytes do not gain enough to be worth a coding
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+# Each answer is compressed once and the result reused, so the levels lean towards size. Brotli
+# above 7 saves under 1% more on answers and takes several times longer on their first response.
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "7"))
+
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff" # No name or mtime, unknown OS
+# Longest tail that fits one stored deflate block (and one uncompressed brotli meta-block with a 4-nibble length)
+MAX_TAIL_BYTES = 0xFFFF
+_BROTLI_LAST_EMPTY = b"\x03" # ISLAST, ISLASTEMPTY
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON (non-ASCII text as is, not \\u-escaped)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class EncodedAnswer:
+    """The answer fields of a /chat body, serialized once, with compressed variants built on first use."""
+
+    __slots__ = ("json", "variants", "_crc32")
+
+    def __init__(self, fields: dict):
+        self.json = dumps(fields)[:-1] # Open object: the session id and closing brace are appended per response
+        self.variants = {} # Content-Encoding -> compressed, unterminated stream of self.json
+        self._crc32 = None
+
+    @property
+    def compressible(self) -> bool:
+        return len(self.json) >= COMPRESS_MIN_BYTES
+
+    def codings(self) -> tuple[str, ...]:
+        """Content codings this body can be sent with, preferred first."""
+        if not self.compressible:
+            return ()
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def _variant(self, encoding: str) -> bytes:
+        variant = self.variants.get(encoding)
+        if variant is None:
+            if encoding == "gzip":
+                deflate = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+                self._crc32 = zlib.crc32(self.json)
+                variant = _GZIP_HEADER + deflate.compress(self.json) + deflate.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+                variant = compressor.process(self.json) + compressor.flush()
+            self.variants[encoding] = variant # Concurrent first uses build the same bytes
+        return variant
+
+    def body(self, session_id: str, encoding: str = "identity") -> bytes:
+        """The complete body for one session, in `encoding` (one of codings(), or identity)."""
+        tail = b',"session_id":' + dumps(session_id) + b"}"
+        if encoding == "identity" or len(tail) > MAX_TAIL_BYTES: # Only a pathological session id is that long
+            return self.json + tail if encoding == "identity" else _compress(self.json + tail, encoding)
+        if encoding == "gzip":
+            variant = self._variant("gzip")
+            # Stored block header: BFINAL 1, BTYPE 00, byte-padded; then LEN and its complement
+            stored = struct.pack("<BHH", 1, len(tail), len(tail) ^ 0xFFFF) + tail
+            trailer = struct.pack("<II", zlib.crc32(tail, self._crc32), (len(self.json) + len(tail)) & 0xFFFFFFFF)
+            return variant + stored + trailer
+        # Meta-block header: ISLAST 0, MNIBBLES 4 (0), MLEN-1 in 16 bits, ISUNCOMPRESSED 1; 20 bits, byte-padded
+        header = (((len(tail) - 1) << 3) | (1 << 19)).to_bytes(3, "little")
+        return self._variant("br") + header + tail + _BROTLI_LAST_EMPTY
+
+    def size(self) -> int:
+        # Counted with room for its compressed variants, which are smaller than the JSON together
+        return 2 * len(self.json)
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+def negotiate(accept_encoding: str, encoded: EncodedAnswer) -> str:
+    """The coding to send `encoded` with for an Accept-Encoding header: br, gzip or identity."""
+    codings = encoded.codings()
+    if not codings:
+        return "identity"
+    accepted = accepted_encodings(accept_encoding)
+    return next((coding for coding in codings if coding in accepted), "identity")
+
+class EncodedAnswerCache:
+    """EncodedAnswers by digest of the answer text and question id (which picks the media), in a size-bounded LRU."""
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 64 * 1024 * 1024):
+        # Like rendered HTML, an encoding stays valid for as long as its answer, so entries only leave by eviction
+        self._cache = MemoryAnswerCache(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=float("inf"))
+        self.hits = 0
+        self.encodes = 0
+
+    @staticmethod
+    def key(answer: str, question_id: int | None) -> str:
+        return hashlib.sha256(f"{question_id}\x1f{answer}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> EncodedAnswer | None:
+        encoded = self._cache.get(key)
+        if encoded is not None:
+            self.hits += 1
+        return encoded
+
+    def put(self, key: str, fields: dict) -> EncodedAnswer:
+        encoded = EncodedAnswer(fields)
+        self.encodes += 1
+        self._cache.put(key, encoded, size=encoded.size())
+        return encoded
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "encodes": self.encodes, **self._cache.stats()}
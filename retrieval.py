@@ -0,0 +1,155 @@
+"""
+Local lexical retrieval over the course transcript.
+
+The transcript is split into passages (runs of consecutive slides) and indexed with Okapi BM25,
+in pure Python so it needs no extra dependency and no network. The index is built once and
+persisted next to the other data files; it is rebuilt automatically when the transcript changes.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Bump when chunking, tokenization or the file layout changes so persisted indexes are rebuilt
+INDEX_FORMAT = 1
+
+# Passage size in words: slides are merged until a passage reaches the target, never beyond the max
+PASSAGE_TARGET_WORDS = 150
+PASSAGE_MAX_WORDS = 300
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Slides in the transcript are separated by a "(...)" line; inline "(...)" marks a pause
+_slide_separator_re = re.compile(r"\n\s*\(\.\.\.\)\s*\n")
+_pause_re = re.compile(r"\s*\(\.\.\.\)\s*")
+_token_re = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been before being but by can could did do does
+doing for from had has have having he her here hers him his how i if in into is it its just me more most
+my no not now of off on once only or other our out over own same she should so some such than that the
+their them then there these they this those through to too under until up very was we were what when
+where which while who why will with would you your yours
+""".split())
+
+def _stem(token: str) -> str:
+    """Very light suffix stripping so that e.g. 'latching', 'latched' and 'latches' share a term."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[: -len(suffix)]
+    return token
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(t) for t in _token_re.findall(text.lower()) if t not in _STOPWORDS]
+
+def split_passages(transcript: str) -> list[str]:
+    """Splits the transcript into passages of whole slides."""
+    passages, current, current_words = [], [], 0
+    for slide in _slide_separator_re.split(transcript):
+        slide = _pause_re.sub(" ", slide).strip()
+        if not slide:
+            continue
+        words = len(slide.split())
+        if current and (current_words >= PASSAGE_TARGET_WORDS or current_words + words > PASSAGE_MAX_WORDS):
+            passages.append("\n".join(current))
+            current, current_words = [], 0
+        current.append(slide)
+        current_words += words
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+def _source_hash(transcript: str | bytes) -> str:
+    hasher = hashlib.sha256(f"{INDEX_FORMAT}:".encode("utf-8"))
+    hasher.update(transcript.encode("utf-8") if isinstance(transcript, str) else transcript)
+    return hasher.hexdigest()[:16]
+
+class BM25Index:
+    """Inverted index over the transcript passages with BM25 scoring."""
+
+    def __init__(self, source_hash: str, passages: list[str], postings: dict, doc_lengths: list[int]):
+        self.source_hash = source_hash
+        self.passages = passages
+        # Key: term, Value: list of [passage index, term frequency]
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        count = len(passages)
+        self.idf = {
+            term: math.log(1 + (count - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+
+    @classmethod
+    def build(cls, transcript: str) -> "BM25Index":
+        passages = split_passages(transcript)
+        postings, doc_lengths = {}, []
+        for index, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append([index, tf])
+        return cls(_source_hash(transcript), passages, postings, doc_lengths)
+
+    def search(self, query: str, top_k: int = 4) -> list[tuple[int, float]]:
+        """Returns up to top_k (passage index, score) pairs with a positive score, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for index, tf in plist:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[index] / self.avg_doc_length)
+                scores[index] = scores.get(index, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def to_dict(self) -> dict:
+        return {
+            "format": INDEX_FORMAT,
+            "source_hash": self.source_hash,
+            "passages": self.passages,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+        }
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp" # Workers rebuilding at the same time each write their own
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+def load_or_build_index(transcript: str | bytes, path: str) -> BM25Index:
+    """
+    Loads the persisted index if it was built from this transcript, otherwise builds and saves a new one.
+    The transcript may be given as UTF-8 bytes (e.g. a memory map); it is then only decoded to build.
+    """
+    expected_hash = _source_hash(transcript)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") == INDEX_FORMAT and data.get("source_hash") == expected_hash:
+            return BM25Index(expected_hash, data["passages"], data["postings"], data["doc_lengths"])
+        logger.info(f"Retrieval index {path} is outdated; rebuilding.")
+    except FileNotFoundError:
+        logger.info(f"No retrieval index at {path}; building it.")
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not read retrieval index {path} ({e}); rebuilding.")
+
+    index = BM25Index.build(transcript if isinstance(transcript, str) else str(transcript, "utf-8"))
+    try:
+        index.save(path)
+    except OSError as e:
+        # Read-only deployments (e.g. serverless) still work, they just rebuild on every cold start
+        logger.warning(f"Could not persist retrieval index to {path}: {e}")
+    logger.info(f"Built retrieval index with {len(index.passages)} passages")
+    return index
@@ -0,0 +1,380 @@
+"""
+Near-duplicate matching of free-text questions, so that respellings of a question that was already
+answered ("how do i latch my baby", "How do I latch my baby??", "how do I latch my bby") reuse its answer.
+
+The exact answer cache only matches the same normalized text. NearDuplicateIndex compares
+character trigrams with TF-IDF cosine similarity, locally with NumPy:
+  - features: trigrams of the question's words (lowercased, punctuation removed, padded with a
+    space), weighted by sublinear term frequency and smoothed IDF. Document frequencies are kept
+    up to date on insert;
+  - lookup: the same words in another case or punctuation are found by key. Otherwise candidates
+    are the entries sharing the most IDF weight among the postings of the question's rarest words
+    (trigrams if none of its words is known), up to `posting_budget` postings. Those are rescored
+    exactly, and the best one that reaches the threshold and passes the guard is a hit;
+  - guard (same_question): trigram similarity cannot tell "fever" from "no fever" or "2 weeks"
+    from "12 weeks", which in health advice are different questions. A match must have the same
+    numbers, the same negations and the same words, up to small spelling edits of longer words;
+  - inserts are incremental. Past max_entries the oldest entry's slot is reused. Postings of
+    replaced entries are dropped lazily, when their posting array would otherwise grow.
+SemanticAnswerCache keeps one index per language and answer fingerprint.
+"""
+import logging
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+try:
+    import numpy as np
+except ImportError: # Optional: without it there is no near-duplicate matching
+    np = None
+
+from catalogue import normalize_question
+
+logger = logging.getLogger(__name__)
+
+NGRAM = 3
+RESCORE_CANDIDATES = 8
+_WORD_PREFIX = "\x1f" # Words and trigrams share one vocabulary; this keeps a word from colliding with a trigram
+
+def question_words(text: str) -> list[str]:
+    """The normalized question's words, with punctuation and symbols (Unicode categories P*, S*) as separators."""
+    # Combining vowel signs (category M) are kept, so Devanagari and Bengali words stay whole
+    return "".join(" " if unicodedata.category(char)[0] in "PS" else char for char in normalize_question(text)).split()
+
+# Contraction endings split off by the apostrophe ("don't" -> "don", "t"), joined back to their word
+_CONTRACTION_ENDINGS = {"t", "s", "re", "ll", "ve", "d", "m"}
+NEGATIONS = {
+    "not", "no", "never", "nor", "none", "nothing", "nobody", "neither", "without", "cannot", "cant",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "wont", "wouldnt", "shouldnt",
+    "couldnt", "mustnt", "neednt", "havent", "hasnt", "hadnt", "avoid", "stop",
+    "नहीं", "नही", "न", "ना", "मत", "बिना", # Hindi
+    "नाही", "नको", # Marathi
+    "না", "নয়", "নেই", "নি", "ছাড়া", # Bengali
+    "ಇಲ್ಲ", "ಬೇಡ", "ಅಲ್ಲ", # Kannada
+    "નથી", "ના", "નહીં", "વગર", # Gujarati
+}
+NUMBER_WORDS = {
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven",
+    "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen",
+    "twenty", "thirty", "forty", "fifty", "sixty", "hundred", "half", "once", "twice", "first",
+    "second", "third", "single", "double", "both",
+}
+_DIGITS = re.compile(r"\d+")
+
+def guard_words(words: list[str]) -> list[str]:
+    """The words with contractions joined back together ("don", "t" -> "dont")."""
+    joined = []
+    for word in words:
+        if joined and word in _CONTRACTION_ENDINGS:
+            joined[-1] += word
+        else:
+            joined.append(word)
+    return joined
+
+def _edit_distance_at_most(a: str, b: str, limit: int) -> bool:
+    """True if a and b differ by at most `limit` insertions, deletions, substitutions or adjacent swaps."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+def _spelling_edits_allowed(a: str, b: str) -> int:
+    # Short words change meaning with one letter (hot/hat, two/tow), so they must match exactly. Longer
+    # ones get one edit, not two, which would let opposites through (increase/decrease).
+    return 0 if max(len(a), len(b)) < 4 else 1
+
+def same_question(words_a: list[str], words_b: list[str]) -> bool:
+    """
+    True if two questions (as question_words) can share an answer: the same numbers (digits and
+    number words), the same negations, and the same words (counted) apart from one spelling edit
+    per word of four letters or more. Word order is ignored.
+    """
+    a, b = guard_words(words_a), guard_words(words_b)
+    if sorted(int(n) for word in a for n in _DIGITS.findall(word)) != sorted(int(n) for word in b for n in _DIGITS.findall(word)):
+        return False
+    for vocabulary in (NEGATIONS, NUMBER_WORDS):
+        if sorted(word for word in a if word in vocabulary) != sorted(word for word in b if word in vocabulary):
+            return False
+    counts_a, counts_b = Counter(a), Counter(b)
+    only_a, only_b = sorted((counts_a - counts_b).elements()), sorted((counts_b - counts_a).elements())
+    if len(only_a) != len(only_b):
+        return False
+    for word in only_a:
+        match = next((other for other in only_b
+                      if _edit_distance_at_most(word, other, _spelling_edits_allowed(word, other))), None)
+        if match is None:
+            return False
+        only_b.remove(match)
+    return True
+
+def question_trigrams(words: list[str]) -> dict[str, int]:
+    """Trigram counts of the words, each padded with a space on both sides."""
+    counts = {}
+    for word in words:
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM + 1):
+            gram = padded[i:i + NGRAM]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+class _Postings:
+    """Slots (and the serial of the entry that was in the slot) containing one term, in a growable array."""
+
+    __slots__ = ("slots", "serials", "length")
+
+    def __init__(self):
+        self.slots = np.empty(4, dtype=np.int32)
+        self.serials = np.empty(4, dtype=np.int32)
+        self.length = 0
+
+class NearDuplicateIndex:
+    """Questions and their answers, searchable by character-trigram TF-IDF cosine similarity."""
+
+    def __init__(self, max_entries: int = 10000, threshold: float = 0.85, posting_budget: int = 5000):
+        if np is None:
+            raise RuntimeError("NearDuplicateIndex needs numpy")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.posting_budget = posting_budget
+        self._lock = threading.Lock()
+        self._vocab: dict[str, int] = {} # Trigram or prefixed word -> term id
+        self._df = np.zeros(1024, dtype=np.float64) # Live entries containing each term
+        self._postings: list[_Postings] = []
+        # Per slot: the entry's serial (-1 if empty), trigram ids, sublinear tf weights, word ids, key and answer
+        self._serials = np.full(max_entries, -1, dtype=np.int32)
+        self._grams: list = [None] * max_entries
+        self._tf: list = [None] * max_entries
+        self._words: list = [None] * max_entries
+        self._keys: list = [None] * max_entries
+        self._answers: list = [None] * max_entries
+        self._slot_by_key: dict[str, int] = {}
+        self._next_serial = 0
+        self._scratch = np.zeros(1024, dtype=np.float64) # Dense query vector, zeroed after each lookup
+        self._slot_scores = np.zeros(max_entries, dtype=np.float64) # Candidate scores by slot, likewise
+        self.entries = 0
+        self.rejections = 0 # Lookups whose best match reached the threshold but failed the guard
+
+    def __len__(self):
+        return self.entries
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._vocab[term] = len(self._postings)
+            self._postings.append(_Postings())
+            if term_id >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.float64)])
+                self._scratch = np.zeros(len(self._df), dtype=np.float64)
+        return term_id
+
+    def _term_ids(self, terms) -> "np.ndarray":
+        terms = list(terms)
+        return np.fromiter((self._term_id(term) for term in terms), dtype=np.int32, count=len(terms))
+
+    def _known_ids(self, terms) -> "np.ndarray":
+        ids = [self._vocab[term] for term in terms if term in self._vocab]
+        return np.fromiter(ids, dtype=np.int32, count=len(ids))
+
+    def _idf(self, df):
+        return np.log((1.0 + self.entries) / (1.0 + df)) + 1.0
+
+    def _append_posting(self, term_id: int, slot: int, serial: int):
+        postings = self._postings[term_id]
+        if postings.length == len(postings.slots):
+            # Full: first drop postings of entries that have since been replaced, then grow if still over half full
+            live = self._serials[postings.slots[:postings.length]] == postings.serials[:postings.length]
+            kept = int(live.sum())
+            capacity = len(postings.slots) * 2 if kept * 2 > len(postings.slots) else len(postings.slots)
+            slots, serials = np.empty(capacity, dtype=np.int32), np.empty(capacity, dtype=np.int32)
+            slots[:kept] = postings.slots[:postings.length][live]
+            serials[:kept] = postings.serials[:postings.length][live]
+            postings.slots, postings.serials, postings.length = slots, serials, kept
+        postings.slots[postings.length] = slot
+        postings.serials[postings.length] = serial
+        postings.length += 1
+
+    def insert(self, question: str, answer: str):
+        """Adds (or updates) a question and its answer, replacing the oldest entry when full."""
+        words = question_words(question)
+        if not words:
+            return
+        key = " ".join(words)
+        counts = question_trigrams(words)
+        with self._lock:
+            slot = self._slot_by_key.get(key)
+            if slot is not None: # Same question again: only the answer changes
+                self._answers[slot] = answer
+                return
+            slot = self._next_serial % self.max_entries
+            if self._serials[slot] >= 0:
+                self._df[self._grams[slot]] -= 1
+                self._df[self._words[slot]] -= 1
+                del self._slot_by_key[self._keys[slot]]
+                self.entries -= 1
+            serial = self._next_serial
+            self._next_serial = (self._next_serial + 1) % (2 ** 31)
+            gram_ids = self._term_ids(counts)
+            word_ids = self._term_ids(dict.fromkeys(_WORD_PREFIX + word for word in words))
+            for term_id in gram_ids.tolist() + word_ids.tolist():
+                self._append_posting(term_id, slot, serial)
+            self._df[gram_ids] += 1
+            self._df[word_ids] += 1
+            self._serials[slot] = serial
+            self._grams[slot] = gram_ids
+            self._tf[slot] = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+            self._words[slot] = word_ids
+            self._keys[slot] = key
+            self._answers[slot] = answer
+            self._slot_by_key[key] = slot
+            self.entries += 1
+
+    def lookup(self, question: str) -> tuple[str | None, float, str | None]:
+        """
+        (answer, similarity, matched question) of the most similar entry. The answer is that of the best
+        entry above the threshold that passes the guard (same_question), None if there is none.
+        """
+        words = question_words(question)
+        key = " ".join(words)
+        counts = question_trigrams(words)
+        with self._lock:
+            if not counts or not self.entries:
+                return None, 0.0, None
+            slot = self._slot_by_key.get(key)
+            if slot is not None:
+                return self._answers[slot], 1.0, key
+
+            known = [(self._vocab[gram], count) for gram, count in counts.items() if gram in self._vocab]
+            if not known:
+                return None, 0.0, None
+            gram_ids = np.fromiter((gram_id for gram_id, _ in known), dtype=np.int32, count=len(known))
+            tf = 1.0 + np.log(np.fromiter((count for _, count in known), dtype=np.float64, count=len(known)))
+            weights = tf * self._idf(self._df[gram_ids])
+            # Trigrams never seen still count towards the query's norm, at the highest IDF
+            unseen = sum((1.0 + math.log(count)) ** 2 for gram, count in counts.items() if gram not in self._vocab)
+            query_norm = math.sqrt(float(weights @ weights) + unseen * float(self._idf(0.0)) ** 2)
+
+            word_ids = self._known_ids(_WORD_PREFIX + word for word in dict.fromkeys(words))
+            if len(word_ids):
+                candidates = self._candidates(word_ids, self._idf(self._df[word_ids]))
+            else:
+                candidates = self._candidates(gram_ids, weights)
+            if len(candidates) == 0:
+                return None, 0.0, None
+            # Exact cosine for all candidates at once: their trigram ids end to end, summed per candidate
+            slots = candidates.tolist()
+            entry_ids = np.concatenate([self._grams[slot] for slot in slots])
+            entry_weights = np.concatenate([self._tf[slot] for slot in slots]) * self._idf(self._df[entry_ids])
+            starts = np.cumsum([0] + [len(self._grams[slot]) for slot in slots[:-1]])
+            scratch = self._scratch
+            scratch[gram_ids] = weights
+            dots = np.add.reduceat(scratch[entry_ids] * entry_weights, starts)
+            norms = np.sqrt(np.add.reduceat(entry_weights * entry_weights, starts))
+            scratch[gram_ids] = 0.0
+            scores = dots / (query_norm * norms)
+            ranked = np.argsort(-scores, kind="stable").tolist()
+            for rank in ranked:
+                if scores[rank] < self.threshold:
+                    break
+                slot = slots[rank]
+                if same_question(words, self._keys[slot].split()):
+                    return self._answers[slot], float(scores[rank]), self._keys[slot]
+            best_slot, best_score = slots[ranked[0]], float(scores[ranked[0]])
+            if best_score >= self.threshold:
+                self.rejections += 1
+            return None, best_score, self._keys[best_slot]
+
+    def _candidates(self, term_ids, weights):
+        """Slots of the entries sharing the most weight with the query, among the rarest terms' postings."""
+        order = np.argsort(self._df[term_ids], kind="stable")
+        scores, touched_parts, taken = self._slot_scores, [], 0
+        for index in order.tolist():
+            postings = self._postings[term_ids[index]]
+            if postings.length == 0:
+                continue
+            if touched_parts and taken + postings.length > self.posting_budget:
+                break
+            slots = postings.slots[:postings.length]
+            # Skip postings of replaced entries; a live entry appears at most once per term
+            slots = slots[self._serials[slots] == postings.serials[:postings.length]]
+            scores[slots] += weights[index]
+            touched_parts.append(slots)
+            taken += postings.length
+        if not touched_parts:
+            return np.empty(0, dtype=np.int32)
+        touched = np.concatenate(touched_parts)
+        touched_scores = scores[touched]
+        scores[touched] = 0.0 # Leave the scratch array clean for the next lookup
+        if len(touched) > RESCORE_CANDIDATES * 4:
+            best = np.argpartition(touched_scores, -RESCORE_CANDIDATES * 4)[-RESCORE_CANDIDATES * 4:]
+            touched, touched_scores = touched[best], touched_scores[best]
+        # A slot is in the list once per shared term; keep the distinct best ones
+        best_first = np.unique(touched[np.argsort(-touched_scores, kind="stable")], return_index=True)
+        return best_first[0][np.argsort(best_first[1])][:RESCORE_CANDIDATES]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": self.entries,
+                "max_entries": self.max_entries,
+                "terms": len(self._vocab),
+                "rejections": self.rejections,
+                "postings": sum(postings.length for postings in self._postings),
+            }
+
+class SemanticAnswerCache:
+    """NearDuplicateIndexes by (language, answer fingerprint), with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 10000, threshold: float = 0.85, max_indexes: int = 16):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[tuple[str, str], NearDuplicateIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+
+    def _index(self, language: str, fingerprint: str, create: bool) -> NearDuplicateIndex | None:
+        key = (language, fingerprint)
+        index = self._indexes.get(key)
+        if index is None and create:
+            index = self._indexes[key] = NearDuplicateIndex(self.max_entries, self.threshold)
+            # Indexes of an old fingerprint (e.g. before a prompt change) are never asked again
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def lookup(self, question: str, language: str, fingerprint: str) -> tuple[str | None, float, str | None]:
+        """(answer or None, similarity, matched question) for the closest previously answered question."""
+        index = self._index(language, fingerprint, create=False)
+        answer, score, matched = index.lookup(question) if index is not None else (None, 0.0, None)
+        if answer is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return answer, score, matched
+
+    def insert(self, question: str, language: str, fingerprint: str, answer: str):
+        self.inserts += 1
+        self._index(language, fingerprint, create=True).insert(question, answer)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "indexes": {f"{language}:{fingerprint}": index.stats() for (language, fingerprint), index in self._indexes.items()},
+        }
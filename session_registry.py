@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+class SessionState:
+    """Per-session bookkeeping. Kept small: the model itself is shared by every session."""
+
+    __slots__ = ("session_id", "created_at", "last_seen", "conversation")
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        self.created_at = now
+        self.last_seen = now
+        self.conversation = None # conversation.ConversationWindow, once the session uses follow-up mode
+
+class SessionRegistry:
+    """
+    Bounded registry of active sessions with idle-TTL expiry and LRU eviction.
+
+    Entries are kept in least-recently-used order, so both expired and evicted sessions are
+    popped from the front and every operation is O(1) amortized.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 1800.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, state: SessionState, now: float) -> bool:
+        return now - state.last_seen > self.ttl_seconds
+
+    def _purge_expired(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if not self._is_expired(oldest, now):
+                break
+            self._sessions.popitem(last=False)
+            self.expirations += 1
+
+    def touch(self, session_id: str) -> SessionState:
+        """Returns the session's state, creating it if needed, and marks it as recently used."""
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self.hits += 1
+                state.last_seen = now
+                self._sessions.move_to_end(session_id)
+                return state
+
+            self.misses += 1
+            state = SessionState(session_id, now)
+            self._sessions[session_id] = state
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+            return state
+
+    def get(self, session_id: str) -> SessionState | None:
+        """Returns the session's state without creating or refreshing it."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or self._is_expired(state, self._clock()):
+                return None
+            return state
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge_expired(self._clock())
+            return {
+                "size": len(self._sessions),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
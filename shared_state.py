@@ -0,0 +1,179 @@
+"""
+State shared by the worker processes of one host, in a SQLite file (WAL mode).
+
+With several uvicorn workers (WEB_CONCURRENCY > 1) every worker has its own memory, so on its own
+each would apply the Gemini quotas, cache answers and coalesce identical questions separately.
+This file lets them act as one server:
+  - SharedTokenBucket stands in for rate_limiter.TokenBucket, so per-minute limits apply to the
+    host rather than to each worker;
+  - GenerationLeases give one worker at a time the right to generate a given answer. The others
+    wait for it to appear in the shared answer cache (answer_cache.SQLiteAnswerCache, same file).
+Every operation is a single short statement or transaction. WAL mode lets readers proceed while
+another worker writes.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class SQLiteConnections:
+    """
+    Connections to one SQLite file in WAL mode, one per thread (sqlite3 connections must not be
+    shared across threads). Creates the file's directory if needed.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use. Statements autocommit unless a BEGIN is issued."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+class SharedStateStore:
+    """The SQLite file and its tables: token buckets and generation leases."""
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self._clock = clock # Wall clock: it has to mean the same thing in every process
+        self._connect = SQLiteConnections(path).get
+        self._writes = 0
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def now(self) -> float:
+        return self._clock()
+
+    def execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        """Runs one statement (its own transaction) on this thread's connection."""
+        return self._connect().execute(sql, parameters)
+
+    def bucket_level(self, name: str, capacity: float, refill_per_second: float) -> float:
+        """Current level of a bucket (a missing row is a full bucket)."""
+        row = self.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return capacity
+        level, updated = row
+        return min(capacity, level + max(0.0, self._clock() - updated) * refill_per_second)
+
+    def change_bucket(self, name: str, capacity: float, refill_per_second: float, amount: float) -> float:
+        """Refills the bucket, adds `amount` (negative to spend; the level is capped at capacity) and returns the new level."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = self._clock()
+            row = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            level = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * refill_per_second)
+            level = min(capacity, level + amount)
+            conn.execute("INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)", (name, level, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._writes += 1
+        if self._writes % 256 == 0:
+            self.trim()
+        return level
+
+    def trim(self, idle_seconds: float = 3600.0):
+        """Drops buckets untouched for an hour (long since full again) and expired leases."""
+        now = self._clock()
+        conn = self._connect()
+        conn.execute("DELETE FROM buckets WHERE updated < ?", (now - idle_seconds,))
+        conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        return {
+            "path": self.path,
+            "buckets": conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0],
+            "active_leases": conn.execute("SELECT COUNT(*) FROM leases WHERE expires_at > ?", (self._clock(),)).fetchone()[0],
+        }
+
+class SharedTokenBucket:
+    """
+    rate_limiter.TokenBucket kept in the shared store, so every worker draws from the same bucket.
+    Checking and spending are separate steps, as in TokenBucket, so workers that check at the same
+    instant can overdraw by a call each; the debt is then repaid by everyone waiting a little longer.
+    """
+
+    blocking = True # Every call is a SQLite statement or transaction, so limiters call it from a worker thread
+
+    def __init__(self, store: SharedStateStore, name: str, capacity: float, refill_per_minute: float):
+        self.store = store
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+
+    @property
+    def level(self) -> float:
+        return self.store.bucket_level(self.name, self.capacity, self.refill_per_second)
+
+    def wait_time(self, amount: float) -> float:
+        level = self.level
+        amount = min(amount, self.capacity)
+        if level >= amount:
+            return 0.0
+        return (amount - level) / self.refill_per_second
+
+    def consume(self, amount: float):
+        self.store.change_bucket(self.name, self.capacity, self.refill_per_second, -amount)
+
+    def adjust(self, amount: float):
+        self.store.change_bucket(self.name, self.capacity, self.refill_per_second, amount)
+
+class GenerationLeases:
+    """
+    Host-wide "who is generating this answer" table. A lease expires after `ttl_seconds`, so a worker
+    that dies mid-generation holds up the others for at most that long.
+    """
+
+    def __init__(self, store: SharedStateStore, ttl_seconds: float = 30.0, poll_seconds: float = 0.05):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.acquired = 0
+        self.contended = 0
+
+    def try_acquire(self, key: str) -> str | None:
+        """Takes the lease for `key` if it is free or expired. Returns its token, or None if another worker holds it."""
+        token = uuid.uuid4().hex
+        now = self.store.now()
+        cursor = self.store.execute(
+            "INSERT INTO leases (key, token, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (key, token, now + self.ttl_seconds, now),
+        )
+        if cursor.rowcount == 1:
+            self.acquired += 1
+            return token
+        self.contended += 1
+        return None
+
+    def is_held(self, key: str) -> bool:
+        row = self.store.execute(
+            "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?", (key, self.store.now())
+        ).fetchone()
+        return row is not None
+
+    def release(self, key: str, token: str):
+        self.store.execute("DELETE FROM leases WHERE key = ? AND token = ?", (key, token))
+
+    def stats(self) -> dict:
+        return {"acquired": self.acquired, "contended": self.contended, "ttl_seconds": self.ttl_seconds}
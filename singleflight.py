@@ -0,0 +1,120 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+When several callers ask for the same key while a call for it is still running, only the first one
+(the leader) starts the work; everyone else waits for and shares its outcome. Nothing is kept once
+the call finishes, so a failure is delivered to the callers that were waiting for it and the next
+request starts a fresh attempt.
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _Broadcast:
+    """Events of one in-flight stream, replayable by subscribers that join late."""
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.changed = asyncio.Condition()
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict = {} # Key -> asyncio.Task
+        self._streams: dict = {} # Key -> _Broadcast
+        self._pumps = set() # Strong references to running stream tasks
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, fn):
+        """
+        Returns the result of `await fn()`, sharing one call among concurrent callers with the same key.
+        The call runs as its own task, so a caller that disconnects does not cancel it for the others.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish_call(key, t))
+        else:
+            self.followers += 1
+            logger.info(f"Joining in-flight generation for {key!r}")
+        return await asyncio.shield(task)
+
+    def pending(self, key) -> asyncio.Future | None:
+        """
+        The in-flight do() call for `key` as a shielded future, or None. Lets a streaming caller wait
+        for a non-streaming generation of the same key instead of starting its own.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            return None
+        self.followers += 1
+        logger.info(f"Joining in-flight generation for {key!r} from a stream")
+        return asyncio.shield(task)
+
+    def _finish_call(self, key, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception() # Mark as retrieved even if every caller went away
+
+    def is_streaming(self, key) -> bool:
+        return key in self._streams
+
+    async def stream(self, key, agen_fn):
+        """
+        Async generator over the events of `agen_fn()`, sharing one upstream stream among concurrent
+        callers with the same key. Callers that join late first receive the events they missed.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            pump = asyncio.ensure_future(self._pump(key, agen_fn, broadcast))
+            self._pumps.add(pump)
+            pump.add_done_callback(self._pumps.discard)
+        else:
+            self.followers += 1
+            logger.info(f"Joining in-flight stream for {key!r}")
+
+        position = 0
+        while True:
+            async with broadcast.changed:
+                while position >= len(broadcast.events) and not broadcast.done:
+                    await broadcast.changed.wait()
+                pending = broadcast.events[position:]
+                position = len(broadcast.events)
+                finished = broadcast.done
+            for event in pending:
+                yield event
+            if finished and position >= len(broadcast.events):
+                break
+        if broadcast.error is not None:
+            raise broadcast.error
+
+    async def _pump(self, key, agen_fn, broadcast: _Broadcast):
+        try:
+            async for event in agen_fn():
+                async with broadcast.changed:
+                    broadcast.events.append(event)
+                    broadcast.changed.notify_all()
+        except BaseException as e:
+            broadcast.error = e
+        finally:
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+            async with broadcast.changed:
+                broadcast.done = True
+                broadcast.changed.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
@@ -11,100 +11,42 @@ document.addEventListener('DOMContentLoaded', () => {
 
     let currentLanguage = 'en'; // Default language
 
-    // --- Translated Content Store ---
+    // --- Translated UI Strings ---
     // For a POC, we'll hardcode translations here. In a real app, this would come from a more robust i18n solution.
+    // The categories and questions themselves come from the server (GET /catalogue?lang=...).
     const translations = {
         en: {
             selectCategoryPrompt: "Please select a category to explore:",
             selectQuestionPrompt: "Choose a question from this category:",
-            backToCategories: "← Back to Categories",
-            categories: [
-        {
-            name: "Is My Baby Getting Enough? / Is My Milk Okay?",
-                    icon: "🍼",
-            questions: [
-                "How can I tell if my baby is getting enough milk when I breastfeed?",
-                "What are the sure signs my baby is well-fed and satisfied after breastfeeding?",
-                "My baby fusses at the breast or pulls away. Could it be they're not getting enough milk?",
-                "How does my body actually make enough milk for my baby?",
-                "What is colostrum, and why is everyone saying it's so important for my newborn?",
-                "What are the main benefits of my breast milk for my baby right now?",
-                "My breasts don't feel as \"full\" as before, or they feel uneven after feeding. Is this a sign of a problem?",
-                "I've heard breast milk changes. Does my milk change for my baby's needs, like at night or in the morning?"
-            ]
-        },
-        {
-            name: "Help! Breastfeeding is Painful!",
-                    icon: "😣",
-            questions: [
-                "Why are my nipples so sore? Is some pain just part of breastfeeding?",
-                "How can I fix my baby's latch to stop it from hurting me?",
-                "Is it normal to feel cramping in my belly when I breastfeed?",
-                "What are the absolute \"must-do's\" before I even try to latch my baby to avoid problems?",
-                "How do I hold my own breasts correctly to help my baby latch without pain?",
-                "What does a \"good latch\" actually look like? I need to see it.",
-                "If the pain doesn't stop, what are my options? Do I have to just give up?"
-            ]
-        },
-        {
-            name: "My Baby is Struggling to Latch!",
-                    icon: "👶",
-            questions: [
-                "My baby just can't seem to latch on properly. What are the key things to get right?",
-                "How do I get my baby to open their mouth WIDE for a good latch?",
-                "My baby seems to only get the very tip of my nipple. How do I encourage a deeper latch?",
-                "What are the immediate signs I can look for to know if the latch is bad?",
-                "How should I hold my baby (neck, body) to help them latch effectively?",
-                "What is \"breast crawl\" and can my baby really find the breast on their own?",
-                "What are the early signs (feeding cues) that my baby is ready to eat, even before they cry?",
-                "If my baby is crying from hunger, will it be harder to latch them?"
-            ]
-        },
-        {
-            name: "I Need to Use a Bottle (Formula or My Milk)",
-                    icon: "🍼",
-            questions: [
-                "If I have to use formula, is it a bad choice for my baby?",
-                "Can I give both breast milk and formula? How do I manage that?",
-                "Can formula be hard for my baby to digest? What if they seem uncomfortable?",
-                "What's the best way to give my baby a bottle to avoid problems? (Paced Bottle Feeding)",
-                "How do I choose a good bottle and nipple if I'm also breastfeeding?",
-                "Should I still hold my baby close and make eye contact when bottle-feeding?"
-            ]
-        },
-        {
-            name: "Taking Care of ME While Breastfeeding",
-                    icon: "💆‍♀️",
-            questions: [
-                "What should I eat when I'm breastfeeding? Are there foods I absolutely have to avoid?",
-                "Will I be hungrier when breastfeeding, and how much more should I eat?",
-                "Why is eating well important for me, not just for making milk?",
-                "How much water should I be drinking?",
-                "What's the most important \"non-food\" nutrition I need as a new breastfeeding mom?",
-                "My family has a lot of old wives' tales about breastfeeding. How do I deal with these myths?",
-                "How can my partner and family truly support me and this breastfeeding journey?"
-            ]
-        }
-            ]
+            backToCategories: "← Back to Categories"
         },
         hi: {
             selectCategoryPrompt: "कृपया एक श्रेणी चुनें:",
             selectQuestionPrompt: "इस श्रेणी से एक प्रश्न चुनें:",
-            backToCategories: "← श्रेणियों पर वापस जाएं",
-            categories: [ /* TODO: Add Hindi translations for categories and questions */
-                { name: "क्या मेरे बच्चे को पर्याप्त दूध मिल रहा है? / क्या मेरा दूध ठीक है?", icon: "🍼", questions: ["कैसे पता चलेगा कि स्तनपान कराते समय मेरे बच्चे को पर्याप्त दूध मिल रहा है?", /* ... more Hindi questions ... */ ] },
-                { name: "मदद! स्तनपान दर्दनाक है!", icon: "😣", questions: [/* ... Hindi questions ... */] },
-                { name: "मेरा बच्चा ठीक से स्तनपान नहीं कर पा रहा है!", icon: "👶", questions: [/* ... Hindi questions ... */] },
-                { name: "मुझे बोतल का उपयोग करने की आवश्यकता है (फॉर्मूला या मेरा दूध)", icon: "🍼", questions: [/* ... Hindi questions ... */] },
-                { name: "स्तनपान के दौरान अपना ख्याल रखना", icon: "💆‍♀️", questions: [/* ... Hindi questions ... */] }
-            ]
+            backToCategories: "← श्रेणियों पर वापस जाएं"
         },
-        bn: { /* Bengali translations - TODO */ selectCategoryPrompt: "অনুগ্রহ করে একটি বিভাগ নির্বাচন করুন:", backToCategories: "← বিভাগগুলিতে ফিরে যান", categories: [ { name: "আমার বাচ্চা কি যথেষ্ট পাচ্ছে? / আমার দুধ কি ঠিক আছে কর?", icon: "🍼", questions: [/* Bengali Questions */] } ] },
-        mr: { /* Marathi translations - TODO */ selectCategoryPrompt: "कृपया एक श्रेणी निवडा:", backToCategories: "← श्रेणींमध्ये परत जा", categories: [ { name: "माझ्या बाळाला पुरेसे दूध मिळत आहे का? / माझे दूध ठीक आहे का?", icon: "🍼", questions: [/* Marathi Questions */] } ] },
-        kn: { /* Kannada translations - TODO */ selectCategoryPrompt: "ದಯವಿಟ್ಟು ಒಂದು ವರ್ಗವನ್ನು ಆಯ್ಕೆಮಾಡಿ:", backToCategories: "← ವರ್ಗಗಳಿಗೆ ಹಿಂತಿರುಗಿ", categories: [ { name: "ನನ್ನ ಮಗುವಿಗೆ ಸಾಕಷ್ಟು ಹಾಲು ಸಿಗುತ್ತಿದೆಯೇ? / ನನ್ನ ಹಾಲು ಸರಿಯಾಗಿದೆಯೇ?", icon: "🍼", questions: [/* Kannada Questions */] } ] },
-        gu: { /* Gujarati translations - TODO */ selectCategoryPrompt: "કૃપા કરીને એક શ્રેણી પસંદ કરો:", backToCategories: "← શ્રેણીઓ પર પાછા જાઓ", categories: [ { name: "શું મારા બાળકને પૂરતું દૂધ મળી રહ્યું છે? / શું મારું દૂધ બરાબર છે?", icon: "🍼", questions: [/* Gujarati Questions */] } ] }
+        bn: { /* Bengali translations - TODO */ selectCategoryPrompt: "অনুগ্রহ করে একটি বিভাগ নির্বাচন করুন:", backToCategories: "← বিভাগগুলিতে ফিরে যান" },
+        mr: { /* Marathi translations - TODO */ selectCategoryPrompt: "कृपया एक श्रेणी निवडा:", backToCategories: "← श्रेणींमध्ये परत जा" },
+        kn: { /* Kannada translations - TODO */ selectCategoryPrompt: "ದಯವಿಟ್ಟು ಒಂದು ವರ್ಗವನ್ನು ಆಯ್ಕೆಮಾಡಿ:", backToCategories: "← ವರ್ಗಗಳಿಗೆ ಹಿಂತಿರುಗಿ" },
+        gu: { /* Gujarati translations - TODO */ selectCategoryPrompt: "કૃપા કરીને એક શ્રેણી પસંદ કરો:", backToCategories: "← શ્રેણીઓ પર પાછા જાઓ" }
     };
 
+    // Question menus by language, fetched once per page load (the browser revalidates them by ETag)
+    const catalogues = new Map();
+
+    async function loadCatalogue(language) {
+        if (!catalogues.has(language)) {
+            const request = fetch(`/catalogue?lang=${encodeURIComponent(language)}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                    return response.json();
+                });
+            catalogues.set(language, request);
+            request.catch(() => catalogues.delete(language)); // Retry on the next render
+        }
+        return catalogues.get(language);
+    }
+
     // --- Enhanced Theme Management ---
     function setTheme(theme) {
         document.documentElement.setAttribute('data-theme', theme);
@@ -141,17 +83,32 @@ document.addEventListener('DOMContentLoaded', () => {
     let sessionId = sessionStorage.getItem('viraaChatSessionId');
     let currentCategory = null; // Track current category for better navigation
 
+    // Answers prefetched for the open category, keyed by language and question id
+    const prefetchedAnswers = new Map();
+    let prefetchController = null;
+    const prefetchKey = (language, questionId) => `${language}:${questionId}`;
+
     // --- Enhanced UI Rendering with Better Accessibility ---
-    function displayCategories() {
+    async function displayCategories() {
         currentCategory = null;
-        const currentTranslations = translations[currentLanguage];
+        const language = currentLanguage;
+        const currentTranslations = translations[language];
+        let catalogue;
+        try {
+            catalogue = await loadCatalogue(language);
+        } catch (error) {
+            console.error('Error loading question catalogue:', error);
+            mainContentArea.innerHTML = `<div class="selection-prompt" role="alert">Sorry, the questions could not be loaded. Please refresh the page.</div>`;
+            return;
+        }
+        if (language !== currentLanguage || currentCategory !== null) return; // The user moved on while it loaded
         const categoriesHTML = `
             <div class="selection-prompt" role="status" aria-live="polite">
                 ${currentTranslations.selectCategoryPrompt}
             </div>
             <nav aria-label="Question categories">
                 <ul class="categories-list" role="list">
-                    ${currentTranslations.categories.map((category, index) => `
+                    ${catalogue.categories.map((category, index) => `
                         <li role="listitem">
                             <button class="category-button" 
                                     data-category-index="${index}"
@@ -174,9 +131,9 @@ document.addEventListener('DOMContentLoaded', () => {
         announceToScreenReader('Categories loaded. Choose a category to see available questions.');
     }
 
-    function displayQuestions(categoryIndex) {
+    async function displayQuestions(categoryIndex) {
         const currentTranslations = translations[currentLanguage];
-        const category = currentTranslations.categories[categoryIndex];
+        const category = (await loadCatalogue(currentLanguage)).categories[categoryIndex];
         currentCategory = categoryIndex;
         
         const questionsHTML = `
@@ -192,13 +149,14 @@ document.addEventListener('DOMContentLoaded', () => {
             </div>
             <nav aria-label="Questions in category" aria-describedby="category-title">
                 <ul class="questions-list" role="list">
-                    ${category.questions.map((questionText, index) => `
+                    ${category.questions.map((question, index) => `
                         <li role="listitem">
                             <button class="question-button" 
-                                    data-question-text="${escapeHTML(questionText)}" 
+                                    data-question-id="${question.id}" 
+                                    data-question-text="${escapeHTML(question.text)}" 
                                     data-question-lang="${currentLanguage}" 
                                     aria-describedby="question-${index}-desc">
-                                ${questionText}
+                                ${escapeHTML(question.text)}
                             </button>
                             <div id="question-${index}-desc" class="sr-only">
                                 Click to get AI-powered answer
@@ -213,6 +171,63 @@ document.addEventListener('DOMContentLoaded', () => {
         addQuestionEventListeners();
         scrollToTop();
         announceToScreenReader(`${category.questions.length} questions loaded for ${category.name} in ${currentLanguage}`);
+        prefetchCategory(category.questions, currentLanguage);
+    }
+
+    // Users usually click a question of the category they just opened, so fetch its answers in the
+    // background (one /chat/batch request, results arriving as NDJSON) to make clicks instant.
+    async function prefetchCategory(questions, language) {
+        if (prefetchController) prefetchController.abort(); // Only the open category is worth prefetching
+        const missing = questions
+            .map(question => question.id)
+            .filter(questionId => !prefetchedAnswers.has(prefetchKey(language, questionId)));
+        if (!missing.length) return;
+
+        const controller = new AbortController();
+        prefetchController = controller;
+        try {
+            const response = await fetch('/chat/batch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Accept': 'application/x-ndjson' },
+                body: JSON.stringify({ session_id: sessionId, question_ids: missing, language: language }),
+                signal: controller.signal
+            });
+            if (!response.ok) return;
+            const batchSessionId = response.headers.get('X-Session-Id');
+            if (batchSessionId && batchSessionId !== sessionId) {
+                sessionId = batchSessionId;
+                sessionStorage.setItem('viraaChatSessionId', sessionId);
+            }
+            await readNdjsonStream(response, result => {
+                if (result.status === 'ok') {
+                    prefetchedAnswers.set(prefetchKey(language, result.question_id), result);
+                }
+            });
+        } catch (error) {
+            if (error.name !== 'AbortError') console.warn('Prefetch failed:', error);
+        } finally {
+            if (prefetchController === controller) prefetchController = null;
+        }
+    }
+
+    // Parses a newline-delimited JSON response body, calling onItem for every line as it arrives
+    async function readNdjsonStream(response, onItem) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let newline;
+            while ((newline = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) onItem(JSON.parse(line));
+            }
+        }
     }
 
     function addCategoryEventListeners() {
@@ -246,9 +261,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
     function handleQuestionClick(event) {
         if (isLoading) return;
+        const questionId = parseInt(event.currentTarget.dataset.questionId);
         const questionText = event.currentTarget.dataset.questionText;
         const questionLang = event.currentTarget.dataset.questionLang || 'en'; // Fallback to 'en'
-        fetchAnswer(questionText, questionLang);
+        fetchAnswer(questionId, questionText, questionLang);
     }
 
     // Enhanced keyboard navigation
@@ -287,46 +303,105 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Enhanced fetch with better error handling and loading states
-    async function fetchAnswer(questionText, language = 'en') {
+    // Answers are streamed from /chat/stream (server-sent events) and rendered as they arrive.
+    async function fetchAnswer(questionId, questionText, language = 'en') {
         if (isLoading) return;
+
+        const prefetched = prefetchedAnswers.get(prefetchKey(language, questionId));
+        if (prefetched) {
+            mainContentArea.innerHTML = '';
+            addMessageToUI('user', questionText);
+            addMessageToUI('bot', prefetched.response, true, prefetched.media, prefetched.response_html);
+            announceToScreenReader('Answer received from Sona');
+            return;
+        }
         
         setLoadingState(true);
         mainContentArea.innerHTML = '';
         addMessageToUI('user', questionText);
         showTypingIndicator();
 
-        try {
-            const controller = new AbortController();
-            const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout
+        const controller = new AbortController();
+        let timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout (reset on every chunk)
+        let answerText = '';
+        let answerBody = null;
+        let renderPending = false;
+        let answerHtml = null; // Server-rendered HTML of the whole answer, sent with "done"
+
+        const renderAnswer = () => {
+            renderPending = false;
+            if (!answerBody) return;
+            answerBody.innerHTML = answerHtml ?? formatMessage(answerText);
+            answerBody.querySelectorAll('.copy-code-btn').forEach(btn => btn.addEventListener('click', handleCopyCode));
+        };
+        const scheduleRender = () => {
+            // Re-render at most once per frame, however many chunks arrive
+            if (!renderPending) {
+                renderPending = true;
+                requestAnimationFrame(renderAnswer);
+            }
+        };
 
-            const response = await fetch('/chat', {
+        try {
+            const response = await fetch('/chat/stream', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
                 body: JSON.stringify({
                     session_id: sessionId,
-                    message: questionText,
+                    question_id: questionId,
                     language: language // Send selected language to backend
                 }),
                 signal: controller.signal
             });
 
-            clearTimeout(timeoutId);
-
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
                 throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
             }
 
-            const data = await response.json();
-            
-            if (data.session_id && data.session_id !== sessionId) {
-                sessionId = data.session_id;
-                sessionStorage.setItem('viraaChatSessionId', sessionId);
-            }
-            
-            hideTypingIndicator();
-            addMessageToUI('bot', data.response, true, data.media);
-            announceToScreenReader('Answer received from Sona');
+            const handleEvent = (event, data) => {
+                switch (event) {
+                    case 'session':
+                        if (data.session_id && data.session_id !== sessionId) {
+                            sessionId = data.session_id;
+                            sessionStorage.setItem('viraaChatSessionId', sessionId);
+                        }
+                        break;
+                    case 'delta':
+                        if (!answerBody) {
+                            hideTypingIndicator();
+                            addMessageToUI('bot', '', true);
+                            answerBody = mainContentArea.querySelector('.answer-body');
+                        }
+                        answerText += data.text;
+                        scheduleRender();
+                        break;
+                    case 'blocked':
+                    case 'error':
+                        hideTypingIndicator();
+                        addMessageToUI('bot', data.message, true);
+                        answerBody = null;
+                        announceToScreenReader(event === 'blocked' ? 'Answer unavailable due to content guidelines' : 'Error occurred while getting answer');
+                        break;
+                    case 'done':
+                        hideTypingIndicator();
+                        answerHtml = data.response_html ?? null;
+                        if (!answerBody) {
+                            addMessageToUI('bot', answerText, true, data.media, answerHtml);
+                        } else {
+                            renderAnswer();
+                            answerBody.insertAdjacentHTML('afterend', generateMediaHTML(data.media));
+                        }
+                        answerBody = null;
+                        announceToScreenReader('Answer received from Sona');
+                        break;
+                }
+            };
+
+            await readEventStream(response, handleEvent, () => {
+                clearTimeout(timeoutId);
+                timeoutId = setTimeout(() => controller.abort(), 30000);
+            });
             
         } catch (error) {
             console.error('Error fetching answer:', error);
@@ -344,10 +419,39 @@ document.addEventListener('DOMContentLoaded', () => {
             addMessageToUI('bot', errorMessage, true);
             announceToScreenReader('Error occurred while getting answer');
         } finally {
+            clearTimeout(timeoutId);
             setLoadingState(false);
         }
     }
 
+    // Parses a text/event-stream response body, calling onEvent(event, data) for every complete event
+    async function readEventStream(response, onEvent, onChunk) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            onChunk();
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                const dataLines = [];
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+                });
+                if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+
     function setLoadingState(loading) {
         isLoading = loading;
         const buttons = document.querySelectorAll('.category-button, .question-button, .back-button');
@@ -512,11 +616,12 @@ document.addEventListener('DOMContentLoaded', () => {
         return now.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
     }
 
-    function addMessageToUI(sender, text, isAnswerDisplay = false, media = null) {
+    // html: the answer already rendered by the server (response_html), used instead of formatMessage
+    function addMessageToUI(sender, text, isAnswerDisplay = false, media = null, html = null) {
         const time = getCurrentTime();
         const isUser = sender === 'user';
         const senderName = isUser ? 'You' : 'Sona';
-        const formattedText = isUser ? escapeHTML(text) : formatMessage(text);
+        const formattedText = isUser ? escapeHTML(text) : (html ?? formatMessage(text));
 
         const messageHTML = `
             <div class="message-group">
@@ -537,7 +642,7 @@ document.addEventListener('DOMContentLoaded', () => {
                             <time class="message-time" datetime="${new Date().toISOString()}">${time}</time>
                         </div>
                         <div class="message-text" ${isAnswerDisplay ? 'role="main"' : ''}>
-                            ${isAnswerDisplay ? formattedText : `<p>${formattedText}</p>`}
+                            ${isAnswerDisplay ? `<div class="answer-body">${formattedText}</div>` : `<p>${formattedText}</p>`}
                             ${media && isAnswerDisplay && !isUser ? generateMediaHTML(media) : ''}
                             ${isAnswerDisplay ? `
                                 <div class="answer-actions">
@@ -0,0 +1,176 @@
+"""
+In-memory serving of the frontend's static files (index.html, script.js, style.css, ...).
+
+Every top-level file of the static directory is read once, along with gzip and brotli variants
+prepared up front. Each file gets a strong ETag, and If-None-Match requests are answered with 304.
+Scripts and stylesheets are also published under content-hashed names (script.<hash>.js), and
+index.html is rewritten to reference those. The hashed URLs can then be cached as immutable, while
+index.html and the plain names are revalidated on every use. Subdirectories (media) are left to the
+StaticFiles mount.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError: # Optional: without it only gzip variants are prepared
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_URL_PREFIX = "/static/"
+# Files that get a content-hashed URL (everything index.html links to that can change with a deploy)
+HASHED_EXTENSIONS = {".js", ".css"}
+# Smaller files are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+class StaticAsset:
+    """One file's bytes, its precompressed variants and validators."""
+
+    def __init__(self, name: str, body: bytes, content_type: str):
+        self.name = name
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.variants = {"identity": body} # Content-Encoding -> bytes
+        if len(body) >= COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants["br"] = compressed
+
+    @property
+    def hashed_name(self) -> str:
+        stem, extension = os.path.splitext(self.name)
+        return f"{stem}.{self.digest[:12]}{extension}"
+
+    def etag(self, encoding: str) -> str:
+        # Strong validators differ per representation
+        return f'"{self.digest[:16]}"' if encoding == "identity" else f'"{self.digest[:16]}-{encoding}"'
+
+    def etags(self) -> set[str]:
+        return {self.etag(encoding) for encoding in self.variants}
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+def _etag_matches(if_none_match: str, etags: set[str]) -> bool:
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") in etags:
+            return True
+    return False
+
+class StaticAssetStore:
+    """Static files by URL name: plain names (script.js) and content-hashed names (script.<hash>.js)."""
+
+    def __init__(self, assets: dict[str, StaticAsset]):
+        self._assets = {} # URL name -> (asset, Cache-Control)
+        for asset in assets.values():
+            self._assets[asset.name] = (asset, REVALIDATE_CACHE_CONTROL)
+            if os.path.splitext(asset.name)[1] in HASHED_EXTENSIONS:
+                self._assets[asset.hashed_name] = (asset, IMMUTABLE_CACHE_CONTROL)
+        self.urls = {
+            f"{STATIC_URL_PREFIX}{asset.name}": f"{STATIC_URL_PREFIX}{asset.hashed_name}"
+            for asset in assets.values() if os.path.splitext(asset.name)[1] in HASHED_EXTENSIONS
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._assets
+
+    def get(self, name: str) -> StaticAsset | None:
+        entry = self._assets.get(name)
+        return entry[0] if entry else None
+
+    def url(self, path: str) -> str:
+        """The content-hashed URL of a /static/ path, or the path itself if it has none."""
+        return self.urls.get(path, path)
+
+    def response(self, name: str, request: Request) -> Response | None:
+        """The asset as a response negotiated for the request (304, compressed or plain), or None if unknown."""
+        entry = self._assets.get(name)
+        if entry is None:
+            return None
+        asset, cache_control = entry
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((coding for coding in ("br", "gzip") if coding in asset.variants and coding in accepted), "identity")
+        headers = {"ETag": asset.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match", ""), asset.etags()):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.content_type, headers=headers)
+
+    @classmethod
+    def load(cls, directory: str = STATIC_DIR) -> "StaticAssetStore":
+        """Reads and compresses the top-level files of `directory`; index.html links to the hashed URLs."""
+        raw = {}
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError as e:
+            logger.warning(f"Could not read static directory {directory}: {e}")
+            names = []
+        for name in names:
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                raw[name] = f.read()
+
+        assets = {}
+        for name, body in raw.items():
+            if name != "index.html":
+                assets[name] = StaticAsset(name, body, _content_type(name))
+        store = cls(assets)
+        if "index.html" in raw:
+            html = raw["index.html"].decode("utf-8")
+            for path, hashed_path in store.urls.items():
+                html = html.replace(f'"{path}"', f'"{hashed_path}"')
+            assets["index.html"] = StaticAsset("index.html", html.encode("utf-8"), "text/html; charset=utf-8")
+            store = cls(assets)
+        logger.info(f"Loaded {len(assets)} static assets from {directory}")
+        return store
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    return content_type
+
+_static_assets = None
+_static_assets_lock = threading.Lock()
+
+def get_static_assets() -> StaticAssetStore:
+    """The process-wide asset store, loaded on first use (or by the startup warmup)."""
+    global _static_assets
+    if _static_assets is None:
+        with _static_assets_lock:
+            if _static_assets is None:
+                _static_assets = StaticAssetStore.load(STATIC_DIR)
+    return _static_assets
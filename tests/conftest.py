@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+# The app reads its settings at import: answer everything live from the fake backend, without
+# a per-client limit on free text and with short retry delays
+os.environ.setdefault("GOOGLE_API_KEY", "test-fake-key")
+os.environ["ANSWER_STORE_PATH"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "no-answer-store.json")
+os.environ.setdefault("FREE_TEXT_PER_MINUTE", "0")
+os.environ.setdefault("GEMINI_RETRY_BASE_DELAY_SECONDS", "0.001")
+os.environ.setdefault("GEMINI_RETRY_MAX_DELAY_SECONDS", "0.001")
+os.environ.setdefault("KNOWLEDGE_WATCH_SECONDS", "0")
+
+class FakeClock:
+    """Stands in for time.monotonic/time.time in components that take a clock; tests advance `now`."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """The fake Gemini backend with fast, successful calls, and a fresh circuit breaker. Returns its config to adjust."""
+    pytest.importorskip("google.generativeai")
+    import chat_logic
+    from benchmarks.fake_gemini import FakeBackendConfig, install
+    from resilience import CircuitBreaker
+
+    monkeypatch.setattr(chat_logic.upstream, "breaker", CircuitBreaker())
+    return install(FakeBackendConfig(latency_ms=1, jitter_ms=0, chunk_interval_ms=1))
+
+@pytest.fixture
+def client(fake_backend):
+    """Test client for the app (without its lifespan: nothing is warmed up in the background)."""
+    from fastapi.testclient import TestClient
+    import main
+
+    return TestClient(main.app)
@@ -0,0 +1,66 @@
+import asyncio
+
+from answer_cache import AnswerCache, MemoryAnswerCache, SQLiteAnswerCache, answer_cache_key
+
+def test_key_covers_question_language_and_fingerprint():
+    key = answer_cache_key("how to latch", "en", "abc")
+    assert key == answer_cache_key("how to latch", "en", "abc")
+    assert len({key, answer_cache_key("how to latch", "hi", "abc"), answer_cache_key("how to latch", "en", "abd")}) == 3
+
+def test_memory_lru_by_entries(clock):
+    cache = MemoryAnswerCache(max_entries=2, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a") # b is now the least recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None and cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+
+def test_memory_bounded_by_bytes(clock):
+    cache = MemoryAnswerCache(max_entries=100, max_bytes=10, clock=clock)
+    cache.put("a", "स्त") # 9 UTF-8 bytes
+    cache.put("b", "xy")
+    assert cache.get("a") is None and cache.get("b") == "xy"
+    cache.put("huge", "x" * 11) # Larger than the whole cache: not stored, nothing evicted
+    assert cache.get("huge") is None and cache.get("b") == "xy"
+    assert cache.stats()["bytes"] == 2
+
+def test_memory_replacing_a_key_keeps_the_byte_count(clock):
+    cache = MemoryAnswerCache(max_entries=10, max_bytes=100, clock=clock)
+    cache.put("a", "x" * 40)
+    cache.put("a", "x" * 10)
+    assert cache.stats()["bytes"] == 10 and cache.stats()["entries"] == 1
+
+def test_memory_entries_expire(clock):
+    cache = MemoryAnswerCache(ttl_seconds=60, clock=clock)
+    cache.put("a", "A")
+    clock.now += 59
+    assert cache.get("a") == "A"
+    clock.now += 2
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["entries"], stats["bytes"]) == (1, 0, 0)
+
+def test_sqlite_tier_expires_and_trims(tmp_path, clock):
+    cache = SQLiteAnswerCache(str(tmp_path / "answers.sqlite3"), max_entries=2, ttl_seconds=60, clock=clock)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+        clock.now += 1
+    cache.trim()
+    assert cache.get("a") is None and cache.get("c") == "C"
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+    clock.now += 60
+    assert cache.get("c") is None
+
+def test_tiers_fill_memory_from_the_shared_file(tmp_path):
+    path = str(tmp_path / "answers.sqlite3")
+    # Two caches on one file stand in for two workers
+    first = AnswerCache(MemoryAnswerCache(), SQLiteAnswerCache(path))
+    second = AnswerCache(MemoryAnswerCache(), SQLiteAnswerCache(path))
+
+    async def run():
+        await first.put("k", "answer")
+        return await second.get("k"), await second.get("k"), await second.get("missing")
+    assert asyncio.run(run()) == ("answer", "answer", None)
+    stats = second.stats()
+    assert (stats["shared_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
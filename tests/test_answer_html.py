@@ -0,0 +1,106 @@
+import json
+import re
+import shutil
+import subprocess
+from html.parser import HTMLParser
+from pathlib import Path
+
+import pytest
+
+from answer_html import RenderedAnswerCache, render_answer_html
+
+SCRIPT_JS = Path(__file__).resolve().parent.parent / "static" / "script.js"
+
+class Elements(HTMLParser):
+    """The tags and attributes of a fragment, as a browser would see them."""
+
+    def __init__(self, fragment: str):
+        super().__init__()
+        self.tags = []
+        self.attributes = []
+        self.feed(fragment)
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append(tag)
+        self.attributes.extend(attrs)
+
+def test_markup_in_the_answer_is_escaped():
+    rendered = render_answer_html('<script>alert(1)</script> and <img src=x onerror="alert(1)">')
+    assert "<script" not in rendered and "<img" not in rendered
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in rendered
+    assert Elements(rendered).tags == ["p"]
+
+def test_markup_inside_formatting_is_escaped():
+    elements = Elements(render_answer_html("## <b onclick=x>Title</b>\n\n- **<iframe>**\n- *<svg onload=x>*"))
+    assert elements.tags == ["h2", "ul", "li", "strong", "li", "em"]
+    assert elements.attributes == []
+
+def test_code_block_cannot_break_out_of_its_attribute():
+    code = 'x = "a" onmouseover="alert(1)" <script>'
+    rendered = render_answer_html(f"```python\n{code}\n```")
+    elements = Elements(rendered)
+    assert "script" not in elements.tags
+    data_code = [value for name, value in elements.attributes if name == "data-code"]
+    assert data_code == [code] # The browser decodes it back to the code as written, for the copy button
+    assert ("onmouseover", "alert(1)") not in elements.attributes
+
+def test_json_code_block_is_highlighted_and_escaped():
+    rendered = render_answer_html('```json\n{"a": "<b>", "n": 1, "ok": true, "none": null}\n```')
+    assert '<span class="key">"a"</span>:' in rendered
+    assert '<span class="string">"&lt;b&gt;"</span>' in rendered
+    assert '<span class="number">1</span>' in rendered and '<span class="boolean">true</span>' in rendered
+    assert "b" not in Elements(rendered).tags
+
+def test_cache_renders_each_answer_once():
+    cache = RenderedAnswerCache(max_entries=2)
+    first = cache.html("**one**")
+    assert cache.html("**one**") is first
+    cache.html("two")
+    assert cache.stats()["hits"] == 1 and cache.stats()["renders"] == 2
+    cache.html("three") # Evicts "**one**"
+    cache.html("**one**")
+    assert cache.stats()["renders"] == 4
+
+def extract_function(source: str, name: str) -> str:
+    start = source.index(f"function {name}(")
+    depth = 0
+    for index in range(source.index("{", start), len(source)):
+        depth += {"{": 1, "}": -1}.get(source[index], 0)
+        if depth == 0:
+            return source[start:index + 1]
+    raise ValueError(name)
+
+# textContent -> innerHTML escapes only &, < and >, which is what the server's _escape does
+NODE_ESCAPE = "function escapeHTML(text) { return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;'); }"
+
+def format_message_in_node(texts: list) -> list:
+    source = SCRIPT_JS.read_text(encoding="utf-8")
+    functions = [extract_function(source, name) for name in ("formatMessage", "formatJSON", "highlightJSONString")]
+    program = "\n".join([NODE_ESCAPE, *functions,
+                         "const texts = JSON.parse(require('fs').readFileSync(0, 'utf8'));",
+                         "process.stdout.write(JSON.stringify(texts.map(formatMessage)));"])
+    result = subprocess.run(["node", "-e", program], input=json.dumps(texts), capture_output=True, text=True,
+                            check=True, timeout=30)
+    return json.loads(result.stdout)
+
+def normalize(fragment: str) -> str:
+    # The frontend's code block template is indented over several lines
+    return re.sub(r"\s*(<|>)\s*", r"\1", re.sub(r"\s+", " ", fragment)).strip()
+
+# JSON blocks and code with quotes are left out on purpose: there the server quotes data-code and
+# keeps the colons after keys, which the frontend does not
+PARITY_CASES = [
+    "# Title\n\n## Section\n\n### Sub-section\n\nSome text.",
+    "Feeding is **important** and *gentle*.\nA second line.\n\nA new paragraph.",
+    "Signs of a good latch:\n\n- Wide mouth\n- Lips turned out\n* Chin touching\n• No pain",
+    "Steps:\n\n1. Wash hands\n2. Get comfortable\n3. Support the baby",
+    "Mixed **bold with *nested* text** here.",
+    "Example:\n\n```python\ndef feed(times):\n    return times * 8\n```\n\nDone.",
+    "```\nplain code block\n```",
+]
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run static/script.js")
+def test_matches_the_frontend_format_message():
+    expected = format_message_in_node(PARITY_CASES)
+    for text, frontend in zip(PARITY_CASES, expected):
+        assert normalize(render_answer_html(text)) == normalize(frontend), text
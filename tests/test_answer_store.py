@@ -0,0 +1,55 @@
+import json
+
+from answer_store import STORE_FORMAT, AnswerStore
+
+def sample_store() -> AnswerStore:
+    store = AnswerStore()
+    store.add(101, "How do I latch?", "en", "**Wide** mouth.", "hash-en", generated_at=1.0)
+    store.add(101, "कैसे पकड़ाएं?", "hi", "मुंह चौड़ा।", "hash-hi", generated_at=2.0)
+    store.add(None, "Free text question", "en", "Free answer.", "hash-free", generated_at=3.0)
+    return store
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "nested" / "answer_store.json")
+    sample_store().save(path)
+    loaded = AnswerStore.load(path)
+    assert len(loaded) == 3 and loaded.built_at is not None
+    assert loaded.lookup("  how do I LATCH? ", "en") == "**Wide** mouth."
+    assert loaded.lookup_id(101, "hi") == "मुंह चौड़ा।"
+    assert loaded.lookup_id(101, "bn") is None
+    assert loaded.lookup("Free text question", "en") == "Free answer."
+    assert loaded.entry("How do I latch?", "en") == sample_store().entry("How do I latch?", "en")
+    assert not (tmp_path / "nested" / "answer_store.json.tmp").exists()
+
+def test_saved_file_is_readable_json(tmp_path):
+    path = tmp_path / "answer_store.json"
+    sample_store().save(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["format"] == STORE_FORMAT
+    assert [(entry["language"], entry["question_id"]) for entry in data["answers"]] == [("en", None), ("en", 101), ("hi", 101)]
+    assert "मुंह" in path.read_text(encoding="utf-8") # Not \u-escaped
+
+def test_other_format_is_ignored(tmp_path):
+    path = tmp_path / "answer_store.json"
+    sample_store().save(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["format"] = STORE_FORMAT - 1
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert len(AnswerStore.load(str(path))) == 0
+
+def test_missing_or_corrupt_file_is_empty(tmp_path):
+    assert len(AnswerStore.load(str(tmp_path / "missing.json"))) == 0
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json", encoding="utf-8")
+    assert len(AnswerStore.load(str(corrupt))) == 0
+
+def test_stale_prompt_hashes_are_dropped(tmp_path):
+    path = str(tmp_path / "answer_store.json")
+    sample_store().save(path)
+    current = {"en": "hash-en", "hi": "hash-hi-v2"} # The Hindi prompt changed since the build
+
+    loaded = AnswerStore.load(path, prompt_hash_fn=lambda question, language: current[language])
+    assert loaded.lookup_id(101, "en") == "**Wide** mouth."
+    assert loaded.lookup_id(101, "hi") is None
+    assert loaded.lookup("Free text question", "en") is None # Its hash is not the current English one
+    assert len(loaded) == 1
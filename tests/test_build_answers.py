@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+import build_answers
+from answer_store import AnswerStore
+from build_answers import StoreSaver, build_answer_store
+
+def saved_count(path) -> int:
+    with open(path, encoding="utf-8") as f:
+        return len(json.load(f)["answers"])
+
+def test_saver_batches_by_count_and_time(tmp_path, clock):
+    path = str(tmp_path / "answer_store.json")
+    store = AnswerStore()
+    saver = StoreSaver(store, path, every_answers=3, every_seconds=60, clock=clock)
+
+    async def add(count):
+        for _ in range(count):
+            index = len(store)
+            store.add(index, f"question {index}", "en", "answer", "hash")
+            await saver.added()
+    asyncio.run(add(2))
+    assert saver.saves == 0 and saver.pending == 2
+    asyncio.run(add(1))
+    assert saver.saves == 1 and saver.pending == 0 and saved_count(path) == 3
+    clock.now += 60
+    asyncio.run(add(1)) # One answer, but the last save is a minute old
+    assert saver.saves == 2
+    saver.flush_now()
+    assert saver.saves == 2 # Nothing pending
+
+@pytest.fixture
+def generate(monkeypatch):
+    """Stands in for generation: answers instantly, or waits forever once `stall_after` answers are given."""
+    state = {"calls": 0, "stall_after": None}
+
+    async def generate_answer_text_async(session_id, question, language, priority, question_id=None):
+        state["calls"] += 1
+        if state["stall_after"] is not None and state["calls"] > state["stall_after"]:
+            await asyncio.Event().wait()
+        await asyncio.sleep(0)
+        return f"Answer to {question}"
+    monkeypatch.setattr(build_answers, "generate_answer_text_async", generate_answer_text_async)
+    monkeypatch.setattr(build_answers, "SAVE_EVERY_ANSWERS", 1000)
+    monkeypatch.setattr(build_answers, "SAVE_EVERY_SECONDS", 3600)
+    return state
+
+def test_interrupted_build_is_saved_and_resumes(tmp_path, generate):
+    path = str(tmp_path / "answer_store.json")
+    generate["stall_after"] = 5
+
+    async def interrupted():
+        build = asyncio.ensure_future(build_answer_store(path, concurrency=2, languages=["en"]))
+        while generate["calls"] < 7: # Five answers in, two generations stuck
+            await asyncio.sleep(0.001)
+        build.cancel() # What asyncio.run does on Ctrl+C
+        with pytest.raises(asyncio.CancelledError):
+            await build
+    asyncio.run(interrupted())
+    assert saved_count(path) == 5 # Saved by the final flush, though no batch filled up
+
+    generate["stall_after"] = None
+    report = asyncio.run(build_answer_store(path, concurrency=2, languages=["en"]))
+    planned = report["planned"]
+    assert planned["current"] == 5 and report["generated"] == planned["missing"]
+    assert saved_count(path) == 5 + planned["missing"]
+    assert asyncio.run(build_answer_store(path, languages=["en"], dry_run=True))["planned"]["missing"] == 0
@@ -0,0 +1,125 @@
+import json
+import uuid
+
+import pytest
+
+def free_text() -> str:
+    # Unique per test, so the runtime answer cache never serves an earlier test's answer
+    return f"What should I know about feeding, case {uuid.uuid4().hex[:8]}?"
+
+def test_chat_answers_free_text(client, fake_backend):
+    response = client.post("/chat", json={"message": free_text()})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"] == fake_backend.answer_text and body["session_id"]
+
+def test_non_retryable_upstream_error_is_a_502_without_details(client, fake_backend):
+    import chat_logic
+
+    fake_backend.error_rate, fake_backend.error_kind = 1.0, "invalid"
+    response = client.post("/chat", json={"message": free_text()})
+    assert response.status_code == 502
+    assert response.json() == {"detail": chat_logic.GENERATION_ERROR_MESSAGE}
+    assert "fake invalid argument" not in response.text
+
+def test_upstream_outage_is_a_503(client, fake_backend):
+    fake_backend.error_rate, fake_backend.error_kind = 1.0, "unavailable"
+    response = client.post("/chat", json={"message": free_text()})
+    assert response.status_code == 503
+    assert "fake upstream unavailable" not in response.text
+
+def test_open_circuit_is_a_503_with_retry_after(client, fake_backend, monkeypatch):
+    import chat_logic
+    from resilience import CircuitBreaker
+
+    monkeypatch.setattr(chat_logic.upstream, "breaker", CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30))
+    chat_logic.upstream.breaker.record_failure()
+    response = client.post("/chat", json={"message": free_text()})
+    assert response.status_code == 503
+    assert 1 <= int(response.headers["retry-after"]) <= 30
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Records the (question, language, question_id) that /chat generates an answer for."""
+    import main
+
+    calls = []
+
+    async def generate(session_id, question, language="en", **options):
+        calls.append((question, language, options.get("question_id")))
+        return "Generated answer."
+    monkeypatch.setattr(main, "generate_answer_for_question_async", generate)
+    return calls
+
+def test_question_id_resolves_to_the_catalogue_text(client, generated):
+    from catalogue import get_catalogue
+
+    catalogue = get_catalogue()
+    hindi = catalogue.text(101, "hi")
+    assert client.post("/chat", json={"question_id": 101, "language": "hi"}).status_code == 200
+    # The exact text in another language resolves to the same question
+    english = catalogue.text(101, "en")
+    assert client.post("/chat", json={"message": f"  {english.upper()} ", "language": "hi"}).status_code == 200
+    # No text in the language: English
+    assert client.post("/chat", json={"question_id": 101, "language": "xx"}).status_code == 200
+    assert generated == [(hindi, "hi", 101), (hindi, "hi", 101), (english, "xx", 101)]
+
+def test_unknown_question_id_is_a_400(client, generated):
+    response = client.post("/chat", json={"question_id": 999999})
+    assert response.status_code == 400
+    assert "999999" in response.json()["detail"]
+    assert client.post("/chat/batch", json={"question_ids": [101, 999999]}).status_code == 400
+    assert generated == []
+
+def test_catalogue_revalidates_with_etag(client):
+    response = client.get("/catalogue", params={"lang": "hi"})
+    assert response.status_code == 200
+    menu = response.json()
+    assert menu["language"] == "hi" and menu["categories"]
+    assert all(question["text"] for category in menu["categories"] for question in category["questions"])
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+    revalidated = client.get("/catalogue", params={"lang": "hi"}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert client.get("/catalogue", params={"lang": "en"}).headers["etag"] != etag
+    assert client.get("/catalogue", params={"lang": "xx"}).status_code == 404
+
+def stream_events(client, payload: dict) -> list[tuple[str, dict]]:
+    """The (event, data) pairs of a /chat/stream response."""
+    response = client.post("/chat/stream", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_events_in_order(client, fake_backend):
+    events = stream_events(client, {"message": free_text()})
+    names = [event for event, _ in events]
+    assert names[0] == "session" and names[-1] == "done" and set(names[1:-1]) == {"delta"}
+    assert "".join(data["text"] for event, data in events if event == "delta") == fake_backend.answer_text
+    done = events[-1][1]
+    assert set(done) == {"session_id", "media", "response_html"} and done["session_id"] == events[0][1]["session_id"]
+
+def test_stream_blocked_event(client, fake_backend):
+    fake_backend.blocked_rate = 1.0
+    events = stream_events(client, {"message": free_text()})
+    assert [event for event, _ in events] == ["session", "blocked"]
+    blocked = events[-1][1]
+    assert set(blocked) == {"reason", "safety_issues", "message"}
+    assert blocked["reason"] == "SAFETY" and isinstance(blocked["safety_issues"], list) and blocked["message"]
+
+def test_stream_error_event_when_the_circuit_is_open(client, fake_backend, monkeypatch):
+    import chat_logic
+    from resilience import CircuitBreaker
+
+    monkeypatch.setattr(chat_logic.upstream, "breaker", CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30))
+    chat_logic.upstream.breaker.record_failure()
+    events = stream_events(client, {"message": free_text()})
+    assert [event for event, _ in events] == ["session", "error"]
+    error = events[-1][1]
+    assert set(error) == {"message", "retry_after"}
+    assert error["message"] and 0 < error["retry_after"] <= 30
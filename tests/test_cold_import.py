@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_imports_without_api_key_or_sdk():
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_API_KEY"}
+    code = (
+        "import sys, main\n"
+        "assert 'google.generativeai' not in sys.modules, 'SDK imported at startup'\n"
+        "from fastapi.testclient import TestClient\n"
+        "assert TestClient(main.app).get('/health').status_code == 200\n"
+    )
+    # A fresh interpreter, so modules imported by other tests do not count
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from context_cache import CacheHandle, ContextCacheBackend, ContextCacheManager, TokenUsage
+
+class FakeBackend(ContextCacheBackend):
+    """Hands out numbered handles and models that remember which handle they are bound to."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.fail = False
+        self.created = []
+        self.refreshed = 0
+        self.deleted = []
+
+    def create(self, model_name, system_instruction, ttl_seconds):
+        if self.fail:
+            raise RuntimeError("cache unavailable")
+        self.created.append(system_instruction)
+        return CacheHandle(f"cachedContents/{len(self.created)}", self.clock() + ttl_seconds)
+
+    def refresh(self, handle, ttl_seconds):
+        if self.fail:
+            raise RuntimeError("cache unavailable")
+        self.refreshed += 1
+        return CacheHandle(handle.name, self.clock() + ttl_seconds)
+
+    def model_for(self, handle, generation_config, safety_settings):
+        return ("model", handle.name)
+
+    def delete(self, handle):
+        self.deleted.append(handle.name)
+
+@pytest.fixture
+def backend(clock):
+    return FakeBackend(clock)
+
+def manager_for(backend, clock, **options) -> ContextCacheManager:
+    return ContextCacheManager(backend, "gemini-test", "system prompt", {}, {}, ttl_seconds=3600,
+                               refresh_margin_seconds=300, retry_after_seconds=60, clock=clock, **options)
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ContextCacheBackend()
+
+def test_refresher_creates_the_handle_at_startup(backend, clock):
+    manager = manager_for(backend, clock)
+    assert manager.current_model() is None and manager.needs_refresh()
+
+    async def start():
+        refresher = asyncio.ensure_future(manager.run_refresher(interval_seconds=60))
+        while manager.current_model() is None:
+            await asyncio.sleep(0.001)
+        refresher.cancel()
+    asyncio.run(start())
+    assert backend.created == ["system prompt"]
+    assert manager.current_model() == ("model", "cachedContents/1")
+    assert not manager.needs_refresh()
+
+def test_refreshes_before_expiry(backend, clock):
+    manager = manager_for(backend, clock)
+    model = manager.get_model()
+    clock.now += 3600 - 301 # Just outside the refresh margin
+    assert manager.get_model() is model and backend.refreshed == 0
+    clock.now += 2
+    assert manager.get_model() is model
+    assert backend.refreshed == 1 and len(backend.created) == 1
+    assert manager.stats()["expires_in_seconds"] == 3600
+
+def test_expired_handle_is_created_again(backend, clock):
+    manager = manager_for(backend, clock)
+    manager.get_model()
+    clock.now += 3601
+    assert manager.current_model() is None
+    assert manager.get_model() == ("model", "cachedContents/2")
+
+def test_failure_backs_off(backend, clock):
+    manager = manager_for(backend, clock)
+    backend.fail = True
+    assert manager.get_model() is None
+    assert manager.stats()["failures"] == 1
+    clock.now += 59
+    assert not manager.needs_refresh() and manager.get_model() is None
+    assert manager.stats()["failures"] == 1 # No backend call during the back-off
+    backend.fail = False
+    clock.now += 1
+    assert manager.get_model() == ("model", "cachedContents/1")
+
+def test_switch_instruction_creates_a_new_cache(backend, clock):
+    manager = manager_for(backend, clock)
+    manager.get_model()
+    manager.switch_instruction("system prompt") # Unchanged: keeps the handle
+    assert manager.current_model() is not None
+    manager.switch_instruction("new system prompt")
+    assert manager.current_model() is None
+    assert manager.get_model() == ("model", "cachedContents/2")
+    assert backend.created == ["system prompt", "new system prompt"]
+    assert backend.deleted == [] # Calls bound to the old cache may still be running
+
+def test_close_deletes_the_handle(backend, clock):
+    manager = manager_for(backend, clock)
+    manager.close() # Nothing to delete yet
+    manager.get_model()
+    manager.close()
+    assert backend.deleted == ["cachedContents/1"]
+    assert manager.current_model() is None and not manager.stats()["active"]
+
+def test_token_usage_splits_cached_and_uncached():
+    usage = TokenUsage()
+    assert usage.record(None) is None
+    first = usage.record(SimpleNamespace(prompt_token_count=1000, cached_content_token_count=900, candidates_token_count=200))
+    usage.record(SimpleNamespace(prompt_token_count=300, cached_content_token_count=None, candidates_token_count=50))
+    assert first == {"input_tokens": 1000, "cached_input_tokens": 900, "uncached_input_tokens": 100, "output_tokens": 200}
+    assert usage.stats() == {"requests": 2, "input_tokens": 1300, "cached_input_tokens": 900,
+                             "uncached_input_tokens": 400, "output_tokens": 250}
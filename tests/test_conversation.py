@@ -0,0 +1,63 @@
+from conversation import CHARS_PER_TOKEN, ConversationWindow, answer_gist, estimate_tokens
+
+def answer(index: int, chars: int = 400) -> str:
+    return f"**Feed** often, turn {index}. " + "x" * chars
+
+def test_turns_within_budget_are_kept_verbatim():
+    window = ConversationWindow(token_budget=1000, summary_budget=400)
+    window.add_turn("q1", answer(1))
+    window.add_turn("q2", answer(2))
+    assert [turn.question for turn in window.turns] == ["q1", "q2"]
+    assert window.turns[0].answer == answer(1)
+    assert not window.summary and window.stats()["compacted_turns"] == 0
+
+def test_oldest_turns_are_compacted_over_budget():
+    window = ConversationWindow(token_budget=300, summary_budget=400)
+    for index in range(1, 5):
+        window.add_turn(f"q{index}", answer(index))
+    stats = window.stats()
+    assert stats["turn_tokens"] <= 300
+    assert [turn.question for turn in window.turns] == ["q3", "q4"]
+    assert list(window.summary) == ['- Asked "q1": Feed often, turn 1.', '- Asked "q2": Feed often, turn 2.']
+    assert stats["compacted_turns"] == 2 and stats["summary_lines"] == 2
+
+def test_summary_keeps_its_newest_lines_within_budget():
+    window = ConversationWindow(token_budget=150, summary_budget=30)
+    for index in range(1, 11):
+        window.add_turn(f"question {index}", answer(index))
+    stats = window.stats()
+    assert stats["compacted_turns"] == 9
+    assert stats["summary_tokens"] <= 30
+    assert stats["summary_tokens"] == sum(estimate_tokens(line) for line in window.summary)
+    assert window.summary[-1] == '- Asked "question 9": Feed often, turn 9.'
+    assert not any('"question 1"' in line for line in window.summary)
+
+def test_single_oversized_turn_is_clipped():
+    window = ConversationWindow(token_budget=100, summary_budget=30)
+    window.add_turn("q1", answer(1))
+    window.add_turn("big", "y" * 2000)
+    assert [turn.question for turn in window.turns] == ["big"]
+    turn = window.turns[0]
+    assert turn.answer.endswith("…") and len(turn.answer) <= 100 * CHARS_PER_TOKEN
+    assert window.turn_tokens == turn.tokens <= 100 + 1
+
+def test_contents_put_the_summary_first_then_recent_turns():
+    window = ConversationWindow(token_budget=150, summary_budget=400)
+    for index in range(1, 4):
+        window.add_turn(f"q{index}", answer(index))
+    contents = window.contents("next question")
+    assert [message["role"] for message in contents] == ["user", "model", "user"]
+    first = contents[0]["parts"][0]
+    assert first.startswith("Summary of the earlier conversation:\n")
+    assert first.index('Asked "q1"') < first.index('Asked "q2"') < first.index("\n\nq3")
+    assert contents[1]["parts"] == [answer(3)]
+    assert contents[2]["parts"] == ["next question"]
+
+def test_contents_of_an_empty_window():
+    assert ConversationWindow().contents("first question") == [{"role": "user", "parts": ["first question"]}]
+
+def test_answer_gist_skips_markdown():
+    assert answer_gist("### Heading\n\n- **Skin to skin** helps. It calms the baby.") == "Heading"
+    assert answer_gist("\n\n1. First step. Second.") == "First step."
+    assert answer_gist("**Latch** matters. More.") == "Latch matters."
+    assert answer_gist("") == ""
@@ -0,0 +1,60 @@
+import mmap
+import os
+
+import pytest
+
+import knowledge_base
+from knowledge_base import KNOWLEDGE_BASE_MARKER, KnowledgeBase
+
+@pytest.fixture
+def knowledge_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_base, "KNOWLEDGE_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    directory = tmp_path / "knowledge"
+    directory.mkdir()
+    (directory / knowledge_base.GUIDELINES_FILE).write_text("Be kind.\n", encoding="utf-8")
+    (directory / knowledge_base.TRANSCRIPT_FILE).write_text("Feed on demand. स्तनपान.\n" * 200, encoding="utf-8")
+    return directory
+
+def test_maps_a_snapshot_not_the_file(knowledge_dir):
+    knowledge = KnowledgeBase.load(str(knowledge_dir))
+    assert isinstance(knowledge._transcript_data, mmap.mmap)
+    assert knowledge.system_prompt == "Be kind.\n" + KNOWLEDGE_BASE_MARKER + "Feed on demand. स्तनपान.\n" * 200
+    # Truncating and rewriting the data file in place leaves the loaded version intact
+    with open(knowledge_dir / knowledge_base.TRANSCRIPT_FILE, "r+b") as f:
+        f.truncate(0)
+        f.write(b"Edited.")
+    assert knowledge.transcript_text() == "Feed on demand. स्तनपान.\n" * 200
+    assert bytes(knowledge.transcript_bytes[:15]) == b"Feed on demand."
+
+def test_same_content_shares_one_snapshot(knowledge_dir):
+    first = KnowledgeBase.load(str(knowledge_dir))
+    second = KnowledgeBase.load(str(knowledge_dir))
+    assert first.version == second.version
+    assert len(os.listdir(knowledge_base.KNOWLEDGE_SNAPSHOT_DIR)) == 2 # Guidelines and transcript
+
+def test_edit_makes_a_new_version(knowledge_dir):
+    first = KnowledgeBase.load(str(knowledge_dir))
+    (knowledge_dir / knowledge_base.TRANSCRIPT_FILE).write_text("Feed every three hours.\n", encoding="utf-8")
+    second = KnowledgeBase.load(str(knowledge_dir))
+    assert second.version != first.version
+    assert first.transcript_text().startswith("Feed on demand.")
+    assert second.transcript_text() == "Feed every three hours.\n"
+
+def test_unwritable_snapshot_dir_keeps_bytes(knowledge_dir, monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(knowledge_base, "KNOWLEDGE_SNAPSHOT_DIR", str(blocker / "snapshots"))
+    knowledge = KnowledgeBase.load(str(knowledge_dir))
+    assert isinstance(knowledge._transcript_data, bytes)
+    assert knowledge.guidelines == "Be kind.\n"
+
+def test_empty_file(knowledge_dir):
+    (knowledge_dir / knowledge_base.GUIDELINES_FILE).write_bytes(b"")
+    assert KnowledgeBase.load(str(knowledge_dir)).guidelines == ""
+
+def test_derived_is_built_once_per_version(knowledge_dir):
+    knowledge = KnowledgeBase.load(str(knowledge_dir))
+    builds = []
+    for _ in range(3):
+        knowledge.derived("value", lambda: builds.append(1) or len(builds))
+    assert builds == [1]
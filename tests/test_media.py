@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import media
+from media import MediaLibrary, build_manifest
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    (media_dir / "latch.mp4").write_bytes(bytes(range(256)) * 40)
+    monkeypatch.setattr(media, "MEDIA_DIR", str(media_dir))
+    manifest_path = str(tmp_path / "media_manifest.json")
+    build_manifest(manifest_path, str(media_dir))
+    return MediaLibrary.load(manifest_path), media_dir / "latch.mp4"
+
+def client_for(library: MediaLibrary) -> TestClient:
+    async def serve(request):
+        asset = library.asset(request.path_params["asset_id"])
+        response = await asset.response(request) if asset is not None else None
+        return response or Response(status_code=404)
+    return TestClient(Starlette(routes=[Route("/media/{asset_id}", serve, methods=["GET", "HEAD"])]))
+
+def test_full_range_and_not_modified(library):
+    library, path = library
+    asset = library.asset(next(iter(library._by_id)))
+    client = client_for(library)
+    full = client.get(asset.url)
+    assert full.status_code == 200 and full.content == path.read_bytes()
+    assert full.headers["etag"] == asset.etag
+    partial = client.get(asset.url, headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206 and partial.content == path.read_bytes()[100:200]
+    assert client.get(asset.url, headers={"If-None-Match": asset.etag}).status_code == 304
+
+def test_changed_file_is_not_served_under_its_old_hash(library):
+    library, path = library
+    asset = library.asset(next(iter(library._by_id)))
+    client = client_for(library)
+    path.write_bytes(b"short") # Truncated: the loaded size would be wrong
+    assert client.get(asset.url).status_code == 404
+
+def test_same_size_rewrite_is_not_served(library):
+    library, path = library
+    asset = library.asset(next(iter(library._by_id)))
+    client = client_for(library)
+    stat_result = os.stat(path)
+    path.write_bytes(b"\x00" * stat_result.st_size)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+    assert client.get(asset.url).status_code == 404
+
+def test_missing_file(library):
+    library, path = library
+    asset = library.asset(next(iter(library._by_id)))
+    path.unlink()
+    assert client_for(library).get(asset.url).status_code == 404
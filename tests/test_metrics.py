@@ -0,0 +1,35 @@
+from metrics import MetricsRegistry
+
+def test_counter_and_callback_render():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("result",))
+    requests.inc(result="ok")
+    requests.inc(2, result='say "hi"')
+    registry.callback("queue_depth", "Waiting calls.", lambda: 3)
+    registry.callback("skipped", "Unknown yet.", lambda: None)
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{result="ok"} 1' in lines
+    assert 'requests_total{result="say \\"hi\\""} 2' in lines
+    assert "queue_depth 3" in lines
+    assert not any(line.startswith("skipped ") for line in lines)
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage="upstream")
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="upstream",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="upstream",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="upstream",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="upstream"} 3' in lines
+    assert 'latency_seconds_sum{stage="upstream"} 5.55' in lines
+
+def test_failing_callback_does_not_break_the_scrape():
+    registry = MetricsRegistry()
+    registry.callback("broken", "Fails.", lambda: 1 / 0)
+    registry.callback("working", "Works.", lambda: 1)
+    lines = registry.render().splitlines()
+    assert "working 1" in lines
+    assert any(line.startswith("# broken unavailable") for line in lines)
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+import pytest
+
+from rate_limiter import (PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, KeyedRateLimiter, RateLimiter,
+                          RateLimitExceededError, TokenBucket)
+from shared_state import SharedStateStore, SharedTokenBucket
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=3, refill_per_minute=60, clock=clock)
+    for _ in range(3):
+        assert bucket.wait_time(1) == 0
+        bucket.consume(1)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    clock.now += 100
+    assert bucket.wait_time(3) == 0 and bucket.level == 3
+
+def test_token_bucket_debt_and_adjust(clock):
+    bucket = TokenBucket(capacity=10, refill_per_minute=60, clock=clock)
+    assert bucket.wait_time(50) == 0 # Larger than capacity: allowed at a full bucket
+    bucket.consume(50)
+    assert bucket.level == -40
+    assert bucket.wait_time(1) == pytest.approx(41.0)
+    bucket.adjust(100)
+    assert bucket.level == 10 # Capped at capacity
+
+def test_keyed_limiter_burst_then_rejects_per_key(clock):
+    limiter = KeyedRateLimiter(per_minute=6, burst=2, clock=clock)
+
+    async def run():
+        results = [await limiter.try_acquire("a") for _ in range(3)]
+        return results, await limiter.try_acquire("b")
+    (first, second, third), other_key = asyncio.run(run())
+    assert first == 0 and second == 0
+    assert third == pytest.approx(10.0)
+    assert other_key == 0
+    assert limiter.stats()["rejected"] == 1 and limiter.stats()["allowed"] == 3
+
+def test_keyed_limiter_drops_least_recently_used_keys(clock):
+    limiter = KeyedRateLimiter(per_minute=6, burst=1, max_keys=2, clock=clock)
+
+    async def run():
+        for key in ("a", "b", "a", "c"):
+            await limiter.try_acquire(key)
+    asyncio.run(run())
+    assert list(limiter._buckets) == ["a", "c"]
+
+def test_keyed_limiter_disabled():
+    limiter = KeyedRateLimiter(per_minute=0, burst=1)
+    assert all(asyncio.run(limiter.try_acquire("a")) == 0 for _ in range(10))
+
+def test_queue_grants_interactive_before_background():
+    # One call at a time, one more every 0.1 s
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0, burst_fraction=0)
+    order = []
+
+    async def call(label, priority):
+        await limiter.acquire(1, priority)
+        order.append(label)
+
+    async def run():
+        await limiter.acquire(1) # Empties the bucket
+        await asyncio.gather(call("background", PRIORITY_BACKGROUND), call("interactive", PRIORITY_INTERACTIVE))
+    asyncio.run(run())
+    assert order == ["interactive", "background"]
+    stats = limiter.stats()
+    assert stats["granted"] == 3 and stats["queued"] == 2 and stats["queue_depth"] == 0
+
+def test_queue_times_out():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=0, max_wait_seconds=0.05)
+
+    async def run():
+        await limiter.acquire(1)
+        with pytest.raises(RateLimitExceededError) as raised:
+            await limiter.acquire(1)
+        return raised.value
+    error = asyncio.run(run())
+    assert error.retry_after > 1
+    assert limiter.stats()["timed_out"] == 1
+
+def test_settle_corrects_token_bucket(clock):
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000, burst_fraction=0.5, clock=clock)
+
+    async def run():
+        await limiter.acquire(400)
+        limiter.settle(400, 100)
+        return await limiter.levels()
+    assert asyncio.run(run())["available_tokens"] == 400 # 500 - 400 + 300
+    assert limiter.stats()["actual_tokens"] == 100
+
+class ThreadRecordingStore(SharedStateStore):
+    """Shared store that notes which threads touched its buckets."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def bucket_level(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().bucket_level(*args)
+
+    def change_bucket(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().change_bucket(*args)
+
+def shared_factory(store, prefix):
+    return lambda name, capacity, refill: SharedTokenBucket(store, f"{prefix}:{name}", capacity, refill)
+
+def test_shared_keyed_limiter_applies_across_workers_off_the_loop(tmp_path):
+    store = ThreadRecordingStore(str(tmp_path / "shared.sqlite3"))
+    # Two limiters on one store stand in for two workers
+    workers = [KeyedRateLimiter(per_minute=6, burst=2, bucket_factory=shared_factory(store, "free_text")) for _ in range(2)]
+
+    async def run():
+        return [await worker.try_acquire("10.0.0.1") for worker in workers + workers]
+    waits = asyncio.run(run())
+    assert waits[:2] == [0, 0]
+    assert all(wait > 0 for wait in waits[2:])
+    assert threading.get_ident() not in store.threads
+
+def test_shared_rate_limiter_off_the_loop(tmp_path):
+    store = ThreadRecordingStore(str(tmp_path / "shared.sqlite3"))
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000, burst_fraction=0.01,
+                          bucket_factory=shared_factory(store, "gemini"))
+    loop_thread = threading.get_ident()
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire(100) for _ in range(8)))
+        limiter.settle(800, 500)
+        await asyncio.sleep(0.05) # Lets the background settlement finish
+        return await limiter.levels()
+    levels = asyncio.run(run())
+    assert limiter.stats()["granted"] == 8
+    assert levels["available_requests"] <= 6 and levels["available_tokens"] > 0
+    assert store.threads and loop_thread not in store.threads
+
+def test_cancelled_shared_waiter_leaves_no_reservation(tmp_path):
+    store = SharedStateStore(str(tmp_path / "shared.sqlite3"))
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0, burst_fraction=0.01,
+                          bucket_factory=shared_factory(store, "gemini"))
+
+    async def run():
+        waiter = asyncio.ensure_future(limiter.acquire(1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.05)
+        return await limiter.levels()
+    assert asyncio.run(run())["available_requests"] == pytest.approx(6.0, abs=0.5)
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from resilience import (CircuitBreaker, CircuitOpenError, RetryPolicy, UpstreamGuard, UpstreamUnavailableError,
+                        is_retryable, is_upstream_error)
+
+class ApiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+def fast_policy(**overrides) -> RetryPolicy:
+    return RetryPolicy(**{"max_attempts": 3, "base_delay_seconds": 0.001, "max_delay_seconds": 0.001,
+                          "attempt_timeout_seconds": 1.0, "total_timeout_seconds": 5.0, **overrides})
+
+@pytest.mark.parametrize("error, retryable", [
+    (TimeoutError(), True), (ConnectionResetError(), True), (ApiError(429), True), (ApiError(503), True),
+    (ApiError(400), False), (ApiError(403), False), (ValueError("blocked"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) == retryable
+
+@pytest.mark.parametrize("error, upstream", [
+    (ApiError(400), True), (ApiError(503), True), (ValueError("bug"), False), (KeyError("parts"), False),
+])
+def test_is_upstream_error(error, upstream):
+    assert is_upstream_error(error) == upstream
+
+def test_breaker_opens_after_threshold_then_probes(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30, clock=clock)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert raised.value.retry_after == 30
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call() # The probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call() # One probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.consecutive_failures == 0
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.times_opened == 2
+    assert breaker.retry_after() == 10
+
+def test_released_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+
+def test_success_resets_the_failure_run(clock):
+    breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_guard_retries_transient_errors():
+    guard = UpstreamGuard(fast_policy(), CircuitBreaker(failure_threshold=10))
+    outcomes = [ApiError(503), TimeoutError(), "answer"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    assert asyncio.run(guard.call(call)) == "answer"
+    assert (guard.attempts, guard.retries, guard.timeouts) == (3, 2, 1)
+    assert guard.breaker.consecutive_failures == 0
+
+def test_guard_gives_up_with_unavailable_error():
+    guard = UpstreamGuard(fast_policy(), CircuitBreaker(failure_threshold=10))
+
+    def call(timeout):
+        raise ApiError(429)
+    with pytest.raises(UpstreamUnavailableError):
+        guard.call_sync(call)
+    assert guard.attempts == 3 and guard.failures == 1
+
+def test_guard_does_not_retry_other_errors():
+    guard = UpstreamGuard(fast_policy(), CircuitBreaker(failure_threshold=1))
+
+    async def call():
+        raise ApiError(400)
+    with pytest.raises(ApiError):
+        asyncio.run(guard.call(call))
+    assert guard.attempts == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED # The upstream answered
+
+def test_guard_times_out_slow_attempts():
+    guard = UpstreamGuard(fast_policy(max_attempts=2, attempt_timeout_seconds=0.02), CircuitBreaker(failure_threshold=10))
+
+    async def call():
+        await asyncio.sleep(1)
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(guard.call(call))
+    assert guard.timeouts == 2
+
+def test_open_circuit_fails_fast():
+    guard = UpstreamGuard(fast_policy(), CircuitBreaker(failure_threshold=2))
+    calls = []
+
+    def call(timeout):
+        calls.append(1)
+        raise ConnectionError()
+    with pytest.raises(CircuitOpenError):
+        guard.call_sync(call) # The second failure opens the circuit before the third attempt
+    with pytest.raises(CircuitOpenError):
+        guard.call_sync(call)
+    assert len(calls) == 2
@@ -0,0 +1,74 @@
+import gzip
+import json
+import random
+
+import pytest
+
+from response_encoding import MAX_TAIL_BYTES, EncodedAnswer, EncodedAnswerCache, negotiate
+
+brotli = pytest.importorskip("brotli")
+
+def decode(body: bytes, encoding: str) -> dict:
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "br":
+        body = brotli.decompress(body)
+    return json.loads(body)
+
+def answer_fields(chars: int = 4000, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    words = ["milk", "feeding", "latch", "स्तनपान", "দুধ", "ಹಾಲು", "દૂધ", "**bold**", "- item", "\n"]
+    response = " ".join(rng.choice(words) for _ in range(chars // 5))
+    return {"response": response, "media": {"images": ["a.webp"], "video": None}, "response_html": f"<p>{response}</p>"}
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "br"])
+def test_spliced_body_round_trips(encoding):
+    fields = answer_fields()
+    encoded = EncodedAnswer(fields)
+    assert encoding == "identity" or encoding in encoded.codings()
+    for session_id in ["3f2a-session", "सत्र-१", ""]:
+        assert decode(encoded.body(session_id, encoding), encoding) == {**fields, "session_id": session_id}
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_variant_is_compressed_once_and_reused(encoding):
+    encoded = EncodedAnswer(answer_fields())
+    first = encoded.body("a", encoding)
+    variant = encoded.variants[encoding]
+    second = encoded.body("b", encoding)
+    assert encoded.variants[encoding] is variant
+    assert first.startswith(variant) and second.startswith(variant)
+    assert len(first) < len(encoded.json)
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_tail_at_and_over_the_block_limit(encoding):
+    fields = answer_fields()
+    encoded = EncodedAnswer(fields)
+    overhead = len(b',"session_id":""}')
+    for session_id in ["x" * (MAX_TAIL_BYTES - overhead), "x" * (MAX_TAIL_BYTES - overhead + 1)]:
+        assert decode(encoded.body(session_id, encoding), encoding)["session_id"] == session_id
+
+def test_small_body_is_not_compressed():
+    encoded = EncodedAnswer({"response": "Yes.", "media": None, "response_html": "<p>Yes.</p>"})
+    assert encoded.codings() == ()
+    assert negotiate("br, gzip", encoded) == "identity"
+    assert decode(encoded.body("s", "identity"), "identity")["response"] == "Yes."
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("deflate", "identity"),
+    ("", "identity"),
+])
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, EncodedAnswer(answer_fields())) == expected
+
+def test_cache_returns_the_same_encoding():
+    cache = EncodedAnswerCache(max_entries=10)
+    fields = answer_fields()
+    key = EncodedAnswerCache.key(fields["response"], 101)
+    assert key != EncodedAnswerCache.key(fields["response"], 102)
+    assert cache.get(key) is None
+    encoded = cache.put(key, fields)
+    assert cache.get(key) is encoded
+    assert cache.stats()["hits"] == 1 and cache.stats()["encodes"] == 1
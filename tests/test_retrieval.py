@@ -0,0 +1,52 @@
+import retrieval
+from retrieval import BM25Index, load_or_build_index, split_passages, tokenize
+
+SLIDES = [
+    "A good latch means the baby takes a large part of the areola into the mouth.",
+    "Engorgement makes the breasts hard and painful; feed often and use cold compresses.",
+    "Pumping at work: store expressed milk in the fridge for up to four days.",
+    "Skin to skin contact right after birth helps the baby find the breast.",
+]
+TRANSCRIPT = "\n(...)\n".join(SLIDES)
+
+def small_passages(monkeypatch):
+    # One slide per passage
+    monkeypatch.setattr(retrieval, "PASSAGE_TARGET_WORDS", 1)
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize("How is the baby latching?") == ["baby", "latch"]
+    assert tokenize("latched latches") == ["latch", "latch"]
+    assert tokenize("eyes") == ["eyes"] # Too short to strip
+
+def test_split_passages_keeps_whole_slides(monkeypatch):
+    assert split_passages(TRANSCRIPT) == ["\n".join(SLIDES)] # Under the target: one passage
+    small_passages(monkeypatch)
+    assert split_passages("First (...) pause.\n(...)\nSecond.") == ["First pause.", "Second."]
+
+def test_search_ranks_the_matching_passage_first(monkeypatch):
+    small_passages(monkeypatch)
+    index = BM25Index.build(TRANSCRIPT)
+    assert len(index.passages) == 4
+    assert index.search("Why are my breasts hard and painful?")[0][0] == 1
+    assert index.search("storing pumped milk at work")[0][0] == 2
+    hits = index.search("baby", top_k=10)
+    assert {passage for passage, _ in hits} == {0, 3}
+    assert all(score > 0 for _, score in hits)
+
+def test_no_match():
+    assert BM25Index.build(TRANSCRIPT).search("vaccination schedule") == []
+
+def test_rarer_terms_weigh_more(monkeypatch):
+    small_passages(monkeypatch)
+    index = BM25Index.build(TRANSCRIPT)
+    assert index.idf["engorgement"] > index.idf["baby"]
+
+def test_persisted_index_is_reused_until_the_transcript_changes(tmp_path, monkeypatch):
+    small_passages(monkeypatch)
+    path = str(tmp_path / "index.json")
+    built = load_or_build_index(TRANSCRIPT.encode("utf-8"), path)
+    loaded = load_or_build_index(TRANSCRIPT, path)
+    assert loaded.source_hash == built.source_hash
+    assert loaded.search("latch") == built.search("latch")
+    changed = load_or_build_index(TRANSCRIPT + "\n(...)\nVitamin D drops for the baby.", path)
+    assert changed.source_hash != built.source_hash and len(changed.passages) == 5
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from semantic_cache import NearDuplicateIndex, SemanticAnswerCache, question_words, same_question
+
+FILLER = [
+    "How do I know my baby is getting enough milk?",
+    "What is the best position for breastfeeding after a c-section?",
+    "How can I increase my milk supply?",
+    "Is it normal for my nipples to hurt while feeding?",
+    "How often should I pump at work?",
+]
+
+# (answered, asked): trigram-similar questions that need different answers
+FALSE_POSITIVES = [
+    ("Should I breastfeed my baby if I have a fever?", "Should I not breastfeed my baby if I have a fever?"),
+    ("How often should I feed my 2 week old?", "How often should I feed my 12 week old?"),
+    ("Can I breastfeed outside when it is very hot outside?", "Can I breastfeed outside when it is very cold outside?"),
+    ("Is it normal if my baby sleeps 5 hours without feeding?", "Is it normal if my baby sleeps 15 hours without feeding?"),
+    ("Why do I have so much milk?", "Why don't I have so much milk?"),
+    ("My supply seems to decrease after feeding", "My supply seems to increase after feeding"),
+    ("Is it worse before feeding or after feeding?", "Is it worse before feeding or before feeding?"),
+]
+
+def index_with(*questions: str) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(max_entries=100, threshold=0.85)
+    for question in FILLER + list(questions):
+        index.insert(question, f"answer to: {question}")
+    return index
+
+@pytest.mark.parametrize("answered, asked", FALSE_POSITIVES)
+def test_different_question_is_not_served(answered, asked):
+    index = index_with(answered)
+    answer, _, _ = index.lookup(asked)
+    assert answer is None
+
+def test_guard_rejection_is_counted():
+    index = index_with("Should I breastfeed my baby if I have a fever?")
+    answer, score, matched = index.lookup("Should I not breastfeed my baby if I have a fever?")
+    assert answer is None and score >= 0.85 and matched.startswith("should i breastfeed")
+    assert index.stats()["rejections"] == 1
+
+@pytest.mark.parametrize("asked", [
+    "how do I know my baby is getting enough milk",
+    "HOW DO I KNOW MY BABY IS GETTING ENOUGH MILK??",
+    "How do I know my baby is geting enough milk?",
+])
+def test_restyled_and_respelled_question_is_served(asked):
+    index = index_with()
+    answer, _, _ = index.lookup(asked)
+    assert answer == "answer to: How do I know my baby is getting enough milk?"
+
+@pytest.mark.parametrize("a, b, same", [
+    ("Why don't I have milk?", "why dont i have milk", True),
+    ("Why don't I have milk?", "why do i have milk", False),
+    ("feeding every 3 hours", "feeding every three hours", False), # Digits and number words are not equated
+    ("is my baby latching well", "is my baby lacthing well", True), # One swap in a long word
+    ("is it hot", "is it hat", False), # Short words must match exactly
+    ("supply will increase", "supply will decrease", False),
+    ("feeding with a shield", "feeding without a shield", False),
+    ("बुखार में दूध पिलाना चाहिए", "बुखार में दूध नहीं पिलाना चाहिए", False),
+])
+def test_same_question(a, b, same):
+    assert same_question(question_words(a), question_words(b)) is same
+
+def test_semantic_cache_separates_languages_and_fingerprints():
+    cache = SemanticAnswerCache(max_entries=10, threshold=0.85)
+    cache.insert("How can I increase my milk supply?", "en", "fp1", "answer")
+    assert cache.lookup("how can i increase my milk supply", "en", "fp1")[0] == "answer"
+    assert cache.lookup("how can i increase my milk supply", "hi", "fp1")[0] is None
+    assert cache.lookup("how can i increase my milk supply", "en", "fp2")[0] is None
+    assert cache.stats()["hits"] == 1
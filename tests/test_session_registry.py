@@ -0,0 +1,45 @@
+from session_registry import SessionRegistry
+
+def test_touch_creates_then_refreshes(clock):
+    registry = SessionRegistry(max_size=10, ttl_seconds=60, clock=clock)
+    state = registry.touch("a")
+    clock.now += 30
+    assert registry.touch("a") is state
+    assert state.last_seen == clock.now and state.created_at == 1000.0
+    assert registry.stats()["hits"] == 1 and registry.stats()["misses"] == 1
+
+def test_least_recently_used_is_evicted(clock):
+    registry = SessionRegistry(max_size=2, ttl_seconds=60, clock=clock)
+    registry.touch("a")
+    registry.touch("b")
+    registry.touch("a") # b is now the least recently used
+    registry.touch("c")
+    assert "a" in registry and "c" in registry and "b" not in registry
+    assert registry.stats()["evictions"] == 1
+
+def test_idle_sessions_expire(clock):
+    registry = SessionRegistry(max_size=10, ttl_seconds=60, clock=clock)
+    registry.touch("a")
+    clock.now += 30
+    registry.touch("b")
+    clock.now += 45 # a idle for 75 s, b for 45 s
+    assert registry.get("a") is None and registry.get("b") is not None
+    assert registry.stats()["expirations"] == 1 and len(registry) == 1
+    fresh = registry.touch("a")
+    assert fresh.created_at == clock.now
+
+def test_get_does_not_create_or_refresh(clock):
+    registry = SessionRegistry(max_size=10, ttl_seconds=60, clock=clock)
+    assert registry.get("a") is None and len(registry) == 0
+    registry.touch("a")
+    clock.now += 50
+    registry.get("a")
+    clock.now += 20
+    assert registry.get("a") is None
+
+def test_discard(clock):
+    registry = SessionRegistry(clock=clock)
+    registry.touch("a")
+    registry.discard("a")
+    registry.discard("missing")
+    assert "a" not in registry
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("q", generate) for _ in range(5)))
+    assert asyncio.run(run()) == ["answer"] * 5
+    assert calls == [1]
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 4}
+
+def test_later_call_starts_fresh():
+    flight = SingleFlight()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return await flight.do("q", generate), await flight.do("q", generate)
+    assert asyncio.run(run()) == (1, 2)
+
+def test_failure_reaches_waiting_callers_and_is_not_kept():
+    flight = SingleFlight()
+    attempts = []
+
+    async def generate():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "answer"
+
+    async def run():
+        results = await asyncio.gather(flight.do("q", generate), flight.do("q", generate), return_exceptions=True)
+        return results, await flight.do("q", generate)
+    results, retried = asyncio.run(run())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert retried == "answer"
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("q", generate))
+        follower = asyncio.ensure_future(flight.do("q", generate))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+    assert asyncio.run(run()) == "answer"
+
+def test_pending_joins_a_running_call():
+    flight = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        assert flight.pending("q") is None
+        leader = asyncio.ensure_future(flight.do("q", generate))
+        await asyncio.sleep(0)
+        return await flight.pending("q"), await leader
+    assert asyncio.run(run()) == ("answer", "answer")
+
+def test_stream_replays_missed_events_to_late_joiners():
+    flight = SingleFlight()
+    starts = []
+
+    async def events():
+        starts.append(1)
+        for i in range(4):
+            yield i
+            await asyncio.sleep(0.005)
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [event async for event in flight.stream("q", events)]
+
+    async def run():
+        return await asyncio.gather(collect(0), collect(0.012))
+    first, late = asyncio.run(run())
+    assert first == late == [0, 1, 2, 3]
+    assert starts == [1]
+    assert not flight.is_streaming("q")
+
+def test_stream_error_reaches_every_subscriber():
+    flight = SingleFlight()
+
+    async def events():
+        yield "delta"
+        await asyncio.sleep(0.005)
+        raise RuntimeError("stream broke")
+
+    async def collect():
+        received = []
+        with pytest.raises(RuntimeError):
+            async for event in flight.stream("q", events):
+                received.append(event)
+        return received
+
+    async def run():
+        return await asyncio.gather(collect(), collect())
+    assert asyncio.run(run()) == [["delta"], ["delta"]]
@@ -0,0 +1,108 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import media
+import static_assets
+from media import MediaLibrary, build_manifest
+from static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, StaticAssetStore, accepted_encodings
+
+brotli = pytest.importorskip("brotli")
+
+SCRIPT = "function answer() { return 'feed the baby often'; }\n" * 100
+INDEX = ('<html><head><link rel="stylesheet" href="/static/style.css"></head>'
+         '<body><img src="/static/logo.png"><script src="/static/script.js"></script></body></html>')
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "index.html").write_text(INDEX, encoding="utf-8")
+    (tmp_path / "script.js").write_text(SCRIPT, encoding="utf-8")
+    (tmp_path / "style.css").write_text("body { margin: 0; }\n", encoding="utf-8")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(2000))
+    (tmp_path / "media").mkdir() # Subdirectories are left to the StaticFiles mount
+    return StaticAssetStore.load(str(tmp_path))
+
+def client_for(store: StaticAssetStore) -> TestClient:
+    async def serve(request):
+        return store.response(request.path_params["name"], request) or Response(status_code=404)
+    return TestClient(Starlette(routes=[Route("/static/{name}", serve, methods=["GET", "HEAD"])]))
+
+def test_index_links_to_hashed_urls(store):
+    index = store.get("index.html").variants["identity"].decode("utf-8")
+    script, style = store.get("script.js"), store.get("style.css")
+    assert f'src="/static/{script.hashed_name}"' in index
+    assert f'href="/static/{style.hashed_name}"' in index
+    assert 'src="/static/logo.png"' in index # Only scripts and stylesheets are hashed
+    assert script.hashed_name.startswith("script.") and script.hashed_name != "script.js"
+    assert "media" not in store
+
+def test_hashed_urls_are_immutable_and_plain_names_revalidate(store):
+    client = client_for(store)
+    script = store.get("script.js")
+    hashed = client.get(f"/static/{script.hashed_name}", headers={"Accept-Encoding": "identity"})
+    plain = client.get("/static/script.js", headers={"Accept-Encoding": "identity"})
+    assert hashed.status_code == plain.status_code == 200
+    assert hashed.text == plain.text == SCRIPT
+    assert hashed.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert plain.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert "javascript" in plain.headers["content-type"]
+
+def test_stale_hash_is_not_found(store):
+    client = client_for(store)
+    assert client.get("/static/script.000000000000.js").status_code == 404
+    assert client.get("/static/missing.js").status_code == 404
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("br, gzip", "br"), ("gzip, deflate", "gzip"), ("gzip;q=1.0, br;q=0", "gzip"), ("identity", None), ("", None),
+])
+def test_encoding_is_negotiated(store, accept_encoding, encoding):
+    response = client_for(store).get("/static/script.js", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == SCRIPT # Decoded by the client
+    asset = store.get("script.js")
+    assert response.headers["etag"] == asset.etag(encoding or "identity")
+
+def test_variants_decode_to_the_file(store):
+    asset = store.get("script.js")
+    assert gzip.decompress(asset.variants["gzip"]).decode("utf-8") == SCRIPT
+    assert brotli.decompress(asset.variants["br"]).decode("utf-8") == SCRIPT
+    assert set(store.get("style.css").variants) == {"identity"} # Too small to be worth compressing
+
+def test_if_none_match_answers_304(store):
+    client = client_for(store)
+    first = client.get("/static/script.js", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    again = client.get("/static/script.js", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag and again.headers["vary"] == "Accept-Encoding"
+    assert client.get("/static/script.js", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/static/script.js", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, BR;q=0.5, deflate;q=0, x;q=bad") == {"gzip", "br"}
+    assert accepted_encodings("") == set()
+
+def test_app_routes_answer_404_for_stale_hashes(store, tmp_path, monkeypatch):
+    media_dir = tmp_path / "media"
+    (media_dir / "latch.mp4").write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr(media, "MEDIA_DIR", str(media_dir))
+    manifest_path = str(tmp_path / "media_manifest.json")
+    build_manifest(manifest_path, str(media_dir))
+    library = MediaLibrary.load(manifest_path)
+    monkeypatch.setattr(static_assets, "_static_assets", store)
+    monkeypatch.setattr(media, "_media_library", library)
+    import main
+
+    client = TestClient(main.app)
+    script = store.get("script.js")
+    assert client.get(f"/static/{script.hashed_name}").status_code == 200
+    assert client.get("/static/script.000000000000.js").status_code == 404
+    asset_id = next(iter(library._by_id))
+    assert client.get(f"/media/{asset_id}").status_code == 200
+    assert client.get("/media/latch.000000000000.mp4").status_code == 404